@@ -3,25 +3,92 @@ API客户端 - 处理与后端API的所有通信
 """
 
 import requests
-import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..utils import json_codec
+from ..utils.http_cache import HttpCache
+from .json_stream import iter_json_array
+
+
+class ApiError(Exception):
+    """接口返回错误状态码"""
+    
+    def __init__(self, message: str, status_code: int):
+        """
+        初始化接口错误
+        
+        Args:
+            message: 错误信息
+            status_code: HTTP状态码
+        """
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class ApiClient:
     """API通信的基础客户端"""
     
-    def __init__(self, base_url: str):
+    # 修改某类资源后需要失效的GET缓存（按/api/后的第一段路径）
+    INVALIDATES = {
+        "songs": ("songs", "albums", "playlists", "catalog"),
+        "artists": ("artists", "albums", "songs", "catalog"),
+        "albums": ("albums", "songs", "catalog"),
+        "playlists": ("playlists",)
+    }
+    
+    # 不失效缓存的修改请求（按最后一段路径）：提交播放次数只改计数，缓存的GET下次请求时
+    # 仍会带验证头向服务器确认，不必为此丢掉整个曲库的歌曲、专辑和播放列表缓存
+    KEEPS_CACHE = ("play", "plays")
+    
+    def __init__(self, base_url: str, pool_connections: int = 4, pool_maxsize: int = 16,
+                 max_retries: int = 2, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 cache: Optional[HttpCache] = None):
         """
         初始化API客户端
         
         Args:
             base_url: API基础URL
+            pool_connections: 连接池缓存的主机数量
+            pool_maxsize: 每个主机保持的最大连接数
+            max_retries: 连接失败，或GET/DELETE等请求遇到网关错误时的重试次数
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取响应超时（秒）
+            cache: GET响应缓存，为None时不缓存
         """
         self.base_url = base_url
+        self.cache = cache
         self.token = None
         self.headers = {
             "Content-Type": "application/json"
         }
+        self.timeout = (connect_timeout, read_timeout)
+        
+        # 所有服务共享同一个会话，复用keep-alive连接，避免每次请求重新握手。
+        # PUT不自动重试：PUT /api/songs/{id}/play不是幂等的，请求已到达服务器后
+        # 重发会重复计数，失败的播放次数由PlayCountQueue退避后重新提交
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "DELETE", "HEAD", "OPTIONS"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        """关闭会话并释放连接池中的所有连接"""
+        self.session.close()
     
     def set_token(self, token: str) -> None:
         """
@@ -39,10 +106,29 @@ class ApiClient:
         if "Authorization" in self.headers:
             del self.headers["Authorization"]
     
+    def _invalidate(self, endpoint: str) -> None:
+        """
+        修改请求成功后失效相关资源的GET缓存
+        
+        Args:
+            endpoint: 修改请求的API端点
+        """
+        if self.cache is None:
+            return
+        parts = endpoint.split("?", 1)[0].strip("/").split("/")
+        if parts[-1] in self.KEEPS_CACHE:
+            return
+        resource = parts[1] if len(parts) > 1 and parts[0] == "api" else parts[0]
+        related = self.INVALIDATES.get(resource, (resource,))
+        self.cache.invalidate(f"/api/{name}" for name in related)
+    
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Any:
         """
         发送GET请求
         
+        有缓存时带上If-None-Match/If-Modified-Since，服务器返回304时
+        直接复用缓存中已解析的对象（调用方不应修改返回值）。
+        
         Args:
             endpoint: API端点
             params: URL参数
@@ -54,18 +140,92 @@ class ApiClient:
             Exception: 请求失败
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, headers=self.headers, params=params)
+        headers = self.headers
+        key = None
+        entry = None
+        if self.cache is not None:
+            key = HttpCache.make_key(url, params, self.headers.get("Authorization"))
+            entry = self.cache.get(key)
+            if entry is not None:
+                headers = {**self.headers, **entry.validators()}
         
-        if response.status_code == 200:
-            return response.json()
+        response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+        
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            if entry.parsed is None:
+                entry.parsed = json_codec.loads(entry.body)
+            return entry.parsed
+        elif response.status_code == 200:
+            data = json_codec.loads(response.content)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if key is not None and (etag or last_modified):
+                self.cache.put(key, endpoint, etag, last_modified, response.content, data)
+            return data
         else:
             error_msg = f"GET {url} failed with status {response.status_code}"
             try:
-                error_details = response.json()
+                error_details = json_codec.loads(response.content)
                 error_msg += f": {error_details}"
             except:
                 error_msg += f": {response.text}"
-            raise Exception(error_msg)
+            raise ApiError(error_msg, response.status_code)
+    
+    def get_stream(self, endpoint: str, params: Optional[Dict] = None, item_path: Optional[str] = None,
+                   chunk_size: int = 64 * 1024) -> Iterator[Any]:
+        """
+        以流式方式获取数组响应，边下载边逐个返回元素
+        
+        不经过GET缓存，也不在内存中保留完整的响应体和解码后的整个列表，
+        适合服务器不支持分页时获取很大的列表。
+        
+        Args:
+            endpoint: API端点
+            params: URL参数
+            item_path: 数组在响应中的位置，以点分隔的对象键（例如"content"），为None时响应本身就是数组
+            chunk_size: 每次读取的字节数
+            
+        Yields:
+            数组元素
+            
+        Raises:
+            Exception: 请求失败或响应格式错误
+        """
+        url = f"{self.base_url}{endpoint}"
+        path = item_path.split(".") if item_path else None
+        
+        with self.session.get(url, headers=self.headers, params=params, stream=True, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                raise ApiError(f"GET {url} failed with status {response.status_code}: {response.text}",
+                               response.status_code)
+            
+            yield from iter_json_array(response.iter_content(chunk_size=chunk_size), path)
+    
+    def download(self, url: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        以流式方式下载文件内容（例如音频文件）
+        
+        Args:
+            url: 完整的文件URL
+            chunk_size: 每块大小（字节）
+            
+        Yields:
+            文件数据块
+            
+        Raises:
+            Exception: 请求失败
+        """
+        headers = self.headers.copy()
+        headers.pop("Content-Type", None)
+        
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                raise ApiError(f"GET {url} failed with status {response.status_code}", response.status_code)
+            
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
     
     def post(self, endpoint: str, data: Dict = None, files: Dict = None) -> Any:
         """
@@ -90,30 +250,70 @@ class ApiClient:
             if "Content-Type" in headers:
                 del headers["Content-Type"]
             
-            response = requests.post(
+            response = self.session.post(
                 url, 
                 headers=headers, 
                 data=data, 
-                files=files
+                files=files,
+                timeout=self.timeout
             )
         else:
             # 正常JSON请求
-            response = requests.post(
+            response = self.session.post(
                 url, 
                 headers=headers, 
-                data=json.dumps(data) if data else None
+                data=json_codec.dumps(data) if data else None,
+                timeout=self.timeout
             )
         
         if response.status_code == 200:
-            return response.json()
+            self._invalidate(endpoint)
+            return json_codec.loads(response.content)
         else:
             error_msg = f"POST {url} failed with status {response.status_code}"
             try:
-                error_details = response.json()
+                error_details = json_codec.loads(response.content)
+                error_msg += f": {error_details}"
+            except:
+                error_msg += f": {response.text}"
+            raise ApiError(error_msg, response.status_code)
+    
+    def send_body(self, method: str, endpoint: str, body: Any, content_type: str,
+                  headers: Optional[Dict[str, str]] = None) -> Any:
+        """
+        发送带原始请求体的请求（例如流式上传）
+        
+        Args:
+            method: 请求方法（POST、PUT）
+            endpoint: API端点
+            body: 请求体，可以是bytes或带长度的可迭代对象（按块发送）
+            content_type: 请求体的Content-Type
+            headers: 额外的请求头
+            
+        Returns:
+            解析后的JSON响应或None
+            
+        Raises:
+            Exception: 请求失败
+        """
+        url = f"{self.base_url}{endpoint}"
+        request_headers = {**self.headers, "Content-Type": content_type, **(headers or {})}
+        response = self.session.request(method, url, headers=request_headers, data=body, timeout=self.timeout)
+        
+        if response.status_code in [200, 201, 204]:
+            self._invalidate(endpoint)
+            try:
+                return json_codec.loads(response.content)
+            except ValueError:
+                return None
+        else:
+            error_msg = f"{method} {url} failed with status {response.status_code}"
+            try:
+                error_details = json_codec.loads(response.content)
                 error_msg += f": {error_details}"
             except:
                 error_msg += f": {response.text}"
-            raise Exception(error_msg)
+            raise ApiError(error_msg, response.status_code)
     
     def put(self, endpoint: str, data: Dict = None) -> Any:
         """
@@ -130,22 +330,24 @@ class ApiClient:
             Exception: 请求失败
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.put(
+        response = self.session.put(
             url, 
             headers=self.headers,
-            data=json.dumps(data) if data else None
+            data=json_codec.dumps(data) if data else None,
+            timeout=self.timeout
         )
         
         if response.status_code == 200:
-            return response.json()
+            self._invalidate(endpoint)
+            return json_codec.loads(response.content)
         else:
             error_msg = f"PUT {url} failed with status {response.status_code}"
             try:
-                error_details = response.json()
+                error_details = json_codec.loads(response.content)
                 error_msg += f": {error_details}"
             except:
                 error_msg += f": {response.text}"
-            raise Exception(error_msg)
+            raise ApiError(error_msg, response.status_code)
     
     def delete(self, endpoint: str) -> Any:
         """
@@ -161,18 +363,19 @@ class ApiClient:
             Exception: 请求失败
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.delete(url, headers=self.headers)
+        response = self.session.delete(url, headers=self.headers, timeout=self.timeout)
         
         if response.status_code in [200, 204]:
+            self._invalidate(endpoint)
             try:
-                return response.json()
+                return json_codec.loads(response.content)
             except:
                 return None
         else:
             error_msg = f"DELETE {url} failed with status {response.status_code}"
             try:
-                error_details = response.json()
+                error_details = json_codec.loads(response.content)
                 error_msg += f": {error_details}"
             except:
                 error_msg += f": {response.text}"
-            raise Exception(error_msg)
\ No newline at end of file
+            raise ApiError(error_msg, response.status_code)
\ No newline at end of file
@@ -2,8 +2,9 @@
 艺术家服务 - 处理艺术家相关操作
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from .api_client import ApiClient
+from .pagination import Page, iter_pages
 
 
 class ArtistService:
@@ -27,6 +28,20 @@ class ArtistService:
         """
         return self.api_client.get("/api/artists")
     
+    def iter_artists(self, page_size: int = 200, prefetch: bool = True) -> Iterator[Page]:
+        """
+        按页获取所有艺术家（服务器不支持分页时只有一页）
+        
+        Args:
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页的艺术家列表
+        """
+        return iter_pages(lambda params: self.api_client.get("/api/artists", params),
+                          None, page_size, prefetch)
+    
     def get_artist(self, artist_id: int) -> Dict:
         """
         获取特定艺术家详情
@@ -51,6 +66,21 @@ class ArtistService:
         """
         return self.api_client.get("/api/artists/search", {"name": name})
     
+    def iter_search_artists(self, name: str, page_size: int = 200, prefetch: bool = True) -> Iterator[Page]:
+        """
+        按页搜索艺术家
+        
+        Args:
+            name: 艺术家名称
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页符合条件的艺术家
+        """
+        return iter_pages(lambda params: self.api_client.get("/api/artists/search", params),
+                          {"name": name}, page_size, prefetch)
+    
     def create_artist(self, name: str, bio: Optional[str] = None, avatar_url: Optional[str] = None) -> Dict:
         """
         创建新艺术家
@@ -0,0 +1,286 @@
+"""
+异步API客户端 - 基于asyncio的API通信，适合在一个线程中并发大量请求
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖：未安装时只能使用同步的ApiClient
+    aiohttp = None
+
+from .api_client import ApiClient, ApiError
+from ..utils import json_codec
+from ..utils.http_cache import HttpCache
+
+
+def is_available() -> bool:
+    """
+    是否可以使用异步客户端
+    
+    Returns:
+        是否已安装aiohttp
+    """
+    return aiohttp is not None
+
+
+class AsyncApiClient:
+    """
+    API通信的异步客户端
+    
+    接口与ApiClient相同，但所有请求方法都是协程。会话在第一次请求时
+    于当前事件循环中创建，之后的请求复用连接池中的keep-alive连接；
+    同一个客户端只能在一个事件循环中使用。
+    """
+    
+    # 修改请求后的缓存失效规则与同步客户端一致
+    INVALIDATES = ApiClient.INVALIDATES
+    KEEPS_CACHE = ApiClient.KEEPS_CACHE
+    _invalidate_sync = ApiClient._invalidate
+    
+    def __init__(self, base_url: str, pool_maxsize: int = 64, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, cache: Optional[HttpCache] = None,
+                 headers: Optional[Dict[str, str]] = None, token: Optional[str] = None):
+        """
+        初始化异步API客户端
+        
+        Args:
+            base_url: API基础URL
+            pool_maxsize: 同时打开的最大连接数
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取响应超时（秒）
+            cache: GET响应缓存，为None时不缓存
+            headers: 初始请求头（复制一份，不与调用方共享；其中的Authorization被忽略）
+            token: 认证令牌，之后由set_token/clear_token更新
+            
+        Raises:
+            ImportError: 未安装aiohttp
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncApiClient需要安装aiohttp")
+        
+        self.base_url = base_url
+        self.cache = cache
+        self.headers = dict(headers) if headers is not None else {"Content-Type": "application/json"}
+        self.headers.pop("Authorization", None)
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self.pool_maxsize = pool_maxsize
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.session: Optional["aiohttp.ClientSession"] = None
+    
+    @property
+    def token(self) -> Optional[str]:
+        """当前的认证令牌"""
+        auth = self.headers.get("Authorization")
+        return auth[len("Bearer "):] if auth else None
+    
+    def set_token(self, token: str) -> None:
+        """
+        设置认证令牌
+        
+        请求在事件循环线程中读取headers，这里替换整个字典而不是原地修改，
+        正在发出的请求看到的总是完整的旧请求头或新请求头。
+        
+        Args:
+            token: JWT令牌
+        """
+        self.headers = {**self.headers, "Authorization": f"Bearer {token}"}
+    
+    def clear_token(self) -> None:
+        """清除认证令牌"""
+        headers = self.headers.copy()
+        headers.pop("Authorization", None)
+        self.headers = headers
+    
+    def _session(self) -> "aiohttp.ClientSession":
+        """获取会话（在当前事件循环中按需创建）"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, limit_per_host=self.pool_maxsize)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+    
+    async def close(self) -> None:
+        """关闭会话并释放连接池中的所有连接"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    @staticmethod
+    async def _blocking(fn: Callable, *args: Any) -> Any:
+        """在默认线程池中执行阻塞调用（缓存的磁盘读写），不阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    
+    async def _invalidate(self, endpoint: str) -> None:
+        """
+        修改请求成功后失效相关资源的GET缓存（删除缓存文件在线程池中执行）
+        
+        Args:
+            endpoint: 修改请求的API端点
+        """
+        if self.cache is not None:
+            await self._blocking(self._invalidate_sync, endpoint)
+    
+    @staticmethod
+    async def _error(method: str, url: str, response: "aiohttp.ClientResponse") -> ApiError:
+        """按同步客户端的格式生成错误"""
+        error_msg = f"{method} {url} failed with status {response.status}"
+        text = await response.text()
+        try:
+            error_msg += f": {json_codec.loads(text)}"
+        except ValueError:
+            error_msg += f": {text}"
+        return ApiError(error_msg, response.status)
+    
+    async def get(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        """
+        发送GET请求
+        
+        有缓存时带上If-None-Match/If-Modified-Since，服务器返回304时
+        直接复用缓存中已解析的对象（调用方不应修改返回值）。
+        
+        Args:
+            endpoint: API端点
+            params: URL参数
+            
+        Returns:
+            解析后的JSON响应
+            
+        Raises:
+            ApiError: 请求失败
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = base_headers = self.headers
+        key = None
+        entry = None
+        if self.cache is not None:
+            key = HttpCache.make_key(url, params, base_headers.get("Authorization"))
+            entry = await self._blocking(self.cache.get, key)
+            if entry is not None:
+                headers = {**base_headers, **entry.validators()}
+        
+        async with self._session().get(url, headers=headers, params=params) as response:
+            if response.status == 304 and entry is not None:
+                await self._blocking(self.cache.touch, key)
+                if entry.parsed is None:
+                    entry.parsed = json_codec.loads(entry.body)
+                return entry.parsed
+            if response.status != 200:
+                raise await self._error("GET", url, response)
+            
+            body = await response.read()
+            data = json_codec.loads(body)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if key is not None and (etag or last_modified):
+                await self._blocking(self.cache.put, key, endpoint, etag, last_modified, body, data)
+            return data
+    
+    async def download(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        以流式方式下载文件内容（例如音频文件）
+        
+        Args:
+            url: 完整的文件URL
+            chunk_size: 每块大小（字节）
+            
+        Yields:
+            文件数据块
+            
+        Raises:
+            ApiError: 请求失败
+        """
+        headers = self.headers.copy()
+        headers.pop("Content-Type", None)
+        
+        async with self._session().get(url, headers=headers) as response:
+            if response.status != 200:
+                raise ApiError(f"GET {url} failed with status {response.status}", response.status)
+            
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+    
+    async def post(self, endpoint: str, data: Any = None, files: Dict = None) -> Any:
+        """
+        发送POST请求
+        
+        Args:
+            endpoint: API端点
+            data: 请求体数据
+            files: 上传的文件，格式与ApiClient相同：{字段: (文件名, 文件对象)}
+            
+        Returns:
+            解析后的JSON响应
+            
+        Raises:
+            ApiError: 请求失败
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = self.headers.copy()
+        
+        if files:
+            # 上传文件时由aiohttp生成multipart的Content-Type
+            headers.pop("Content-Type", None)
+            body = aiohttp.FormData()
+            for name, value in (data or {}).items():
+                body.add_field(name, str(value))
+            for name, (filename, file_obj) in files.items():
+                body.add_field(name, file_obj, filename=filename or os.path.basename(file_obj.name))
+        else:
+            body = json_codec.dumps(data) if data else None
+        
+        async with self._session().post(url, headers=headers, data=body) as response:
+            if response.status != 200:
+                raise await self._error("POST", url, response)
+            await self._invalidate(endpoint)
+            return json_codec.loads(await response.read())
+    
+    async def put(self, endpoint: str, data: Dict = None) -> Any:
+        """
+        发送PUT请求
+        
+        Args:
+            endpoint: API端点
+            data: 请求体数据
+            
+        Returns:
+            解析后的JSON响应
+            
+        Raises:
+            ApiError: 请求失败
+        """
+        url = f"{self.base_url}{endpoint}"
+        body = json_codec.dumps(data) if data else None
+        
+        async with self._session().put(url, headers=self.headers, data=body) as response:
+            if response.status != 200:
+                raise await self._error("PUT", url, response)
+            await self._invalidate(endpoint)
+            return json_codec.loads(await response.read())
+    
+    async def delete(self, endpoint: str) -> Any:
+        """
+        发送DELETE请求
+        
+        Args:
+            endpoint: API端点
+            
+        Returns:
+            解析后的JSON响应或None
+            
+        Raises:
+            ApiError: 请求失败
+        """
+        url = f"{self.base_url}{endpoint}"
+        
+        async with self._session().delete(url, headers=self.headers) as response:
+            if response.status not in (200, 204):
+                raise await self._error("DELETE", url, response)
+            await self._invalidate(endpoint)
+            body = await response.read()
+            try:
+                return json_codec.loads(body)
+            except ValueError:
+                return None
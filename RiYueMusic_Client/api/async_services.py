@@ -0,0 +1,624 @@
+"""
+异步服务 - SongService、PlaylistService、ArtistService和AuthService的协程版本
+
+各方法的参数和返回值与对应的同步服务相同，只是需要await。
+"""
+
+import asyncio
+import os
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from .api_client import ApiError
+from .async_api_client import AsyncApiClient
+
+
+class AsyncAuthService:
+    """处理用户身份验证和注册（异步）"""
+    
+    def __init__(self, api_client: AsyncApiClient):
+        """
+        初始化认证服务
+        
+        Args:
+            api_client: 异步API客户端实例
+        """
+        self.api_client = api_client
+    
+    async def register(self, username: str, password: str, email: str) -> Dict:
+        """
+        注册新用户
+        
+        Args:
+            username: 用户名
+            password: 密码
+            email: 电子邮件
+            
+        Returns:
+            用户信息
+        """
+        data = {
+            "username": username,
+            "password": password,
+            "email": email
+        }
+        return await self.api_client.post("/api/auth/signup", data)
+    
+    async def login(self, username: str, password: str) -> Dict:
+        """
+        用户登录，成功时把令牌保存到异步API客户端
+        
+        Args:
+            username: 用户名
+            password: 密码
+            
+        Returns:
+            包含令牌和用户信息的字典
+        """
+        data = {
+            "username": username,
+            "password": password
+        }
+        response = await self.api_client.post("/api/auth/signin", data)
+        
+        if "token" in response:
+            self.api_client.set_token(response["token"])
+        return response
+    
+    def logout(self) -> None:
+        """用户登出，清除令牌"""
+        self.api_client.clear_token()
+    
+    async def get_current_user(self) -> Optional[Dict]:
+        """
+        获取当前登录用户信息
+        
+        请求失败（例如令牌过期）时清除令牌。
+        
+        Returns:
+            用户信息或None（如果未登录）
+        """
+        if not self.api_client.token:
+            return None
+        
+        try:
+            return await self.api_client.get("/api/users/me")
+        except Exception:
+            self.api_client.clear_token()
+            return None
+
+
+class AsyncArtistService:
+    """处理艺术家相关操作（异步）"""
+    
+    def __init__(self, api_client: AsyncApiClient):
+        """
+        初始化艺术家服务
+        
+        Args:
+            api_client: 异步API客户端实例
+        """
+        self.api_client = api_client
+    
+    async def get_all_artists(self) -> List[Dict]:
+        """
+        获取所有艺术家
+        
+        Returns:
+            艺术家列表
+        """
+        return await self.api_client.get("/api/artists")
+    
+    async def get_artist(self, artist_id: int) -> Dict:
+        """
+        获取特定艺术家详情
+        
+        Args:
+            artist_id: 艺术家ID
+            
+        Returns:
+            艺术家详情
+        """
+        return await self.api_client.get(f"/api/artists/{artist_id}")
+    
+    async def search_artists(self, name: str) -> List[Dict]:
+        """
+        搜索艺术家
+        
+        Args:
+            name: 艺术家名称
+            
+        Returns:
+            符合条件的艺术家列表
+        """
+        return await self.api_client.get("/api/artists/search", {"name": name})
+    
+    async def create_artist(self, name: str, bio: Optional[str] = None, avatar_url: Optional[str] = None) -> Dict:
+        """
+        创建新艺术家
+        
+        Args:
+            name: 艺术家名称
+            bio: 艺术家简介
+            avatar_url: 头像URL
+            
+        Returns:
+            创建的艺术家详情
+        """
+        data = {
+            "name": name,
+            "bio": bio or "",
+            "avatarUrl": avatar_url or ""
+        }
+        return await self.api_client.post("/api/artists", data)
+    
+    async def update_artist(self, artist_id: int, name: str, bio: Optional[str] = None,
+                            avatar_url: Optional[str] = None) -> Dict:
+        """
+        更新艺术家信息
+        
+        Args:
+            artist_id: 艺术家ID
+            name: 新名称
+            bio: 新简介
+            avatar_url: 新头像URL
+            
+        Returns:
+            更新后的艺术家详情
+        """
+        data = {
+            "name": name,
+            "bio": bio or "",
+            "avatarUrl": avatar_url or ""
+        }
+        return await self.api_client.put(f"/api/artists/{artist_id}", data)
+    
+    async def delete_artist(self, artist_id: int) -> None:
+        """
+        删除艺术家及其所有歌曲
+        
+        Args:
+            artist_id: 艺术家ID
+        """
+        await self.api_client.delete(f"/api/artists/{artist_id}")
+
+
+class AsyncPlaylistService:
+    """处理播放列表相关操作（异步）"""
+    
+    def __init__(self, api_client: AsyncApiClient):
+        """
+        初始化播放列表服务
+        
+        Args:
+            api_client: 异步API客户端实例
+        """
+        self.api_client = api_client
+    
+    async def get_my_playlists(self) -> List[Dict]:
+        """
+        获取当前用户的所有播放列表
+        
+        Returns:
+            播放列表列表
+        """
+        return await self.api_client.get("/api/playlists/me")
+    
+    async def get_user_playlists(self, user_id: int) -> List[Dict]:
+        """
+        获取指定用户的所有播放列表
+        
+        Args:
+            user_id: 用户ID
+            
+        Returns:
+            播放列表列表
+        """
+        return await self.api_client.get(f"/api/playlists/user/{user_id}")
+    
+    async def get_playlist(self, playlist_id: int) -> Dict:
+        """
+        获取播放列表详情
+        
+        Args:
+            playlist_id: 播放列表ID
+            
+        Returns:
+            播放列表详情
+        """
+        return await self.api_client.get(f"/api/playlists/{playlist_id}")
+    
+    async def get_playlists(self, playlist_ids: Iterable[int], max_concurrency: int = 32) -> List[Dict]:
+        """
+        并发获取多个播放列表的详情
+        
+        Args:
+            playlist_ids: 播放列表ID列表
+            max_concurrency: 最大并发请求数
+            
+        Returns:
+            播放列表详情，顺序与playlist_ids相同
+            
+        Raises:
+            ApiError: 任一请求失败
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(playlist_id: int) -> Dict:
+            async with semaphore:
+                return await self.get_playlist(playlist_id)
+        
+        return list(await asyncio.gather(*(fetch(playlist_id) for playlist_id in playlist_ids)))
+    
+    async def create_playlist(self, name: str, description: str = "") -> Dict:
+        """
+        创建新播放列表
+        
+        Args:
+            name: 播放列表名称
+            description: 播放列表描述
+            
+        Returns:
+            创建的播放列表详情
+        """
+        data = {
+            "name": name,
+            "description": description
+        }
+        return await self.api_client.post("/api/playlists", data)
+    
+    async def update_playlist(self, playlist_id: int, name: str, description: str) -> Dict:
+        """
+        更新播放列表
+        
+        Args:
+            playlist_id: 播放列表ID
+            name: 新名称
+            description: 新描述
+            
+        Returns:
+            更新后的播放列表详情
+        """
+        data = {
+            "name": name,
+            "description": description
+        }
+        return await self.api_client.put(f"/api/playlists/{playlist_id}", data)
+    
+    async def delete_playlist(self, playlist_id: int) -> None:
+        """
+        删除播放列表
+        
+        Args:
+            playlist_id: 播放列表ID
+        """
+        await self.api_client.delete(f"/api/playlists/{playlist_id}")
+    
+    async def add_song_to_playlist(self, playlist_id: int, song_id: int) -> Dict:
+        """
+        添加歌曲到播放列表
+        
+        Args:
+            playlist_id: 播放列表ID
+            song_id: 歌曲ID
+            
+        Returns:
+            更新后的播放列表详情
+        """
+        return await self.api_client.post(f"/api/playlists/{playlist_id}/songs/{song_id}")
+    
+    async def remove_song_from_playlist(self, playlist_id: int, song_id: int) -> Dict:
+        """
+        从播放列表移除歌曲
+        
+        Args:
+            playlist_id: 播放列表ID
+            song_id: 歌曲ID
+            
+        Returns:
+            更新后的播放列表详情
+        """
+        return await self.api_client.delete(f"/api/playlists/{playlist_id}/songs/{song_id}")
+
+
+class AsyncSongService:
+    """处理歌曲、专辑和艺术家相关操作（异步）"""
+    
+    def __init__(self, api_client: AsyncApiClient):
+        """
+        初始化歌曲服务
+        
+        Args:
+            api_client: 异步API客户端实例
+        """
+        self.api_client = api_client
+        
+        # 服务器是否支持批量提交播放次数（首次返回404等时记为不支持）
+        self.batch_plays_supported = True
+    
+    # 艺术家相关方法
+    async def get_all_artists(self) -> List[Dict]:
+        """
+        获取所有艺术家
+        
+        Returns:
+            艺术家列表
+        """
+        return await self.api_client.get("/api/artists")
+    
+    async def get_artist(self, artist_id: int) -> Dict:
+        """
+        获取特定艺术家详情
+        
+        Args:
+            artist_id: 艺术家ID
+            
+        Returns:
+            艺术家详情
+        """
+        return await self.api_client.get(f"/api/artists/{artist_id}")
+    
+    async def search_artists(self, name: str) -> List[Dict]:
+        """
+        搜索艺术家
+        
+        Args:
+            name: 艺术家名称
+            
+        Returns:
+            符合条件的艺术家列表
+        """
+        return await self.api_client.get("/api/artists/search", {"name": name})
+    
+    # 专辑相关方法
+    async def get_albums_by_artist(self, artist_id: int) -> List[Dict]:
+        """
+        获取艺术家的所有专辑
+        
+        Args:
+            artist_id: 艺术家ID
+            
+        Returns:
+            专辑列表
+        """
+        return await self.api_client.get(f"/api/albums/artist/{artist_id}")
+    
+    async def get_albums_for_artists(self, artist_ids: Iterable[int],
+                                     max_concurrency: int = 64) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """
+        并发获取多个艺术家的专辑，按完成顺序逐个返回结果
+        
+        所有请求在同一个事件循环中进行，同时在途的请求不超过max_concurrency；
+        提前退出迭代时取消尚未完成的请求。
+        
+        Args:
+            artist_ids: 艺术家ID列表
+            max_concurrency: 最大并发请求数
+            
+        Yields:
+            (艺术家ID, 专辑列表) 元组
+            
+        Raises:
+            ApiError: 任一请求失败
+        """
+        pending_ids = iter(artist_ids)
+        in_flight: Dict[asyncio.Task, int] = {}
+        
+        def submit_next() -> bool:
+            artist_id = next(pending_ids, None)
+            if artist_id is None:
+                return False
+            in_flight[asyncio.ensure_future(self.get_albums_by_artist(artist_id))] = artist_id
+            return True
+        
+        for _ in range(max_concurrency):
+            if not submit_next():
+                break
+        
+        try:
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    artist_id = in_flight.pop(task)
+                    yield artist_id, task.result()
+                    submit_next()
+        finally:
+            for task in in_flight:
+                task.cancel()
+    
+    async def get_album(self, album_id: int) -> Dict:
+        """
+        获取专辑详情
+        
+        Args:
+            album_id: 专辑ID
+            
+        Returns:
+            专辑详情
+        """
+        return await self.api_client.get(f"/api/albums/{album_id}")
+    
+    async def search_albums(self, title: str) -> List[Dict]:
+        """
+        搜索专辑
+        
+        Args:
+            title: 专辑标题
+            
+        Returns:
+            符合条件的专辑列表
+        """
+        return await self.api_client.get("/api/albums/search", {"title": title})
+    
+    # 增量同步
+    async def get_catalog_changes(self, since: Optional[str] = None) -> Optional[Dict]:
+        """
+        获取自水位线以来变更的歌曲、艺术家和专辑
+        
+        Args:
+            since: 上次同步返回的serverTime，为None时返回全部记录
+            
+        Returns:
+            变更数据（songs、artists、albums、deleted、serverTime），
+            服务器不支持增量同步时为None
+        """
+        params = {"since": since} if since else None
+        try:
+            return await self.api_client.get("/api/catalog/changes", params)
+        except ApiError as e:
+            if e.status_code in (404, 405, 501):
+                return None
+            raise
+    
+    # 歌曲相关方法
+    async def get_all_songs(self) -> List[Dict]:
+        """
+        获取所有歌曲
+        
+        Returns:
+            歌曲列表
+        """
+        return await self.api_client.get("/api/songs")
+    
+    async def get_song(self, song_id: int) -> Dict:
+        """
+        获取歌曲详情
+        
+        Args:
+            song_id: 歌曲ID
+            
+        Returns:
+            歌曲详情
+        """
+        return await self.api_client.get(f"/api/songs/{song_id}")
+    
+    async def get_songs_by_album(self, album_id: int) -> List[Dict]:
+        """
+        获取专辑中的所有歌曲
+        
+        Args:
+            album_id: 专辑ID
+            
+        Returns:
+            歌曲列表
+        """
+        return await self.api_client.get(f"/api/songs/album/{album_id}")
+    
+    async def get_songs_by_artist(self, artist_id: int) -> List[Dict]:
+        """
+        获取艺术家的所有歌曲
+        
+        Args:
+            artist_id: 艺术家ID
+            
+        Returns:
+            歌曲列表
+        """
+        return await self.api_client.get(f"/api/songs/artist/{artist_id}")
+    
+    async def search_songs(self, title: str) -> List[Dict]:
+        """
+        搜索歌曲
+        
+        Args:
+            title: 歌曲标题
+            
+        Returns:
+            符合条件的歌曲列表
+        """
+        return await self.api_client.get("/api/songs/search", {"title": title})
+    
+    async def get_top_songs(self) -> List[Dict]:
+        """
+        获取热门歌曲
+        
+        Returns:
+            热门歌曲列表
+        """
+        return await self.api_client.get("/api/songs/top")
+    
+    async def upload_song(self, title: str, artist_id: int, album_id: Optional[int], file_path: str) -> Dict:
+        """
+        上传新歌曲
+        
+        以一个multipart请求上传整个文件，不做内容去重、分块续传和进度回报；
+        需要这些功能时使用同步的SongService.upload_song。
+        
+        Args:
+            title: 歌曲标题
+            artist_id: 艺术家ID
+            album_id: 专辑ID (可选)
+            file_path: 本地文件路径
+            
+        Returns:
+            上传的歌曲详情
+        """
+        data = {
+            "title": title,
+            "artistId": artist_id
+        }
+        
+        if album_id:
+            data["albumId"] = album_id
+        
+        with open(file_path, "rb") as f:
+            files = {"file": (os.path.basename(file_path), f)}
+            return await self.api_client.post("/api/songs", data=data, files=files)
+    
+    async def increment_play_count(self, song_id: int) -> Dict:
+        """
+        增加歌曲播放次数
+        
+        Args:
+            song_id: 歌曲ID
+            
+        Returns:
+            更新后的歌曲详情
+        """
+        return await self.api_client.put(f"/api/songs/{song_id}/play")
+    
+    async def increment_play_counts(self, counts: Dict[int, int]) -> Dict[int, int]:
+        """
+        批量增加播放次数
+        
+        服务器支持时一次提交所有增量；否则逐首逐次调用increment_play_count，
+        遇到失败即停止，返回已成功的部分。
+        
+        Args:
+            counts: {歌曲ID: 增加的次数}
+            
+        Returns:
+            已成功提交的{歌曲ID: 次数}
+            
+        Raises:
+            Exception: 没有任何次数提交成功
+        """
+        if self.batch_plays_supported:
+            data = [{"songId": song_id, "count": count} for song_id, count in counts.items()]
+            try:
+                await self.api_client.post("/api/songs/plays", data)
+                return dict(counts)
+            except ApiError as e:
+                if e.status_code not in (404, 405, 501):
+                    raise
+                self.batch_plays_supported = False
+        
+        sent: Dict[int, int] = {}
+        for song_id, count in counts.items():
+            for _ in range(count):
+                try:
+                    await self.increment_play_count(song_id)
+                except Exception:
+                    if not sent:
+                        raise
+                    return sent
+                sent[song_id] = sent.get(song_id, 0) + 1
+        return sent
+    
+    async def delete_song(self, song_id: int) -> None:
+        """
+        删除歌曲
+        
+        Args:
+            song_id: 歌曲ID
+        """
+        return await self.api_client.delete(f"/api/songs/{song_id}")
@@ -0,0 +1,138 @@
+"""
+流式JSON解码 - 边下载边逐个解析大数组中的元素，不必等整个响应体到达
+"""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+_WHITESPACE = " \t\n\r"
+_TERMINATORS = ",:]}" + _WHITESPACE
+
+
+class _Reader:
+    """在逐块到达的文本上前进的读取位置"""
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+    
+    def fill(self) -> bool:
+        """
+        读入下一块数据
+        
+        Returns:
+            是否读到了新数据
+        """
+        if self.eof:
+            return False
+        # 已消费的部分超过一半时丢弃，缓冲区只保留未解析的数据
+        if self.pos > len(self.buf) // 2:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.buf += text
+                return True
+        self.buf += self._decoder.decode(b"", final=True)
+        self.eof = True
+        return False
+    
+    def peek(self) -> str:
+        """
+        跳过空白并返回下一个字符
+        
+        Returns:
+            下一个字符，数据结束时为空字符串
+        """
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.fill():
+                return ""
+    
+    def expect(self, char: str) -> None:
+        """读取指定的字符"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON格式错误：位置{self.pos}处应为{char!r}，实际为{found!r}")
+        self.pos += 1
+    
+    def value(self) -> Any:
+        """
+        解码一个完整的值
+        
+        值的文本还没有完整到达时读入更多数据后重试。数字没有结束符号，
+        可能只解析出已到达的一部分（例如"-4."中的-4），因此只有后面紧跟
+        分隔符或空白（或数据已结束）时才算完整。
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if (end < len(self.buf) and self.buf[end] in _TERMINATORS) or not self.fill():
+                self.pos = end
+                return value
+    
+    def find_key(self, key: str) -> None:
+        """在当前对象中跳到指定键的值之前，其他键的值整体跳过"""
+        self.expect("{")
+        while True:
+            if self.peek() == "}":
+                raise KeyError(key)
+            name = self.value()
+            self.expect(":")
+            if name == key:
+                return
+            self.value()
+            if self.peek() == ",":
+                self.pos += 1
+
+
+def iter_json_array(chunks: Iterable[bytes], item_path: Optional[Sequence[str]] = None) -> Iterator[Any]:
+    """
+    逐个解析JSON数组的元素
+    
+    Args:
+        chunks: 响应体的字节块
+        item_path: 数组在文档中的位置（逐层的对象键），为空时文档本身就是数组
+    
+    Yields:
+        数组元素（已解码的Python对象）
+    
+    Raises:
+        ValueError: JSON格式错误
+        KeyError: 文档中没有item_path指定的键
+    """
+    reader = _Reader(chunks)
+    for key in item_path or ():
+        reader.find_key(key)
+    
+    if reader.peek() == "n":
+        # 值为null，按空数组处理
+        reader.value()
+        return
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        char = reader.peek()
+        reader.pos += 1
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"JSON格式错误：位置{reader.pos - 1}处应为','或']'，实际为{char!r}")
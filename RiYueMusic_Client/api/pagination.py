@@ -0,0 +1,89 @@
+"""
+分页获取 - 把分页或游标接口包装成按页返回的迭代器，并提前获取下一页
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class Page(list):
+    """一页记录，last表示是否为最后一页"""
+    
+    def __init__(self, items: List[Dict], last: bool):
+        super().__init__(items)
+        self.last = last
+
+
+def parse_page(response: Any, page_size: int) -> Tuple[List[Dict], Optional[Dict]]:
+    """
+    解析一页响应
+    
+    支持三种格式：
+    - 列表：服务器不支持分页，返回的就是全部记录；
+    - {"content": [...], "last": bool}：按页码分页（Spring Data的Page格式）；
+    - {"items": [...], "nextCursor": ...}：按游标分页，nextCursor为空表示没有下一页。
+    
+    Args:
+        response: 解析后的JSON响应
+        page_size: 请求的每页记录数
+    
+    Returns:
+        (本页记录, 获取下一页需要的参数)，没有下一页时参数为None
+    """
+    if response is None:
+        return [], None
+    if isinstance(response, list):
+        return response, None
+    
+    if "items" in response:
+        items = response.get("items") or []
+        cursor = response.get("nextCursor")
+        return items, ({"cursor": cursor} if cursor else None)
+    
+    items = response.get("content") or []
+    last = response.get("last")
+    if last is None:
+        last = len(items) < page_size
+    if last or not items:
+        return items, None
+    return items, {"page": int(response.get("number", 0)) + 1}
+
+
+def iter_pages(fetch: Callable[[Dict], Any], params: Optional[Dict] = None,
+               page_size: int = 200, prefetch: bool = True) -> Iterator[Page]:
+    """
+    按页获取记录
+    
+    生成器只在需要时获取下一页：调用方处理本页时，下一页已经在后台请求，
+    停止迭代（或关闭生成器）后不再发出新的请求。
+    
+    Args:
+        fetch: 发送请求的函数，参数为URL参数，返回解析后的JSON响应
+        params: 固定的URL参数（例如搜索关键词）
+        page_size: 每页记录数
+        prefetch: 是否在返回本页之前提前请求下一页
+    
+    Yields:
+        每页的记录（服务器不支持分页时只有一页，包含全部记录）
+    
+    Raises:
+        Exception: 请求失败
+    """
+    base = {**(params or {}), "size": page_size}
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        items, next_params = parse_page(fetch({**base, "page": 0}), page_size)
+        while True:
+            future = None
+            if next_params is not None and executor is not None:
+                future = executor.submit(fetch, {**base, **next_params})
+            
+            yield Page(items, next_params is None)
+            
+            if next_params is None:
+                return
+            response = future.result() if future is not None else fetch({**base, **next_params})
+            items, next_params = parse_page(response, page_size)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
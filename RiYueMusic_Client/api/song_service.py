@@ -2,22 +2,62 @@
 歌曲服务 - 处理歌曲、专辑和艺术家相关操作
 """
 
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import os
-from .api_client import ApiClient
+import threading
+import time
+import requests
+from .api_client import ApiClient, ApiError
+from .pagination import Page, iter_pages
+from ..utils.content_hash import ContentIndex, PendingUploads, hash_file, pending_uploads_path
+from ..utils.multipart import MultipartEncoder, UploadCancelled
 
 
 class SongService:
     """处理歌曲、专辑和艺术家相关操作"""
     
-    def __init__(self, api_client: ApiClient):
+    def __init__(self, api_client: ApiClient, content_index: Optional[ContentIndex] = None,
+                 pending_uploads: Optional[PendingUploads] = None):
         """
         初始化歌曲服务
         
         Args:
             api_client: API客户端实例
+            content_index: 已上传内容的索引，为None时不检查重复上传
+            pending_uploads: 未完成的分块上传记录，默认保存在内容索引旁；
+                             没有内容索引时只保存在内存中
         """
         self.api_client = api_client
+        self.content_index = content_index
+        
+        # 服务器是否支持批量提交播放次数（首次返回404等时记为不支持）
+        self.batch_plays_supported = True
+        
+        # 服务器是否支持分块续传上传，以及未完成的上传 (路径, 大小, 修改时间) → 上传ID
+        self.resumable_uploads_supported = True
+        if pending_uploads is None:
+            pending_uploads = PendingUploads(
+                pending_uploads_path(content_index.path) if content_index is not None else None
+            )
+        self.pending_uploads = pending_uploads
+    
+    def _iter_pages(self, endpoint: str, params: Optional[Dict], page_size: int,
+                    prefetch: bool) -> Iterator[Page]:
+        """
+        按页获取列表接口的记录
+        
+        Args:
+            endpoint: API端点
+            params: 固定的URL参数
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页的记录列表
+        """
+        return iter_pages(lambda page_params: self.api_client.get(endpoint, page_params),
+                          params, page_size, prefetch)
     
     # 艺术家相关方法
     def get_all_artists(self) -> List[Dict]:
@@ -29,6 +69,51 @@ class SongService:
         """
         return self.api_client.get("/api/artists")
     
+    def _stream_batches(self, endpoint: str, batch_size: int) -> Iterator[List[Dict]]:
+        """
+        流式获取列表接口的全部记录，按批返回
+        
+        Args:
+            endpoint: API端点
+            batch_size: 每批记录数
+            
+        Yields:
+            每批记录（最后一批可能不满）
+        """
+        batch = []
+        for item in self.api_client.get_stream(endpoint):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def stream_artists(self, batch_size: int = 500) -> Iterator[List[Dict]]:
+        """
+        流式获取所有艺术家（一次请求，边下载边解析）
+        
+        Args:
+            batch_size: 每批记录数
+            
+        Yields:
+            每批艺术家
+        """
+        return self._stream_batches("/api/artists", batch_size)
+    
+    def iter_artists(self, page_size: int = 200, prefetch: bool = True) -> Iterator[Page]:
+        """
+        按页获取所有艺术家（服务器不支持分页时只有一页）
+        
+        Args:
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页的艺术家列表
+        """
+        return self._iter_pages("/api/artists", None, page_size, prefetch)
+    
     def get_artist(self, artist_id: int) -> Dict:
         """
         获取特定艺术家详情
@@ -53,6 +138,20 @@ class SongService:
         """
         return self.api_client.get("/api/artists/search", {"name": name})
     
+    def iter_search_artists(self, name: str, page_size: int = 200, prefetch: bool = True) -> Iterator[Page]:
+        """
+        按页搜索艺术家
+        
+        Args:
+            name: 艺术家名称
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页符合条件的艺术家
+        """
+        return self._iter_pages("/api/artists/search", {"name": name}, page_size, prefetch)
+    
     # 专辑相关方法
     def get_albums_by_artist(self, artist_id: int) -> List[Dict]:
         """
@@ -66,6 +165,76 @@ class SongService:
         """
         return self.api_client.get(f"/api/albums/artist/{artist_id}")
     
+    def get_albums_for_artists(self, artist_ids: Iterable[int], max_workers: int = 8,
+                               cancel_event: Optional[threading.Event] = None) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        并发获取多个艺术家的专辑，按完成顺序逐个返回结果
+        
+        同时进行的请求数不超过max_workers，取消后不再提交新请求，
+        已发出的请求完成后直接丢弃。
+        
+        Args:
+            artist_ids: 艺术家ID列表
+            max_workers: 最大并发请求数
+            cancel_event: 取消事件，置位后停止获取
+            
+        Yields:
+            (艺术家ID, 专辑列表) 元组
+            
+        Raises:
+            Exception: 任一请求失败
+        """
+        pending_ids = iter(artist_ids)
+        cancel_event = cancel_event or threading.Event()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
+            
+            def submit_next() -> bool:
+                artist_id = next(pending_ids, None)
+                if artist_id is None:
+                    return False
+                future = executor.submit(self.get_albums_by_artist, artist_id)
+                in_flight[future] = artist_id
+                return True
+            
+            # 只保持max_workers个请求在途，避免一次性为所有艺术家排队
+            for _ in range(max_workers):
+                if not submit_next():
+                    break
+            
+            try:
+                while in_flight and not cancel_event.is_set():
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        artist_id = in_flight.pop(future)
+                        albums = future.result()
+                        if cancel_event.is_set():
+                            break
+                        yield artist_id, albums
+                        submit_next()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+    
+    def create_album(self, title: str, artist_id: int) -> Dict:
+        """
+        创建新专辑
+        
+        Args:
+            title: 专辑名称
+            artist_id: 艺术家ID
+            
+        Returns:
+            创建的专辑详情
+        """
+        data = {
+            "title": title,
+            "artistId": artist_id
+        }
+        
+        return self.api_client.post("/api/albums", data)
+    
     def get_album(self, album_id: int) -> Dict:
         """
         获取专辑详情
@@ -90,6 +259,40 @@ class SongService:
         """
         return self.api_client.get("/api/albums/search", {"title": title})
     
+    def iter_search_albums(self, title: str, page_size: int = 200, prefetch: bool = True) -> Iterator[Page]:
+        """
+        按页搜索专辑
+        
+        Args:
+            title: 专辑标题
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页符合条件的专辑
+        """
+        return self._iter_pages("/api/albums/search", {"title": title}, page_size, prefetch)
+    
+    # 增量同步
+    def get_catalog_changes(self, since: Optional[str] = None) -> Optional[Dict]:
+        """
+        获取自水位线以来变更的歌曲、艺术家和专辑
+        
+        Args:
+            since: 上次同步返回的serverTime，为None时返回全部记录
+            
+        Returns:
+            变更数据（songs、artists、albums、deleted、serverTime），
+            服务器不支持增量同步时为None
+        """
+        params = {"since": since} if since else None
+        try:
+            return self.api_client.get("/api/catalog/changes", params)
+        except ApiError as e:
+            if e.status_code in (404, 405, 501):
+                return None
+            raise
+    
     # 歌曲相关方法
     def get_all_songs(self) -> List[Dict]:
         """
@@ -100,6 +303,31 @@ class SongService:
         """
         return self.api_client.get("/api/songs")
     
+    def stream_songs(self, batch_size: int = 500) -> Iterator[List[Dict]]:
+        """
+        流式获取所有歌曲（一次请求，边下载边解析）
+        
+        Args:
+            batch_size: 每批记录数
+            
+        Yields:
+            每批歌曲
+        """
+        return self._stream_batches("/api/songs", batch_size)
+    
+    def iter_songs(self, page_size: int = 500, prefetch: bool = True) -> Iterator[Page]:
+        """
+        按页获取所有歌曲（服务器不支持分页时只有一页）
+        
+        Args:
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页的歌曲列表
+        """
+        return self._iter_pages("/api/songs", None, page_size, prefetch)
+    
     def get_song(self, song_id: int) -> Dict:
         """
         获取歌曲详情
@@ -148,6 +376,20 @@ class SongService:
         """
         return self.api_client.get("/api/songs/search", {"title": title})
     
+    def iter_search_songs(self, title: str, page_size: int = 200, prefetch: bool = True) -> Iterator[Page]:
+        """
+        按页搜索歌曲
+        
+        Args:
+            title: 歌曲标题
+            page_size: 每页记录数
+            prefetch: 是否提前请求下一页
+            
+        Yields:
+            每页符合条件的歌曲
+        """
+        return self._iter_pages("/api/songs/search", {"title": title}, page_size, prefetch)
+    
     def get_top_songs(self) -> List[Dict]:
         """
         获取热门歌曲
@@ -157,18 +399,33 @@ class SongService:
         """
         return self.api_client.get("/api/songs/top")
     
-    def upload_song(self, title: str, artist_id: int, album_id: Optional[int], file_path: str) -> Dict:
+    def upload_song(self, title: str, artist_id: int, album_id: Optional[int], file_path: str,
+                    progress: Optional[Callable[[Tuple[int, int]], None]] = None,
+                    cancel_event: Optional[threading.Event] = None,
+                    chunk_size: int = 4 * 1024 * 1024,
+                    content_hash: Optional[str] = None) -> Dict:
         """
         上传新歌曲
         
+        有内容索引时先计算文件哈希，相同内容已上传过且歌曲仍存在时直接返回
+        已有的歌曲，不再上传。
+        
+        服务器支持分块上传时按块上传，每块失败会重试，整体失败后再次调用
+        （包括重启程序后）会从服务器已收到的位置继续；否则以流式multipart请求上传。
+        两种方式都只在内存中保留一块数据。
+        
         Args:
             title: 歌曲标题
             artist_id: 艺术家ID
             album_id: 专辑ID (可选)
             file_path: 本地文件路径
+            progress: 进度回调，参数为(已上传字节数, 总字节数)元组
+            cancel_event: 取消事件，置位后停止上传并抛出UploadCancelled
+            chunk_size: 分块上传时每块的字节数
+            content_hash: 已经算好的文件哈希（例如批量导入时），为None时按需计算
             
         Returns:
-            上传的歌曲详情
+            上传的歌曲详情；内容重复时为已有歌曲的详情，并带有"duplicate": True
         """
         data = {
             "title": title,
@@ -178,14 +435,151 @@ class SongService:
         if album_id:
             data["albumId"] = album_id
         
-        files = {
-            "file": (os.path.basename(file_path), open(file_path, "rb"))
-        }
+        # 进度只在百分比变化时回报，避免每块都刷新界面
+        last_percent = [-1]
+        
+        def report(sent: int, total: int) -> None:
+            percent = sent * 100 // total if total else 100
+            if progress is not None and percent != last_percent[0]:
+                last_percent[0] = percent
+                progress((sent, total))
+        
+        if self.content_index is not None:
+            content_hash = content_hash or hash_file(file_path)
+            existing = self._find_uploaded(content_hash)
+            if existing is not None:
+                return {**existing, "duplicate": True}
+        
+        song = self._upload_resumable(data, file_path, chunk_size, report, cancel_event)
+        if song is None:
+            body = MultipartEncoder(data, "file", file_path, progress=report, cancel_event=cancel_event)
+            song = self.api_client.send_body("POST", "/api/songs", body, body.content_type)
+        
+        if self.content_index is not None and song and song.get("id") is not None:
+            self.content_index.add(content_hash, song["id"])
+        return song
+    
+    def _find_uploaded(self, content_hash: str) -> Optional[Dict]:
+        """
+        查找已上传过的相同内容
+        
+        Args:
+            content_hash: 内容哈希
+            
+        Returns:
+            仍然存在的歌曲详情，没有时为None
+        """
+        song_id = self.content_index.lookup(content_hash)
+        if song_id is None:
+            return None
         
         try:
-            return self.api_client.post("/api/songs", data=data, files=files)
-        finally:
-            files["file"][1].close()
+            return self.get_song(song_id)
+        except ApiError as e:
+            if e.status_code != 404:
+                raise
+            # 歌曲已在别处删除
+            self.content_index.forget_song(song_id)
+            return None
+    
+    def _upload_resumable(self, data: Dict, file_path: str, chunk_size: int,
+                          report: Callable[[int, int], None],
+                          cancel_event: Optional[threading.Event],
+                          max_retries: int = 3) -> Optional[Dict]:
+        """
+        分块续传上传
+        
+        协议：POST /api/uploads 创建上传会话，返回uploadId、已收到的offset和
+        可选的chunkSize；PUT /api/uploads/{id} 按Content-Range上传每块，
+        返回新的offset；GET /api/uploads/{id} 查询offset；
+        POST /api/uploads/{id}/complete 完成上传并返回歌曲详情。
+        
+        Args:
+            data: 歌曲信息字段
+            file_path: 本地文件路径
+            chunk_size: 每块的字节数
+            report: 进度回调
+            cancel_event: 取消事件
+            max_retries: 每块的最大重试次数
+            
+        Returns:
+            上传的歌曲详情，服务器不支持分块上传时为None
+        """
+        if not self.resumable_uploads_supported:
+            return None
+        
+        size = os.path.getsize(file_path)
+        key = (os.path.abspath(file_path), size, int(os.path.getmtime(file_path)))
+        upload_id = self.pending_uploads.get(key)
+        offset = 0
+        
+        if upload_id is not None:
+            # 续传：从服务器已收到的位置继续
+            try:
+                offset = int(self.api_client.get(f"/api/uploads/{upload_id}").get("offset", 0))
+            except ApiError:
+                # 会话已在服务器上过期
+                self.pending_uploads.discard(key)
+                upload_id = None
+        
+        if upload_id is None:
+            try:
+                session = self.api_client.post(
+                    "/api/uploads", {**data, "filename": os.path.basename(file_path), "size": size}
+                )
+            except ApiError as e:
+                if e.status_code not in (404, 405, 501):
+                    raise
+                self.resumable_uploads_supported = False
+                return None
+            upload_id = str(session["uploadId"])
+            offset = int(session.get("offset", 0))
+            chunk_size = int(session.get("chunkSize") or chunk_size)
+            self.pending_uploads.set(key, upload_id)
+        
+        with open(file_path, "rb") as f:
+            failures = 0
+            while offset < size:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise UploadCancelled("上传已取消")
+                
+                f.seek(offset)
+                chunk = f.read(chunk_size)
+                end = offset + len(chunk) - 1
+                try:
+                    result = self.api_client.send_body(
+                        "PUT", f"/api/uploads/{upload_id}", chunk, "application/octet-stream",
+                        {"Content-Range": f"bytes {offset}-{end}/{size}"}
+                    )
+                except (requests.RequestException, ApiError) as e:
+                    if isinstance(e, ApiError) and e.status_code < 500 or failures >= max_retries:
+                        raise
+                    failures += 1
+                    delay = 0.5 * 2 ** failures
+                    if cancel_event is None:
+                        time.sleep(delay)
+                    elif cancel_event.wait(delay):
+                        raise UploadCancelled("上传已取消")
+                    # 失败的块可能已被部分接收，以服务器记录的位置为准
+                    try:
+                        offset = int(self.api_client.get(f"/api/uploads/{upload_id}").get("offset", offset))
+                    except (requests.RequestException, ApiError):
+                        pass
+                    continue
+                
+                failures = 0
+                new_offset = int((result or {}).get("offset", end + 1))
+                if new_offset <= offset:
+                    # 服务器接受了这一块却没有前进，继续上传只会原地循环；丢弃会话，下次重新上传
+                    self.pending_uploads.discard(key)
+                    raise ApiError(f"PUT /api/uploads/{upload_id} did not advance the offset "
+                                   f"({offset} -> {new_offset})", 200)
+                offset = new_offset
+                report(offset, size)
+        
+        song = self.api_client.post(f"/api/uploads/{upload_id}/complete")
+        self.pending_uploads.discard(key)
+        return song
     
     def increment_play_count(self, song_id: int) -> Dict:
         """
@@ -199,6 +593,44 @@ class SongService:
         """
         return self.api_client.put(f"/api/songs/{song_id}/play")
     
+    def increment_play_counts(self, counts: Dict[int, int]) -> Dict[int, int]:
+        """
+        批量增加播放次数
+        
+        服务器支持时一次提交所有增量；否则逐首逐次调用increment_play_count，
+        遇到失败即停止，返回已成功的部分。
+        
+        Args:
+            counts: {歌曲ID: 增加的次数}
+            
+        Returns:
+            已成功提交的{歌曲ID: 次数}
+            
+        Raises:
+            Exception: 没有任何次数提交成功
+        """
+        if self.batch_plays_supported:
+            data = [{"songId": song_id, "count": count} for song_id, count in counts.items()]
+            try:
+                self.api_client.post("/api/songs/plays", data)
+                return dict(counts)
+            except ApiError as e:
+                if e.status_code not in (404, 405, 501):
+                    raise
+                self.batch_plays_supported = False
+        
+        sent: Dict[int, int] = {}
+        for song_id, count in counts.items():
+            for _ in range(count):
+                try:
+                    self.increment_play_count(song_id)
+                except Exception:
+                    if not sent:
+                        raise
+                    return sent
+                sent[song_id] = sent.get(song_id, 0) + 1
+        return sent
+    
     def delete_song(self, song_id: int) -> None:
         """
         删除歌曲
@@ -206,4 +638,7 @@ class SongService:
         Args:
             song_id: 歌曲ID
         """
-        return self.api_client.delete(f"/api/songs/{song_id}")
\ No newline at end of file
+        result = self.api_client.delete(f"/api/songs/{song_id}")
+        if self.content_index is not None:
+            self.content_index.forget_song(song_id)
+        return result
\ No newline at end of file
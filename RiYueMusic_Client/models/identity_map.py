@@ -0,0 +1,175 @@
+"""
+实体身份映射 - 保证同一ID的歌曲、艺术家和专辑在内存中只有一个对象
+"""
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# 变更回调，参数为(实体对象, 变化的字段名集合)
+ChangeListener = Callable[[Any, Set[str]], None]
+
+
+class IdentityMap:
+    """
+    实体身份映射
+
+    按(类型, ID)弱引用保存每个实体的唯一实例：没有任何地方引用的实体会被回收。
+    同一实体的新数据合并到已有实例上（只合并数据中出现的字段），
+    字段发生变化时通知订阅该类型的监听者，绑定的视图据此刷新对应的行。
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entities: Dict[type, weakref.WeakValueDictionary] = {}
+        self._listeners: Dict[type, List[Any]] = {}
+
+    def _table(self, cls: type) -> weakref.WeakValueDictionary:
+        table = self._entities.get(cls)
+        if table is None:
+            table = self._entities[cls] = weakref.WeakValueDictionary()
+        return table
+
+    def has_any(self, cls: type) -> bool:
+        """
+        是否有某一类型的存活实例
+
+        Args:
+            cls: 实体类型
+
+        Returns:
+            有存活实例时为True
+        """
+        return bool(self._entities.get(cls))
+
+    def get(self, cls: type, entity_id: Any) -> Optional[Any]:
+        """
+        获取已存在的实例
+
+        Args:
+            cls: 实体类型
+            entity_id: 实体ID
+
+        Returns:
+            实例，不存在或已被回收时为None
+        """
+        table = self._entities.get(cls)
+        if not table:
+            return None
+        return table.get(entity_id)
+
+    def resolve(self, cls: type, data: dict) -> Any:
+        """
+        由接口数据获取实体的唯一实例
+
+        已有实例时把数据合并进去并返回该实例，否则创建新实例并登记。
+        没有ID的数据不登记，直接返回新对象。
+
+        Args:
+            cls: 实体类型（需提供_build和FIELD_KEYS）
+            data: 接口返回的字典
+
+        Returns:
+            实体对象
+        """
+        entity_id = data.get('id')
+        if entity_id is None:
+            return cls._build(data)
+
+        with self._lock:
+            table = self._table(cls)
+            entity = table.get(entity_id)
+            if entity is None:
+                entity = table[entity_id] = cls._build(data)
+                return entity
+
+            # 先比较原始值，只有确实变化时才构建新对象取得转换后的字段值
+            changed = {name for name, key in cls.FIELD_KEYS.items()
+                       if key in data and getattr(entity, name) != data[key]}
+            if changed:
+                fresh = cls._build(data)
+                for name in changed:
+                    setattr(entity, name, getattr(fresh, name))
+
+        if changed:
+            self._notify(entity, changed)
+        return entity
+
+    def merge_existing(self, cls: type, data: dict) -> None:
+        """
+        只把数据合并到已存在的实例（不创建新实例），用于不保存实体对象的列式存储
+
+        Args:
+            cls: 实体类型
+            data: 接口返回的字典
+        """
+        if self.get(cls, data.get('id')) is not None:
+            self.resolve(cls, data)
+
+    def adopt(self, entity: Any) -> Any:
+        """
+        登记在别处创建的实体对象
+
+        Args:
+            entity: 实体对象
+
+        Returns:
+            已存在的唯一实例；还没有时登记并返回entity本身
+        """
+        if entity.id is None:
+            return entity
+        with self._lock:
+            return self._table(type(entity)).setdefault(entity.id, entity)
+
+    def update(self, entity: Any, **changes: Any) -> None:
+        """
+        在本地修改实体字段并通知监听者（例如本地记录的播放次数）
+
+        Args:
+            entity: 实体对象（应为唯一实例）
+            **changes: 字段名和新值
+        """
+        changed = set()
+        with self._lock:
+            for name, value in changes.items():
+                if getattr(entity, name) != value:
+                    setattr(entity, name, value)
+                    changed.add(name)
+        if changed:
+            self._notify(entity, changed)
+
+    def subscribe(self, cls: type, listener: ChangeListener) -> None:
+        """
+        订阅某一类型实体的字段变化
+
+        绑定方法只保存弱引用，对象销毁后自动取消订阅。
+        回调在修改发生的线程中调用，界面对象需要自行转到主线程。
+
+        Args:
+            cls: 实体类型
+            listener: 变更回调
+        """
+        ref = weakref.WeakMethod(listener) if hasattr(listener, "__self__") else (lambda: listener)
+        with self._lock:
+            self._listeners.setdefault(cls, []).append(ref)
+
+    def _notify(self, entity: Any, changed: Set[str]) -> None:
+        """通知监听者，顺便清理已销毁对象的订阅"""
+        with self._lock:
+            refs = self._listeners.get(type(entity))
+            if not refs:
+                return
+            listeners = [ref() for ref in refs]
+            refs[:] = [ref for ref, listener in zip(refs, listeners) if listener is not None]
+        for listener in listeners:
+            if listener is not None:
+                listener(entity, changed)
+
+    def clear(self) -> None:
+        """清空所有实例（例如切换用户时）"""
+        with self._lock:
+            self._entities.clear()
+
+
+# 全局身份映射，各实体类的from_dict都经过它
+identity_map = IdentityMap()
@@ -3,23 +3,51 @@
 """
 
 from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from typing import List, Optional
 from datetime import datetime
 from .song import Song
 
 
+@lru_cache(maxsize=1024)
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    解析服务器返回的ISO时间戳（结果缓存，相同的字符串只解析一次）
+
+    Args:
+        value: 时间戳字符串，例如2024-01-01T00:00:00Z
+
+    Returns:
+        时间对象，为空或格式错误时为None
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
 @dataclass
 class Playlist:
-    """播放列表信息类"""
+    """
+    播放列表信息类
+    
+    from_dict只取出摘要字段（ID、名称、歌曲数、版本），歌曲数据原样保存，
+    首次访问songs时才创建歌曲对象；时间戳同样在首次访问时解析，之后都使用缓存的结果。
+    """
     id: int
     name: str
     user_id: int
     username: str
     description: Optional[str] = None
     cover_url: Optional[str] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
-    songs: List[Song] = field(default_factory=list)
+    song_count: int = 0
+    # 服务器的updatedAt原文，内容变化时随之变化，用于判断缓存的内容是否仍然有效
+    version: Optional[str] = None
+    created_text: Optional[str] = None
+    # 歌曲原始数据，为None表示摘要中不包含歌曲（需要另外获取播放列表详情）
+    songs_data: Optional[List[dict]] = field(default=None, repr=False)
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Playlist':
@@ -28,27 +56,14 @@ class Playlist:
         
         Args:
             data: 包含播放列表信息的字典
-            
+        
         Returns:
             播放列表对象
         """
-        created_at = None
-        if 'createdAt' in data and data['createdAt']:
-            try:
-                created_at = datetime.fromisoformat(data['createdAt'].replace('Z', '+00:00'))
-            except (ValueError, TypeError):
-                pass
-        
-        updated_at = None
-        if 'updatedAt' in data and data['updatedAt']:
-            try:
-                updated_at = datetime.fromisoformat(data['updatedAt'].replace('Z', '+00:00'))
-            except (ValueError, TypeError):
-                pass
-        
-        songs = []
-        if 'songs' in data and data['songs']:
-            songs = [Song.from_dict(song_data) for song_data in data['songs']]
+        songs_data = data.get('songs')
+        song_count = data.get('songCount')
+        if song_count is None:
+            song_count = len(songs_data) if songs_data else 0
         
         return cls(
             id=data.get('id'),
@@ -57,7 +72,28 @@ class Playlist:
             username=data.get('username'),
             description=data.get('description'),
             cover_url=data.get('coverUrl'),
-            created_at=created_at,
-            updated_at=updated_at,
-            songs=songs
-        )
\ No newline at end of file
+            song_count=song_count,
+            version=data.get('updatedAt'),
+            created_text=data.get('createdAt'),
+            songs_data=songs_data
+        )
+    
+    @property
+    def is_hydrated(self) -> bool:
+        """是否已包含歌曲数据"""
+        return self.songs_data is not None
+    
+    @cached_property
+    def songs(self) -> List[Song]:
+        """播放列表中的歌曲（首次访问时创建，未包含歌曲数据时为空列表）"""
+        return [Song.from_dict(song_data) for song_data in self.songs_data or []]
+    
+    @cached_property
+    def created_at(self) -> Optional[datetime]:
+        """创建时间"""
+        return parse_timestamp(self.created_text)
+    
+    @cached_property
+    def updated_at(self) -> Optional[datetime]:
+        """更新时间"""
+        return parse_timestamp(self.version)
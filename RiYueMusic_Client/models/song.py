@@ -2,11 +2,27 @@
 歌曲相关模型 - 表示歌曲、专辑和艺术家
 """
 
+import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, ClassVar, Dict, List, Optional
 
+from .identity_map import identity_map
 
-@dataclass
+
+def intern_text(value: Any) -> Any:
+    """
+    驻留重复出现的字符串（例如艺术家名、专辑名），相同内容只保留一份
+    
+    Args:
+        value: 字段值
+        
+    Returns:
+        驻留后的字符串；不是字符串时原样返回
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True, weakref_slot=True)
 class Artist:
     """艺术家信息类"""
     id: int
@@ -14,10 +30,15 @@ class Artist:
     bio: Optional[str] = None
     avatar_url: Optional[str] = None
     
+    # 字段名 → 接口字段名
+    FIELD_KEYS: ClassVar[Dict[str, str]] = {'id': 'id', 'name': 'name', 'bio': 'bio', 'avatar_url': 'avatarUrl'}
+    
     @classmethod
     def from_dict(cls, data: dict) -> 'Artist':
         """
-        从字典创建艺术家对象
+        从字典获取艺术家对象
+        
+        同一ID的艺术家只有一个实例，新数据合并到已有实例上，见IdentityMap。
         
         Args:
             data: 包含艺术家信息的字典
@@ -25,15 +46,20 @@ class Artist:
         Returns:
             艺术家对象
         """
+        return identity_map.resolve(cls, data)
+    
+    @classmethod
+    def _build(cls, data: dict) -> 'Artist':
+        """从字典创建新的艺术家对象（不经过身份映射）"""
         return cls(
             id=data.get('id'),
-            name=data.get('name'),
+            name=intern_text(data.get('name')),
             bio=data.get('bio'),
             avatar_url=data.get('avatarUrl')
         )
 
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class Album:
     """专辑信息类"""
     id: int
@@ -43,10 +69,18 @@ class Album:
     release_date: Optional[str] = None
     cover_url: Optional[str] = None
     
+    # 字段名 → 接口字段名
+    FIELD_KEYS: ClassVar[Dict[str, str]] = {
+        'id': 'id', 'title': 'title', 'artist_id': 'artistId', 'artist_name': 'artistName',
+        'release_date': 'releaseDate', 'cover_url': 'coverUrl'
+    }
+    
     @classmethod
     def from_dict(cls, data: dict) -> 'Album':
         """
-        从字典创建专辑对象
+        从字典获取专辑对象
+        
+        同一ID的专辑只有一个实例，新数据合并到已有实例上，见IdentityMap。
         
         Args:
             data: 包含专辑信息的字典
@@ -54,17 +88,22 @@ class Album:
         Returns:
             专辑对象
         """
+        return identity_map.resolve(cls, data)
+    
+    @classmethod
+    def _build(cls, data: dict) -> 'Album':
+        """从字典创建新的专辑对象（不经过身份映射）"""
         return cls(
             id=data.get('id'),
             title=data.get('title'),
             artist_id=data.get('artistId'),
-            artist_name=data.get('artistName'),
-            release_date=data.get('releaseDate'),
+            artist_name=intern_text(data.get('artistName')),
+            release_date=intern_text(data.get('releaseDate')),
             cover_url=data.get('coverUrl')
         )
 
 
-@dataclass
+@dataclass(slots=True, weakref_slot=True)
 class Song:
     """歌曲信息类"""
     id: int
@@ -78,10 +117,19 @@ class Song:
     lyric_url: Optional[str] = None
     play_count: int = 0
     
+    # 字段名 → 接口字段名
+    FIELD_KEYS: ClassVar[Dict[str, str]] = {
+        'id': 'id', 'title': 'title', 'artist_id': 'artistId', 'artist_name': 'artistName',
+        'album_id': 'albumId', 'album_title': 'albumTitle', 'duration': 'duration',
+        'file_url': 'fileUrl', 'lyric_url': 'lyricUrl', 'play_count': 'playCount'
+    }
+    
     @classmethod
     def from_dict(cls, data: dict) -> 'Song':
         """
-        从字典创建歌曲对象
+        从字典获取歌曲对象
+        
+        同一ID的歌曲只有一个实例，新数据合并到已有实例上，见IdentityMap。
         
         Args:
             data: 包含歌曲信息的字典
@@ -89,14 +137,19 @@ class Song:
         Returns:
             歌曲对象
         """
+        return identity_map.resolve(cls, data)
+    
+    @classmethod
+    def _build(cls, data: dict) -> 'Song':
+        """从字典创建新的歌曲对象（不经过身份映射）"""
         return cls(
             id=data.get('id'),
             title=data.get('title'),
             artist_id=data.get('artistId'),
-            artist_name=data.get('artistName'),
+            artist_name=intern_text(data.get('artistName')),
             album_id=data.get('albumId'),
-            album_title=data.get('albumTitle'),
-            duration=data.get('duration'),
+            album_title=intern_text(data.get('albumTitle')),
+            duration=intern_text(data.get('duration')),
             file_url=data.get('fileUrl'),
             lyric_url=data.get('lyricUrl'),
             play_count=data.get('playCount', 0)
@@ -0,0 +1,320 @@
+"""
+歌曲表 - 以列存储大量歌曲，按行提供轻量的只读视图
+"""
+
+from array import array
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .identity_map import identity_map
+from .song import Song
+
+# 整数列中表示None的值（ID和播放次数都不会是负数）
+_NONE = -1
+
+
+class _StringPool:
+    """字符串池：重复的字符串只保存一份，列中只存编号（0表示None）"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _split_url(url: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """把URL拆成共享的前缀（到最后一个/为止）和文件名"""
+    if not url:
+        return None, url
+    prefix, slash, name = url.rpartition("/")
+    if not slash:
+        return None, url
+    return prefix + slash, name
+
+
+class SongRow:
+    """
+    歌曲表中一行的只读视图
+
+    属性与Song相同，读取时才从表中取值；to_song()获取对应的Song对象。
+    """
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: "SongTable", row: int):
+        self.table = table
+        self.row = row
+
+    def to_song(self) -> Song:
+        """
+        获取这一行的Song对象
+
+        Returns:
+            歌曲对象
+        """
+        return self.table.entity(self.row)
+
+    def __repr__(self) -> str:
+        return f"SongRow({self.row}, id={self.id!r}, title={self.title!r})"
+
+
+def _row_property(name: str) -> property:
+    def getter(view: SongRow) -> Any:
+        return view.table.get(view.row, name)
+    return property(getter)
+
+
+for _name in (f.name for f in fields(Song)):
+    setattr(SongRow, _name, _row_property(_name))
+
+
+class SongTable:
+    """
+    列式存储的歌曲表
+
+    整数字段保存在array中，艺术家名、专辑名、时长和URL前缀放入字符串池，
+    每行只占几个机器字，而不是一个Song对象加上各个字段的对象。
+    接口与CompactEntityStore相同，可以直接作为CatalogListModel的存储。
+    """
+
+    FIELD_NAMES = [f.name for f in fields(Song)]
+
+    def __init__(self, songs: Iterable[dict] = ()):
+        """
+        初始化歌曲表
+
+        Args:
+            songs: 初始的歌曲字典列表
+        """
+        self.clear()
+        self.extend_dicts(songs)
+
+    def clear(self) -> None:
+        """清空歌曲表"""
+        self._ids = array("q")
+        self._artist_ids = array("q")
+        self._album_ids = array("q")
+        self._play_counts = array("q")
+        self._titles: List[Optional[str]] = []
+        self._artist_names = array("I")
+        self._album_titles = array("I")
+        self._durations = array("I")
+        self._file_prefixes = array("I")
+        self._file_names: List[Optional[str]] = []
+        self._lyric_prefixes = array("I")
+        self._lyric_names: List[Optional[str]] = []
+        self._pool = _StringPool()
+        self._id_rows: Optional[Dict[int, List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, row: int) -> SongRow:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return SongRow(self, row)
+
+    def __iter__(self) -> Iterator[SongRow]:
+        return (SongRow(self, row) for row in range(len(self)))
+
+    def _append(self, song_id, title, artist_id, artist_name, album_id, album_title,
+                duration, file_url, lyric_url, play_count) -> None:
+        code = self._pool.code
+        self._ids.append(_NONE if song_id is None else song_id)
+        self._titles.append(title)
+        self._artist_ids.append(_NONE if artist_id is None else artist_id)
+        self._artist_names.append(code(artist_name))
+        self._album_ids.append(_NONE if album_id is None else album_id)
+        self._album_titles.append(code(album_title))
+        self._durations.append(code(duration))
+        prefix, name = _split_url(file_url)
+        self._file_prefixes.append(code(prefix))
+        self._file_names.append(name)
+        prefix, name = _split_url(lyric_url)
+        self._lyric_prefixes.append(code(prefix))
+        self._lyric_names.append(name)
+        self._play_counts.append(play_count or 0)
+
+    def extend_dicts(self, data_list: Iterable[dict]) -> int:
+        """
+        追加接口返回的歌曲字典（不创建Song对象）
+
+        Args:
+            data_list: 歌曲字典列表
+
+        Returns:
+            追加的行数
+        """
+        before = len(self)
+        append = self._append
+        # 已有歌曲对象在使用时（例如播放队列），把新数据合并到这些对象上
+        merge = identity_map.merge_existing if identity_map.has_any(Song) else None
+        for data in data_list:
+            if merge is not None:
+                merge(Song, data)
+            get = data.get
+            append(get('id'), get('title'), get('artistId'), get('artistName'), get('albumId'),
+                   get('albumTitle'), get('duration'), get('fileUrl'), get('lyricUrl'), get('playCount', 0))
+        self._id_rows = None
+        return len(self) - before
+
+    def extend_entities(self, songs: Iterable[Any]) -> int:
+        """
+        追加歌曲对象（Song或SongRow）
+
+        Args:
+            songs: 歌曲对象列表
+
+        Returns:
+            追加的行数
+        """
+        before = len(self)
+        for song in songs:
+            self._append(song.id, song.title, song.artist_id, song.artist_name, song.album_id,
+                         song.album_title, song.duration, song.file_url, song.lyric_url, song.play_count)
+        self._id_rows = None
+        return len(self) - before
+
+    def update(self, row: int, song: Any) -> None:
+        """
+        用歌曲对象覆盖指定行
+
+        Args:
+            row: 行号
+            song: 歌曲对象
+        """
+        code = self._pool.code
+        self._titles[row] = song.title
+        self._artist_ids[row] = _NONE if song.artist_id is None else song.artist_id
+        self._artist_names[row] = code(song.artist_name)
+        self._album_ids[row] = _NONE if song.album_id is None else song.album_id
+        self._album_titles[row] = code(song.album_title)
+        self._durations[row] = code(song.duration)
+        prefix, name = _split_url(song.file_url)
+        self._file_prefixes[row] = code(prefix)
+        self._file_names[row] = name
+        prefix, name = _split_url(song.lyric_url)
+        self._lyric_prefixes[row] = code(prefix)
+        self._lyric_names[row] = name
+        self._play_counts[row] = song.play_count or 0
+
+    def ids(self) -> array:
+        """
+        按行获取歌曲ID（复制ID列，不创建歌曲对象；没有ID的行为-1）
+
+        Returns:
+            ID数组
+        """
+        return array("q", self._ids)
+
+    def rows_for_id(self, song_id: int) -> List[int]:
+        """
+        查找歌曲所在的行（同一首歌可能出现多次）
+
+        Args:
+            song_id: 歌曲ID
+
+        Returns:
+            行号列表
+        """
+        if self._id_rows is None:
+            id_rows: Dict[int, List[int]] = {}
+            for row, value in enumerate(self._ids):
+                id_rows.setdefault(value, []).append(row)
+            self._id_rows = id_rows
+        return self._id_rows.get(song_id, [])
+
+    def get(self, row: int, name: str) -> Any:
+        """
+        读取指定行的字段
+
+        Args:
+            row: 行号
+            name: Song的字段名
+
+        Returns:
+            字段值
+        """
+        values = self._pool.values
+        if name == "id":
+            return self._int(self._ids[row])
+        if name == "title":
+            return self._titles[row]
+        if name == "artist_id":
+            return self._int(self._artist_ids[row])
+        if name == "artist_name":
+            return values[self._artist_names[row]]
+        if name == "album_id":
+            return self._int(self._album_ids[row])
+        if name == "album_title":
+            return values[self._album_titles[row]]
+        if name == "duration":
+            return values[self._durations[row]]
+        if name == "file_url":
+            return self._join(values[self._file_prefixes[row]], self._file_names[row])
+        if name == "lyric_url":
+            return self._join(values[self._lyric_prefixes[row]], self._lyric_names[row])
+        if name == "play_count":
+            return self._play_counts[row]
+        raise AttributeError(name)
+
+    @staticmethod
+    def _int(value: int) -> Optional[int]:
+        return None if value == _NONE else value
+
+    @staticmethod
+    def _join(prefix: Optional[str], name: Optional[str]) -> Optional[str]:
+        return name if prefix is None else prefix + name
+
+    def entity(self, row: int) -> Song:
+        """
+        获取指定行的Song对象（已有唯一实例时直接返回该实例）
+
+        Args:
+            row: 行号
+
+        Returns:
+            歌曲对象
+        """
+        song = identity_map.get(Song, self._int(self._ids[row]))
+        if song is None:
+            get = self.get
+            song = identity_map.adopt(Song(*(get(row, name) for name in self.FIELD_NAMES)))
+        return song
+
+    def view(self, row: int) -> SongRow:
+        """
+        获取指定行的只读视图（不创建Song对象）
+
+        Args:
+            row: 行号
+
+        Returns:
+            行视图
+        """
+        return SongRow(self, row)
+
+    def value(self, row: int, field_index: int) -> Any:
+        """
+        读取指定行的单个字段
+
+        Args:
+            row: 行号
+            field_index: 字段序号（与Song字段顺序一致）
+
+        Returns:
+            字段值
+        """
+        return self.get(row, self.FIELD_NAMES[field_index])
@@ -0,0 +1,512 @@
+"""
+目录列表模型 - 为歌曲、艺术家和专辑列表提供按需加载的数据模型
+"""
+
+from dataclasses import fields
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt6.QtWidgets import QListView
+
+from ..models.identity_map import identity_map
+from ..models.song import Song
+from ..models.song_table import SongTable
+
+# 服务器分页：请求下一页的函数，参数为交付函数deliver(本页数据, 再下一页的请求函数或None)
+MoreFn = Callable[[Callable[[Iterable[dict], Optional["MoreFn"]], None]], None]
+
+
+def format_song(song) -> str:
+    """歌曲显示文本：标题 - 艺术家"""
+    text = song.title
+    if song.artist_name:
+        text += f" - {song.artist_name}"
+    return text
+
+
+def format_song_with_album(song) -> str:
+    """歌曲显示文本：标题 (专辑)"""
+    text = song.title
+    if song.album_title:
+        text += f" ({song.album_title})"
+    return text
+
+
+def format_artist(artist) -> str:
+    """艺术家显示文本"""
+    return artist.name
+
+
+def format_album(album) -> str:
+    """专辑显示文本：标题 - 艺术家"""
+    text = album.title
+    if album.artist_name:
+        text += f" - {album.artist_name}"
+    return text
+
+
+class CompactEntityStore:
+    """
+    紧凑的实体存储
+
+    每行只保存一个字段值元组，不为每行常驻一个数据类实例，
+    需要时再按行获取实体对象（经过身份映射，同一ID只有一个实例）。
+    """
+
+    def __init__(self, entity_cls: type):
+        """
+        初始化存储
+
+        Args:
+            entity_cls: 实体数据类（Song、Artist或Album）
+        """
+        self.entity_cls = entity_cls
+        self._field_names = [f.name for f in fields(entity_cls)]
+        self._rows: List[tuple] = []
+        self._id_rows: Optional[Dict[Any, List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self) -> None:
+        """清空存储"""
+        self._rows = []
+        self._id_rows = None
+
+    def extend_dicts(self, data_list: Iterable[dict]) -> int:
+        """
+        追加接口返回的字典数据
+
+        行数据只用于生成元组，不登记到身份映射；已有的实例仍会合并新数据。
+
+        Args:
+            data_list: 实体字典列表
+
+        Returns:
+            追加的行数
+        """
+        cls = self.entity_cls
+        if not identity_map.has_any(cls):
+            return self.extend_entities(cls._build(data) for data in data_list)
+
+        def build(data: dict) -> Any:
+            identity_map.merge_existing(cls, data)
+            return cls._build(data)
+
+        return self.extend_entities(build(data) for data in data_list)
+
+    def extend_entities(self, entities: Iterable[Any]) -> int:
+        """
+        追加实体对象
+
+        Args:
+            entities: 实体对象列表
+
+        Returns:
+            追加的行数
+        """
+        names = self._field_names
+        before = len(self._rows)
+        self._rows.extend(tuple(getattr(entity, name) for name in names) for entity in entities)
+        self._id_rows = None
+        return len(self._rows) - before
+
+    def update(self, row: int, entity: Any) -> None:
+        """
+        用实体对象覆盖指定行
+
+        Args:
+            row: 行号
+            entity: 实体对象
+        """
+        self._rows[row] = tuple(getattr(entity, name) for name in self._field_names)
+
+    def ids(self) -> List[Any]:
+        """
+        按行获取实体ID（不创建实体对象）
+
+        Returns:
+            ID列表
+        """
+        return [values[0] for values in self._rows]
+
+    def rows_for_id(self, entity_id: Any) -> List[int]:
+        """
+        查找实体所在的行
+
+        Args:
+            entity_id: 实体ID
+
+        Returns:
+            行号列表
+        """
+        if self._id_rows is None:
+            id_rows: Dict[Any, List[int]] = {}
+            for row, values in enumerate(self._rows):
+                id_rows.setdefault(values[0], []).append(row)
+            self._id_rows = id_rows
+        return self._id_rows.get(entity_id, [])
+
+    def entity(self, row: int) -> Any:
+        """
+        获取指定行的实体对象（已有唯一实例时直接返回该实例）
+
+        Args:
+            row: 行号
+
+        Returns:
+            实体对象
+        """
+        values = self._rows[row]
+        entity = identity_map.get(self.entity_cls, values[0])
+        if entity is None:
+            entity = identity_map.adopt(self.entity_cls(*values))
+        return entity
+
+    def view(self, row: int) -> Any:
+        """
+        获取用于显示的行对象（这里就是实体对象）
+
+        Args:
+            row: 行号
+
+        Returns:
+            实体对象
+        """
+        return self.entity(row)
+
+    def value(self, row: int, field_index: int) -> Any:
+        """
+        读取指定行的单个字段
+
+        Args:
+            row: 行号
+            field_index: 字段序号（与数据类字段顺序一致）
+
+        Returns:
+            字段值
+        """
+        return self._rows[row][field_index]
+
+
+class CatalogListModel(QAbstractListModel):
+    """
+    目录列表模型
+
+    数据一次性放入紧凑存储，但只按批次向视图公开行（fetchMore），
+    显示文本在data()中按需生成。实体对象的字段在别处更新时
+    （身份映射发出变更通知），对应的行随之刷新。
+    数据来自服务器分页时，已有的行全部公开后才请求下一页。
+    """
+
+    # 实体对象角色，与原QListWidgetItem的UserRole保持一致
+    EntityRole = Qt.ItemDataRole.UserRole
+
+    # 实体变更可能发生在后台线程，经排队连接转到主线程处理
+    _entity_changed = pyqtSignal(object)
+
+    def __init__(self, entity_cls: type, formatter: Callable[[Any], str],
+                 batch_size: int = 500, parent=None):
+        """
+        初始化列表模型
+
+        Args:
+            entity_cls: 实体数据类
+            formatter: 显示文本格式化函数，参数为实体对象或行视图
+            batch_size: 每次向视图公开的行数
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.entity_cls = entity_cls
+        self.store = self._new_store()
+        self.formatter = formatter
+        self.default_formatter = formatter
+        self.batch_size = batch_size
+        self._loaded = 0
+
+        # 请求下一页的函数（为None表示没有更多页），以及每次替换数据时递增的代号
+        self._more: Optional[MoreFn] = None
+        self._fetching = False
+        self._pages_token = 0
+
+        self._entity_changed.connect(self._apply_entity_change, Qt.ConnectionType.QueuedConnection)
+        identity_map.subscribe(entity_cls, self._on_entity_changed)
+
+    def _new_store(self) -> Any:
+        """创建空存储：歌曲数量最多，使用列式存储；艺术家和专辑使用元组存储"""
+        if self.entity_cls is Song:
+            return SongTable()
+        return CompactEntityStore(self.entity_cls)
+
+    def set_store(self, store: Any, formatter: Optional[Callable[[Any], str]] = None) -> None:
+        """
+        直接使用已有的存储（例如曲库快照），不复制数据
+
+        之后的set_items、set_entities和clear会换回普通存储。
+
+        Args:
+            store: 实现了CompactEntityStore接口的存储
+            formatter: 本次使用的显示文本格式化函数，默认使用构造时的函数
+        """
+        self.beginResetModel()
+        self._reset_paging(None)
+        self.store = store
+        self.formatter = formatter or self.default_formatter
+        self._loaded = min(self.batch_size, len(self.store))
+        self.endResetModel()
+
+    def set_items(self, data_list: Iterable[dict], formatter: Optional[Callable[[Any], str]] = None,
+                  more: Optional[MoreFn] = None) -> None:
+        """
+        替换全部数据
+
+        Args:
+            data_list: 实体字典列表（分页时为第一页）
+            formatter: 本次使用的显示文本格式化函数，默认使用构造时的函数
+            more: 请求下一页的函数，为None表示data_list已是全部数据
+        """
+        self.beginResetModel()
+        self._reset_paging(more)
+        self.store = self._new_store()
+        self.store.extend_dicts(data_list)
+        self.formatter = formatter or self.default_formatter
+        self._loaded = min(self.batch_size, len(self.store))
+        self.endResetModel()
+
+    def set_entities(self, entities: Iterable[Any]) -> None:
+        """
+        用实体对象替换全部数据
+
+        Args:
+            entities: 实体对象列表
+        """
+        self.beginResetModel()
+        self._reset_paging(None)
+        self.store = self._new_store()
+        self.store.extend_entities(entities)
+        self.formatter = self.default_formatter
+        self._loaded = min(self.batch_size, len(self.store))
+        self.endResetModel()
+
+    def append_items(self, data_list: Iterable[dict]) -> None:
+        """
+        追加数据（例如分批到达的专辑）
+
+        Args:
+            data_list: 实体字典列表
+        """
+        was_fully_loaded = self._loaded == len(self.store)
+        self.store.extend_dicts(data_list)
+
+        # 之前的数据已全部公开时，新数据在一个批次以内直接显示，其余等待fetchMore
+        if was_fully_loaded and self._loaded < self.batch_size:
+            count = min(self.batch_size - self._loaded, len(self.store) - self._loaded)
+            if count > 0:
+                self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+                self._loaded += count
+                self.endInsertRows()
+
+    def _reset_paging(self, more: Optional[MoreFn]) -> None:
+        """替换数据时重置分页状态，之前请求的页到达后直接丢弃"""
+        self._more = more
+        self._fetching = False
+        self._pages_token += 1
+
+    def _request_more(self) -> None:
+        """请求服务器的下一页"""
+        token = self._pages_token
+
+        def deliver(data_list: Iterable[dict], more: Optional[MoreFn]) -> None:
+            if token == self._pages_token:
+                self._append_page(data_list, more)
+
+        self._fetching = True
+        self._more(deliver)
+
+    def _append_page(self, data_list: Iterable[dict], more: Optional[MoreFn]) -> None:
+        """
+        追加服务器返回的一页
+
+        Args:
+            data_list: 本页数据
+            more: 请求再下一页的函数，为None表示没有更多页（包括请求失败）
+        """
+        self._fetching = False
+        self._more = more
+        self.store.extend_dicts(data_list)
+
+        # 新页是视图滚动到末尾时请求的，直接公开一个批次
+        count = min(self.batch_size, len(self.store) - self._loaded)
+        if count > 0:
+            self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+            self._loaded += count
+            self.endInsertRows()
+
+    def has_more_pages(self) -> bool:
+        """
+        服务器是否还有未获取的页
+
+        Returns:
+            是否还有未获取的页
+        """
+        return self._more is not None
+
+    def clear(self) -> None:
+        """清空数据"""
+        self.beginResetModel()
+        self._reset_paging(None)
+        self.store = self._new_store()
+        self._loaded = 0
+        self.endResetModel()
+
+    def total_count(self) -> int:
+        """
+        获取总行数（包括尚未公开给视图的行）
+
+        Returns:
+            总行数
+        """
+        return len(self.store)
+
+    def entity(self, row: int) -> Any:
+        """
+        获取指定行的实体对象
+
+        Args:
+            row: 行号
+
+        Returns:
+            实体对象，行号无效时为None
+        """
+        if 0 <= row < len(self.store):
+            return self.store.entity(row)
+        return None
+
+    def ids(self) -> Sequence[Any]:
+        """
+        获取全部行的实体ID（包括尚未公开给视图的行，不创建实体对象）
+
+        Returns:
+            按行排列的ID
+        """
+        return self.store.ids()
+
+    def _on_entity_changed(self, entity: Any, changed: Set[str]) -> None:
+        """身份映射的变更回调（可能在任意线程中调用）"""
+        self._entity_changed.emit(entity)
+
+    def _apply_entity_change(self, entity: Any) -> None:
+        """
+        刷新实体所在的行
+
+        Args:
+            entity: 已更新的实体对象
+        """
+        for row in self.store.rows_for_id(entity.id):
+            self.store.update(row, entity)
+            if row < self._loaded:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def ensure_loaded(self, row: int) -> None:
+        """
+        确保指定行已公开给视图
+
+        Args:
+            row: 行号
+        """
+        while self._loaded <= row and self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if parent.isValid():
+            return False
+        return self._loaded < len(self.store) or (self._more is not None and not self._fetching)
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self.store) - self._loaded)
+        if count <= 0:
+            if self._more is not None and not self._fetching:
+                self._request_more()
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.formatter(self.store.view(index.row()))
+        if role == self.EntityRole:
+            return self.store.entity(index.row())
+        return None
+
+
+class CatalogListView(QListView):
+    """绑定CatalogListModel的列表视图，提供按行号操作的便捷方法"""
+
+    def __init__(self, model: CatalogListModel, parent=None):
+        """
+        初始化列表视图
+
+        Args:
+            model: 列表模型
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        # 所有行高度一致，视图无需逐行测量
+        self.setUniformItemSizes(True)
+        self.setModel(model)
+
+    def count(self) -> int:
+        """
+        获取总行数
+
+        Returns:
+            总行数
+        """
+        return self.model().total_count()
+
+    def current_row(self) -> int:
+        """
+        获取当前行号
+
+        Returns:
+            当前行号，没有当前行时为-1
+        """
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def set_current_row(self, row: int) -> None:
+        """
+        设置当前行并滚动到该行
+
+        Args:
+            row: 行号
+        """
+        model = self.model()
+        model.ensure_loaded(row)
+        index = model.index(row)
+        self.setCurrentIndex(index)
+        self.scrollTo(index)
+
+    def entity_at(self, row: int) -> Any:
+        """
+        获取指定行的实体对象
+
+        Args:
+            row: 行号
+
+        Returns:
+            实体对象
+        """
+        return self.model().entity(row)
@@ -9,6 +9,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import pyqtSignal
 
 from ..api.auth_service import AuthService
+from ..utils.workers import JobRunner
 
 
 class LoginDialog(QDialog):
@@ -28,6 +29,9 @@ class LoginDialog(QDialog):
         super().__init__(parent)
         self.auth_service = auth_service
         
+        # 后台任务调度器
+        self.jobs = JobRunner(self)
+        
         self.setWindowTitle("登录/注册")
         self.setMinimumWidth(400)
         
@@ -56,9 +60,9 @@ class LoginDialog(QDialog):
         login_layout.addWidget(self.login_password)
         
         # 登录按钮
-        login_button = QPushButton("登录")
-        login_button.clicked.connect(self._on_login)
-        login_layout.addWidget(login_button)
+        self.login_button = QPushButton("登录")
+        self.login_button.clicked.connect(self._on_login)
+        login_layout.addWidget(self.login_button)
         
         login_tab.setLayout(login_layout)
         
@@ -89,9 +93,9 @@ class LoginDialog(QDialog):
         register_layout.addWidget(self.register_confirm_password)
         
         # 注册按钮
-        register_button = QPushButton("注册")
-        register_button.clicked.connect(self._on_register)
-        register_layout.addWidget(register_button)
+        self.register_button = QPushButton("注册")
+        self.register_button.clicked.connect(self._on_register)
+        register_layout.addWidget(self.register_button)
         
         register_tab.setLayout(register_layout)
         
@@ -112,15 +116,13 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "输入错误", "请输入用户名和密码")
             return
         
-        try:
-            # 尝试登录
-            user_data = self.auth_service.login(username, password)
-            # 发出登录成功信号
-            self.login_successful.emit(user_data)
-            # 关闭对话框
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "登录失败", f"无法登录: {str(e)}")
+        # 尝试登录
+        self._set_busy(True)
+        self.jobs.submit(
+            "auth", self.auth_service.login, username, password,
+            on_success=self._on_auth_succeeded,
+            on_error=lambda error: self._on_auth_failed("登录失败", f"无法登录: {error}")
+        )
     
     def _on_register(self) -> None:
         """处理注册按钮点击"""
@@ -138,14 +140,54 @@ class LoginDialog(QDialog):
             QMessageBox.warning(self, "密码不匹配", "密码和确认密码不匹配")
             return
         
-        try:
+        def register_and_login() -> dict:
             # 尝试注册
             self.auth_service.register(username, password, email)
             # 注册成功后自动登录
-            user_data = self.auth_service.login(username, password)
-            # 发出登录成功信号
-            self.login_successful.emit(user_data)
-            # 关闭对话框
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "注册失败", f"无法注册: {str(e)}")
\ No newline at end of file
+            return self.auth_service.login(username, password)
+        
+        self._set_busy(True)
+        self.jobs.submit(
+            "auth", register_and_login,
+            on_success=self._on_auth_succeeded,
+            on_error=lambda error: self._on_auth_failed("注册失败", f"无法注册: {error}")
+        )
+    
+    def _set_busy(self, busy: bool) -> None:
+        """
+        请求进行中时禁用按钮，防止重复提交
+        
+        Args:
+            busy: 是否有请求进行中
+        """
+        self.login_button.setEnabled(not busy)
+        self.register_button.setEnabled(not busy)
+    
+    def _on_auth_succeeded(self, user_data: dict) -> None:
+        """
+        处理登录/注册成功
+        
+        Args:
+            user_data: 用户信息
+        """
+        self._set_busy(False)
+        # 发出登录成功信号
+        self.login_successful.emit(user_data)
+        # 关闭对话框
+        self.accept()
+    
+    def _on_auth_failed(self, title: str, message: str) -> None:
+        """
+        处理登录/注册失败
+        
+        Args:
+            title: 提示标题
+            message: 错误信息
+        """
+        self._set_busy(False)
+        QMessageBox.critical(self, title, message)
+    
+    def reject(self) -> None:
+        """关闭对话框时丢弃未完成的请求结果"""
+        self.jobs.cancel_all()
+        super().reject()
\ No newline at end of file
@@ -4,19 +4,41 @@
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QPushButton, QTabWidget, QLineEdit, QListWidget, QListWidgetItem,
-    QMessageBox, QInputDialog, QFileDialog, QSplitter, QMenu, QToolBar
+    QPushButton, QTabWidget, QLineEdit,
+    QMessageBox, QInputDialog, QFileDialog, QSplitter, QMenu, QToolBar, QProgressDialog
 )
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QSettings
+from PyQt6.QtCore import Qt, QSize, pyqtSignal, QSettings, QModelIndex, QEvent, QTimer, QThreadPool
 from PyQt6.QtGui import QAction, QIcon
+from typing import Optional, Tuple
+import os
 
 from ..api.api_client import ApiClient
 from ..api.auth_service import AuthService
 from ..api.song_service import SongService
 from ..api.playlist_service import PlaylistService
 from ..api.artist_service import ArtistService
+from ..api import async_api_client
+from ..api.async_api_client import AsyncApiClient
+from ..api.async_services import AsyncSongService
+from ..models.identity_map import identity_map
 from ..models.song import Song, Artist, Album
 from ..utils.config import Config
+from ..utils.audio_cache import AudioCache
+from ..utils.http_cache import HttpCache
+from ..utils.catalog_store import CatalogStore
+from ..utils.catalog_snapshot import CatalogSnapshot, default_snapshot_path, write_snapshot
+from ..utils.search_index import SearchIndex
+from ..utils.catalog_index import CatalogIndex
+from ..utils.search_cache import SearchCache
+from ..utils.play_counts import PlayCountQueue
+from ..utils.bulk_import import BulkImporter
+from ..utils.content_hash import ContentIndex
+from ..utils.workers import JobRunner
+from ..utils.async_jobs import AsyncJobRunner
+from .catalog_model import (
+    CatalogListModel, CatalogListView,
+    format_song, format_song_with_album, format_artist, format_album
+)
 from .login_dialog import LoginDialog
 from .player_widget import PlayerWidget
 from .playlist_widget import PlaylistWidget
@@ -37,14 +59,63 @@ class MainWindow(QMainWindow):
         self.config = Config()
         
         # 创建API客户端和服务
-        self.api_client = ApiClient(self.config.get_api_url())
+        self.api_client = ApiClient(
+            self.config.get_api_url(),
+            cache=HttpCache(**self.config.get_http_cache_options()),
+            **self.config.get_http_options()
+        )
         self.auth_service = AuthService(self.api_client)
-        self.song_service = SongService(self.api_client)
+        self.song_service = SongService(self.api_client, ContentIndex(self.config.get("content_index_path")))
         self.playlist_service = PlaylistService(self.api_client)
 
         # 创建艺术家服务
         self.artist_service = ArtistService(self.api_client)
         
+        # 异步客户端（需要aiohttp），在一个事件循环线程中并发大量请求；
+        # 与同步客户端共享响应缓存；请求头各自一份，令牌变化时在_update_login_status中同步
+        self.async_jobs = None
+        if async_api_client.is_available() and self.config.get("async_http", True):
+            self.async_jobs = AsyncJobRunner(self)
+            self.async_api_client = AsyncApiClient(
+                self.config.get_api_url(),
+                cache=self.api_client.cache,
+                headers=self.api_client.headers,
+                token=self.config.get_token(),
+                **self.config.get_async_http_options()
+            )
+            self.async_song_service = AsyncSongService(self.async_api_client)
+        
+        # 本地音频缓存
+        self.audio_cache = AudioCache(**self.config.get_audio_cache_options())
+        
+        # 本地曲库镜像，启动时先从磁盘显示，再在后台增量同步
+        self.catalog_store = CatalogStore(self.config.get("catalog_db_path"))
+        self.catalog_store.bind_server(self.config.get_api_url())
+        
+        # 曲库快照：启动时映射文件直接显示，镜像有变化时在后台重写
+        self.snapshot_path = self.config.get("catalog_snapshot_path") or default_snapshot_path()
+        self.catalog_snapshot: Optional[CatalogSnapshot] = None
+        # 快照文件对应的镜像版本号（写入新快照后更新；Windows上文件被映射时新快照要到下次打开才替换）
+        self.snapshot_generation: Optional[int] = None
+        
+        # 本地搜索索引，曲库完整加载后搜索不再请求服务器；保存在快照旁，镜像未变时启动直接载入
+        self.search_index = SearchIndex()
+        self.search_index_path = os.path.splitext(self.snapshot_path)[0] + ".search"
+        
+        # 目录索引（艺术家→歌曲、专辑→歌曲、艺术家→专辑），下钻浏览直接在本地回答
+        self.catalog_index = CatalogIndex()
+        
+        # 服务器搜索结果缓存，以及各类型正在进行的搜索 (查询, 取消事件)
+        self.search_cache = SearchCache(**self.config.get_search_cache_options())
+        self.pending_searches = {}
+        
+        # 播放次数先写本地日志，再由计时器在后台批量提交
+        self.play_counts = PlayCountQueue(self.config.get("play_count_journal"))
+        self.play_count_interval = float(self.config.get("play_count_flush_s", 10))
+        self.play_count_timer = QTimer(self)
+        self.play_count_timer.setSingleShot(True)
+        self.play_count_timer.timeout.connect(self._flush_play_counts)
+        
         # 恢复保存的令牌（如果有）
         token = self.config.get_token()
         if token:
@@ -53,9 +124,24 @@ class MainWindow(QMainWindow):
         # 当前用户
         self.current_user = None
         
+        # 后台任务调度器，所有服务调用都在线程池中执行
+        self.jobs = JobRunner(self)
+        
+        # 曲库同步、上传、批量导入和音频下载等长任务使用单独的有界线程池，
+        # 不会占满全局线程池而让界面上的短请求排队
+        self.long_pool = QThreadPool(self)
+        self.long_pool.setMaxThreadCount(max(1, int(self.config.get("long_job_threads", 2))))
+        self.long_jobs = JobRunner(self, self.long_pool)
+        
+        # 预加载的下一首是否取自播放队列（单曲循环时预加载的是当前歌曲）
+        self.preload_from_queue = False
+        
         # 创建UI
         self._init_ui()
         
+        # 在任何网络请求之前先显示上次的曲库
+        self._show_snapshot()
+        
         # 尝试自动登录
         self._check_login_status()
     
@@ -85,6 +171,13 @@ class MainWindow(QMainWindow):
         self.search_input.returnPressed.connect(self._on_search)
         search_layout.addWidget(self.search_input)
         
+        # 输入时自动搜索：停止输入一段时间后才发起
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.config.get("search_debounce_ms", 250))
+        self.search_timer.timeout.connect(self._on_search)
+        self.search_input.textEdited.connect(self.search_timer.start)
+        
         search_button = QPushButton("搜索")
         search_button.clicked.connect(self._on_search)
         search_layout.addWidget(search_button)
@@ -99,8 +192,8 @@ class MainWindow(QMainWindow):
         songs_layout = QVBoxLayout()
         songs_tab.setLayout(songs_layout)
         
-        self.songs_list = QListWidget()
-        self.songs_list.itemDoubleClicked.connect(self._on_song_double_clicked)
+        self.songs_list = CatalogListView(CatalogListModel(Song, format_song, parent=self))
+        self.songs_list.doubleClicked.connect(self._on_song_double_clicked)
         songs_layout.addWidget(self.songs_list)
 
         # 在歌曲列表初始化后添加
@@ -112,8 +205,8 @@ class MainWindow(QMainWindow):
         artists_layout = QVBoxLayout()
         artists_tab.setLayout(artists_layout)
         
-        self.artists_list = QListWidget()
-        self.artists_list.itemDoubleClicked.connect(self._on_artist_double_clicked)
+        self.artists_list = CatalogListView(CatalogListModel(Artist, format_artist, parent=self))
+        self.artists_list.doubleClicked.connect(self._on_artist_double_clicked)
         artists_layout.addWidget(self.artists_list)
 
         # 在_init_ui方法中，设置艺术家列表的上下文菜单
@@ -125,8 +218,8 @@ class MainWindow(QMainWindow):
         albums_layout = QVBoxLayout()
         albums_tab.setLayout(albums_layout)
         
-        self.albums_list = QListWidget()
-        self.albums_list.itemDoubleClicked.connect(self._on_album_double_clicked)
+        self.albums_list = CatalogListView(CatalogListModel(Album, format_album, parent=self))
+        self.albums_list.doubleClicked.connect(self._on_album_double_clicked)
         albums_layout.addWidget(self.albums_list)
         
         # 添加选项卡
@@ -134,6 +227,8 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(artists_tab, "艺术家")
         self.tabs.addTab(albums_tab, "专辑")
         
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+        
         left_layout.addWidget(self.tabs)
         
         # 右侧面板（播放列表）
@@ -153,6 +248,8 @@ class MainWindow(QMainWindow):
         self.player_widget = PlayerWidget(config=self.config)
         self.player_widget.next_song_requested.connect(self._on_next_song_requested)
         self.player_widget.previous_song_requested.connect(self._on_previous_song_requested)
+        self.player_widget.preload_requested.connect(self._on_preload_requested)
+        self.player_widget.preloaded_song_started.connect(self._on_preloaded_song_started)
         
         main_layout.addWidget(self.player_widget)
         
@@ -167,11 +264,11 @@ class MainWindow(QMainWindow):
         Args:
             position: 鼠标位置
         """
-        item = self.artists_list.itemAt(position)
-        if not item:
+        index = self.artists_list.indexAt(position)
+        if not index.isValid():
             return
         
-        artist = item.data(Qt.ItemDataRole.UserRole)
+        artist = index.data(CatalogListModel.EntityRole)
         
         # 创建上下文菜单
         menu = QMenu()
@@ -182,7 +279,7 @@ class MainWindow(QMainWindow):
         action = menu.exec(self.artists_list.mapToGlobal(position))
         
         if action == view_action:
-            self._on_artist_double_clicked(item)
+            self._on_artist_double_clicked(index)
         elif action == delete_action:
             self._delete_artist(artist)
 
@@ -203,39 +300,57 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            try:
-                # 再次确认，因为这是一个重要操作
-                confirm = QMessageBox.warning(
-                    self,
-                    "最终确认",
-                    f"删除艺术家\"{artist.name}\"将永久删除所有相关歌曲和专辑。\n\n确定要继续吗？",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.No
-                )
-                
-                if confirm == QMessageBox.StandardButton.Yes:
-                    # 执行删除
-                    self.artist_service.delete_artist(artist.id)
-                    
-                    # 检查是否正在播放该艺术家的歌曲，如果是则停止播放
-                    if (self.player_widget.current_song and 
-                        self.player_widget.current_song.artist_id == artist.id):
-                        self.player_widget.stop()
-                    
-                    # 刷新列表
-                    self._load_artists()
-                    self._load_songs()
-                    self._load_albums()
-                    
-                    QMessageBox.information(
-                        self, "删除成功", 
-                        f"艺术家\"{artist.name}\"及其所有歌曲已成功删除。"
+            # 再次确认，因为这是一个重要操作
+            confirm = QMessageBox.warning(
+                self,
+                "最终确认",
+                f"删除艺术家\"{artist.name}\"将永久删除所有相关歌曲和专辑。\n\n确定要继续吗？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            
+            if confirm == QMessageBox.StandardButton.Yes:
+                # 执行删除
+                self.jobs.submit(
+                    None, self.artist_service.delete_artist, artist.id,
+                    on_success=lambda _: self._on_artist_deleted(artist),
+                    on_error=lambda error: QMessageBox.critical(
+                        self, "删除失败", f"无法删除艺术家: {error}"
                     )
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "删除失败", 
-                    f"无法删除艺术家: {str(e)}"
                 )
+    
+    def _on_artist_deleted(self, artist) -> None:
+        """
+        处理艺术家删除成功
+        
+        Args:
+            artist: 已删除的艺术家
+        """
+        # 检查是否正在播放该艺术家的歌曲，如果是则停止播放
+        if (self.player_widget.current_song and 
+            self.player_widget.current_song.artist_id == artist.id):
+            self.player_widget.stop()
+        
+        # 从目录索引和搜索索引中删除该艺术家及其歌曲和专辑（索引不完整时只删除艺术家）
+        song_ids = [song["id"] for song in self.catalog_index.songs_by_artist(artist.id) or []]
+        album_ids = [album["id"] for album in self.catalog_index.albums_by_artist(artist.id) or []]
+        for song_id in song_ids:
+            self.player_widget.queue.discard(song_id)
+        if song_ids:
+            self.catalog_store.delete_songs(song_ids)
+        self.catalog_index.update("songs", deleted_ids=song_ids)
+        self.catalog_index.update("albums", deleted_ids=album_ids)
+        self.search_index.update("songs", deleted_ids=song_ids)
+        self.search_index.update("albums", deleted_ids=album_ids)
+        self.search_index.update("artists", deleted_ids=[artist.id])
+        
+        # 刷新列表
+        self._load_data()
+        
+        QMessageBox.information(
+            self, "删除成功", 
+            f"艺术家\"{artist.name}\"及其所有歌曲已成功删除。"
+        )
 
     def _show_song_context_menu(self, position) -> None:
         """
@@ -244,11 +359,11 @@ class MainWindow(QMainWindow):
         Args:
             position: 鼠标位置
         """
-        item = self.songs_list.itemAt(position)
-        if not item:
+        index = self.songs_list.indexAt(position)
+        if not index.isValid():
             return
         
-        song = item.data(Qt.ItemDataRole.UserRole)
+        song = index.data(CatalogListModel.EntityRole)
         
         # 创建上下文菜单
         menu = QMenu()
@@ -260,7 +375,7 @@ class MainWindow(QMainWindow):
         action = menu.exec(self.songs_list.mapToGlobal(position))
         
         if action == play_action:
-            self._play_song(song)
+            self._play_from_songs_list(index.row())
         elif action == add_to_playlist_action:
             self._show_add_to_playlist_dialog(song)
         elif action == delete_action:
@@ -277,62 +392,81 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "未登录", "请先登录后再添加歌曲到播放列表")
             return
         
-        try:
-            # 获取用户的播放列表
-            playlists = self.playlist_service.get_my_playlists()
-            
-            if not playlists:
-                # 没有播放列表，提示创建
-                reply = QMessageBox.question(
-                    self,
-                    "没有播放列表",
-                    "您还没有播放列表。是否创建一个新的播放列表？",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.Yes
-                )
-                
-                if reply == QMessageBox.StandardButton.Yes:
-                    self._create_playlist(song)  # 创建新播放列表并添加歌曲
-                return
-            
-            # 有播放列表，显示选择对话框
-            playlist_names = [playlist['name'] for playlist in playlists]
-            playlist_names.append("创建新播放列表...")
-            
-            playlist_name, ok = QInputDialog.getItem(
-                self, "选择播放列表", "请选择要添加到的播放列表:",
-                playlist_names, 0, False
+        # 获取用户的播放列表
+        self.jobs.submit(
+            "add_to_playlist", self.playlist_service.get_my_playlists,
+            on_success=lambda playlists: self._choose_playlist_for_song(song, playlists),
+            on_error=lambda error: QMessageBox.critical(
+                self, "错误", f"添加歌曲到播放列表失败: {error}"
+            )
+        )
+    
+    def _choose_playlist_for_song(self, song, playlists: list) -> None:
+        """
+        选择要添加歌曲的播放列表
+        
+        Args:
+            song: 要添加的歌曲
+            playlists: 用户的播放列表数据
+        """
+        if not playlists:
+            # 没有播放列表，提示创建
+            reply = QMessageBox.question(
+                self,
+                "没有播放列表",
+                "您还没有播放列表。是否创建一个新的播放列表？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes
             )
             
-            if not ok:
-                return
-            
-            if playlist_name == "创建新播放列表...":
+            if reply == QMessageBox.StandardButton.Yes:
                 self._create_playlist(song)  # 创建新播放列表并添加歌曲
-            else:
-                # 查找播放列表ID
-                playlist_id = None
-                for playlist in playlists:
-                    if playlist['name'] == playlist_name:
-                        playlist_id = playlist['id']
-                        break
-                
-                if playlist_id is None:
-                    QMessageBox.warning(self, "错误", "无法找到选择的播放列表")
-                    return
-                
-                # 添加歌曲到播放列表
-                self.playlist_service.add_song_to_playlist(playlist_id, song.id)
-                
-                QMessageBox.information(
-                    self, "添加成功", 
-                    f"歌曲\"{song.title}\"已添加到播放列表\"{playlist_name}\""
-                )
-                
-                # 刷新播放列表
-                self.playlist_widget.load_playlists()
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"添加歌曲到播放列表失败: {str(e)}")
+            return
+        
+        # 有播放列表，显示选择对话框
+        playlist_names = [playlist['name'] for playlist in playlists]
+        playlist_names.append("创建新播放列表...")
+        
+        playlist_name, ok = QInputDialog.getItem(
+            self, "选择播放列表", "请选择要添加到的播放列表:",
+            playlist_names, 0, False
+        )
+        
+        if not ok:
+            return
+        
+        if playlist_name == "创建新播放列表...":
+            self._create_playlist(song)  # 创建新播放列表并添加歌曲
+            return
+        
+        # 查找播放列表ID
+        playlist_id = None
+        for playlist in playlists:
+            if playlist['name'] == playlist_name:
+                playlist_id = playlist['id']
+                break
+        
+        if playlist_id is None:
+            QMessageBox.warning(self, "错误", "无法找到选择的播放列表")
+            return
+        
+        def on_added(_) -> None:
+            QMessageBox.information(
+                self, "添加成功", 
+                f"歌曲\"{song.title}\"已添加到播放列表\"{playlist_name}\""
+            )
+            
+            # 刷新播放列表
+            self.playlist_widget.load_playlists()
+        
+        # 添加歌曲到播放列表
+        self.jobs.submit(
+            None, self.playlist_service.add_song_to_playlist, playlist_id, song.id,
+            on_success=on_added,
+            on_error=lambda error: QMessageBox.critical(
+                self, "错误", f"添加歌曲到播放列表失败: {error}"
+            )
+        )
 
     def _create_playlist(self, song=None) -> None:
         """
@@ -361,7 +495,7 @@ class MainWindow(QMainWindow):
         if not ok:
             return
         
-        try:
+        def create_and_add() -> None:
             # 创建播放列表
             playlist_data = self.playlist_service.create_playlist(
                 name, description if description else ""
@@ -372,7 +506,9 @@ class MainWindow(QMainWindow):
                 self.playlist_service.add_song_to_playlist(
                     playlist_data['id'], song.id
                 )
-                
+        
+        def on_created(_) -> None:
+            if song:
                 QMessageBox.information(
                     self, "创建成功", 
                     f"播放列表\"{name}\"已创建，并添加了歌曲\"{song.title}\""
@@ -385,8 +521,14 @@ class MainWindow(QMainWindow):
             
             # 刷新播放列表
             self.playlist_widget.load_playlists()
-        except Exception as e:
-            QMessageBox.critical(self, "创建失败", f"无法创建播放列表: {str(e)}")
+        
+        self.jobs.submit(
+            None, create_and_add,
+            on_success=on_created,
+            on_error=lambda error: QMessageBox.critical(
+                self, "创建失败", f"无法创建播放列表: {error}"
+            )
+        )
 
     def _delete_song(self, song: Song) -> None:
         """
@@ -405,27 +547,40 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            try:
-                # 删除歌曲
-                self.song_service.delete_song(song.id)
-                
-                # 如果正在播放这首歌，停止播放
-                if (self.player_widget.current_song and 
-                    self.player_widget.current_song.id == song.id):
-                    self.player_widget.stop()
-                
-                # 刷新歌曲列表
-                self._load_songs()
-                
-                QMessageBox.information(
-                    self, "删除成功", 
-                    f"歌曲 \"{song.title}\" 已成功删除。"
-                )
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "删除失败", 
-                    f"无法删除歌曲: {str(e)}"
+            # 删除歌曲
+            self.jobs.submit(
+                None, self.song_service.delete_song, song.id,
+                on_success=lambda _: self._on_song_deleted(song),
+                on_error=lambda error: QMessageBox.critical(
+                    self, "删除失败", f"无法删除歌曲: {error}"
                 )
+            )
+    
+    def _on_song_deleted(self, song: Song) -> None:
+        """
+        处理歌曲删除成功
+        
+        Args:
+            song: 已删除的歌曲
+        """
+        # 如果正在播放这首歌，停止播放
+        if (self.player_widget.current_song and 
+            self.player_widget.current_song.id == song.id):
+            self.player_widget.stop()
+        
+        # 播放队列中跳过这首歌
+        self.player_widget.queue.discard(song.id)
+        
+        # 从本地镜像和搜索索引中删除并同步
+        self.catalog_store.delete_songs([song.id])
+        self.search_index.update("songs", deleted_ids=[song.id])
+        self.catalog_index.update("songs", deleted_ids=[song.id])
+        self._load_data()
+        
+        QMessageBox.information(
+            self, "删除成功", 
+            f"歌曲 \"{song.title}\" 已成功删除。"
+        )
     
     def _create_toolbar(self) -> None:
         """创建工具栏"""
@@ -448,6 +603,11 @@ class MainWindow(QMainWindow):
         upload_action.triggered.connect(self._show_upload_dialog)
         toolbar.addAction(upload_action)
         
+        # 批量导入目录
+        import_action = QAction("批量导入", self)
+        import_action.triggered.connect(self._show_import_dialog)
+        toolbar.addAction(import_action)
+        
         # 设置按钮
         settings_action = QAction("设置", self)
         settings_action.triggered.connect(self._show_settings_dialog)
@@ -455,19 +615,27 @@ class MainWindow(QMainWindow):
     
     def _check_login_status(self) -> None:
         """检查登录状态"""
-        try:
-            # 尝试获取当前用户信息
-            user_data = self.auth_service.get_current_user()
-            if user_data:
-                self.current_user = user_data
-                self._update_login_status(True)
-                
-                # 载入数据
-                self._load_data()
-            else:
-                self._update_login_status(False)
-                self._show_login_dialog()
-        except Exception:
+        # 尝试获取当前用户信息
+        self.jobs.submit(
+            "login_status", self.auth_service.get_current_user,
+            on_success=self._on_login_status_checked,
+            on_error=lambda _: self._on_login_status_checked(None)
+        )
+    
+    def _on_login_status_checked(self, user_data: Optional[dict]) -> None:
+        """
+        处理登录状态检查结果
+        
+        Args:
+            user_data: 用户信息，未登录时为None
+        """
+        if user_data:
+            self.current_user = user_data
+            self._update_login_status(True)
+            
+            # 载入数据
+            self._load_data()
+        else:
             self._update_login_status(False)
             self._show_login_dialog()
     
@@ -478,6 +646,14 @@ class MainWindow(QMainWindow):
         Args:
             logged_in: 是否已登录
         """
+        # 异步客户端使用自己的请求头，把同步客户端当前的令牌同步过去
+        if self.async_jobs is not None:
+            token = self.api_client.token
+            if token:
+                self.async_api_client.set_token(token)
+            else:
+                self.async_api_client.clear_token()
+        
         if logged_in and self.current_user:
             self.login_action.setText(f"用户: {self.current_user.get('username')}")
             
@@ -514,84 +690,339 @@ class MainWindow(QMainWindow):
         self._load_data()
     
     def _load_data(self) -> None:
-        """加载数据"""
-        # 加载歌曲
-        self._load_songs()
+        """加载数据：先显示本地曲库镜像，再在后台与服务器同步"""
+        # 提交上次运行遗留的播放次数
+        self._schedule_play_count_flush()
+        
+        # 换了用户时清空镜像中上一个用户的播放列表
+        self.catalog_store.bind_user(self.current_user.get("id") if self.current_user else None)
+        
+        self.long_jobs.submit(
+            "catalog", self._sync_catalog, self.snapshot_generation,
+            on_progress=self._show_catalog,
+            on_success=self._show_catalog,
+            on_error=lambda error: QMessageBox.warning(self, "同步失败", f"无法同步曲库: {error}")
+        )
+    
+    def _sync_catalog(self, snapshot_generation: Optional[int], progress, cancel_event) -> dict:
+        """
+        显示本地镜像并与服务器同步（在后台线程中执行）
+        
+        新写入的快照通过progress和返回值交给界面线程（_show_catalog）。
+        
+        Args:
+            snapshot_generation: 提交任务时快照文件对应的镜像版本号
+            progress: 本地镜像读取完成时调用
+            cancel_event: 取消事件
+            
+        Returns:
+            同步后需要刷新显示的部分
+        """
+        store = self.catalog_store
+        if not store.is_empty():
+            generation = store.generation()
+            catalog = store.load()
+            if snapshot_generation == generation:
+                # 快照与镜像一致，已经显示的曲库无需替换
+                progress({"playlists": catalog["playlists"]})
+            else:
+                progress(catalog)
+                written = self._write_snapshot(catalog, generation, cancel_event)
+                if written:
+                    progress(written)
+            self._build_indexes(
+                catalog["songs"], catalog["artists"], catalog["albums"], generation, cancel_event, load=True
+            )
         
-        # 加载艺术家
-        self._load_artists()
+        # 本地还没有镜像时，全量获取的第一页先显示出来
+        changed = self._pull_catalog_changes(cancel_event, progress if store.is_empty() else None)
         
-        # 加载专辑
-        self._load_albums()
+        # 播放列表只属于当前用户且数量很少，每次整体刷新
+        store.replace_playlists(self.playlist_service.get_my_playlists())
         
-        # 加载播放列表
-        self.playlist_widget.load_playlists()
+        if changed:
+            generation = store.generation()
+            catalog = store.load()
+            catalog.update(self._write_snapshot(catalog, generation, cancel_event) or {})
+            return catalog
+        return {"playlists": store.playlists()}
     
-    def _load_songs(self) -> None:
-        """加载歌曲列表"""
+    def _show_snapshot(self) -> None:
+        """显示曲库快照（只映射文件，记录在显示时才解码）"""
+        snapshot = CatalogSnapshot.open(self.snapshot_path)
+        if snapshot is None:
+            return
+        if snapshot.api_url != self.config.get_api_url():
+            snapshot.close()
+            return
+        
+        self.catalog_snapshot = snapshot
+        self.snapshot_generation = snapshot.generation
+        self.songs_list.model().set_store(snapshot.section("songs"), format_song)
+        self.artists_list.model().set_store(snapshot.section("artists"))
+        self.albums_list.model().set_store(snapshot.section("albums"))
+        self._restore_play_queue()
+    
+    def _write_snapshot(self, catalog: dict, generation: int, cancel_event) -> Optional[dict]:
+        """
+        把曲库写入快照（在后台线程中执行）
+        
+        Args:
+            catalog: 曲库镜像的内容
+            generation: 读取catalog之前的镜像版本号
+            cancel_event: 取消事件，已被新的同步取代时不再写入
+            
+        Returns:
+            交给_show_catalog的snapshot_generation和snapshot（新快照能打开时为新的映射，
+            否则为None），未写入时为None
+        """
+        if cancel_event.is_set():
+            return None
         try:
-            songs_data = self.song_service.get_all_songs()
+            write_snapshot(self.snapshot_path, catalog, generation, self.config.get_api_url())
+        except OSError as e:
+            print(f"写入曲库快照失败: {e}")
+            return None
+        
+        snapshot = CatalogSnapshot.open(self.snapshot_path)
+        if snapshot is not None and snapshot.generation != generation:
+            snapshot = None
+        return {"snapshot_generation": generation, "snapshot": snapshot}
+    
+    def _pull_catalog_changes(self, cancel_event, progress=None) -> bool:
+        """
+        拉取歌曲、艺术家和专辑的变更写入本地镜像
+        
+        服务器支持增量接口时只获取水位线之后的变更；否则全量获取，
+        歌曲和艺术家以流式方式边下载边解析，专辑通过艺术家并发获取。
+        
+        Args:
+            cancel_event: 取消事件
+            progress: 全量获取时用于显示第一批歌曲，为None时不显示
             
-            self.songs_list.clear()
+        Returns:
+            本地镜像是否发生变化
+        """
+        store = self.catalog_store
+        since = store.get_watermark()
+        
+        changes = self.song_service.get_catalog_changes(since)
+        if cancel_event.is_set():
+            return False
+        if changes is not None:
+            if since is None:
+                # 首次增量同步返回的是全部记录，替换掉全量同步留下的数据
+                songs_data = changes.get("songs") or []
+                artists_data = changes.get("artists") or []
+                albums_data = changes.get("albums") or []
+                store.replace_all(songs_data, artists_data, albums_data, changes.get("serverTime"))
+                self._build_indexes(songs_data, artists_data, albums_data, store.generation(), cancel_event)
+                return True
             
-            for song_data in songs_data:
-                song = Song.from_dict(song_data)
-                
-                text = song.title
-                if song.artist_name:
-                    text += f" - {song.artist_name}"
-                
-                item = QListWidgetItem(text)
-                item.setData(Qt.ItemDataRole.UserRole, song)
-                self.songs_list.addItem(item)
-        except Exception as e:
-            QMessageBox.warning(self, "加载失败", f"无法加载歌曲: {str(e)}")
+            # 先写入镜像，成功且有变化后才更新内存中的索引，索引不会超前于镜像和水位线
+            previous = store.generation()
+            changed = store.apply_changes(changes)
+            if changed:
+                deleted = changes.get("deleted") or {}
+                for kind in SearchIndex.FIELDS:
+                    self.search_index.update(kind, changes.get(kind) or [], deleted.get(kind) or [])
+                for kind in CatalogIndex.KEYS:
+                    self.catalog_index.update(kind, changes.get(kind) or [], deleted.get(kind) or [])
+                # 只在搜索索引的变更日志末尾追加这次的变更，不重写整个文件
+                self._save_search_index_changes(previous, store.generation(), {
+                    kind: (changes.get(kind) or [], deleted.get(kind) or []) for kind in SearchIndex.FIELDS
+                })
+            return changed
+        
+        # 服务器不支持增量同步：全量获取
+        songs_data = []
+        for batch in self.song_service.stream_songs():
+            if cancel_event.is_set():
+                return False
+            if progress is not None and not songs_data:
+                progress({"first_songs": batch})
+            songs_data.extend(batch)
+        artists_data = []
+        for batch in self.song_service.stream_artists():
+            artists_data.extend(batch)
+        artist_ids = [artist_data.get('id') for artist_data in artists_data]
+        
+        if self.async_jobs is not None:
+            albums_data = self.async_jobs.run(self._fetch_albums_async(artist_ids), cancel_event) or []
+        else:
+            albums_data = []
+            for _, albums in self.song_service.get_albums_for_artists(artist_ids, cancel_event=cancel_event):
+                albums_data.extend(albums)
+        
+        if cancel_event.is_set():
+            return False
+        store.replace_all(songs_data, artists_data, albums_data)
+        self._build_indexes(songs_data, artists_data, albums_data, store.generation(), cancel_event)
+        return True
     
-    def _load_artists(self) -> None:
-        """加载艺术家列表"""
-        try:
-            artists_data = self.song_service.get_all_artists()
-            
-            self.artists_list.clear()
+    async def _fetch_albums_async(self, artist_ids: list) -> list:
+        """
+        在异步事件循环中并发获取所有艺术家的专辑
+        
+        Args:
+            artist_ids: 艺术家ID列表
             
-            for artist_data in artists_data:
-                artist = Artist.from_dict(artist_data)
-                
-                item = QListWidgetItem(artist.name)
-                item.setData(Qt.ItemDataRole.UserRole, artist)
-                self.artists_list.addItem(item)
-        except Exception as e:
-            QMessageBox.warning(self, "加载失败", f"无法加载艺术家: {str(e)}")
+        Returns:
+            全部专辑
+        """
+        albums_data = []
+        async for _, albums in self.async_song_service.get_albums_for_artists(artist_ids):
+            albums_data.extend(albums)
+        return albums_data
+    
+    def _build_indexes(self, songs_data: list, artists_data: list, albums_data: list,
+                       generation: int, cancel_event, load: bool = False) -> None:
+        """
+        用完整曲库重建搜索索引和目录索引（在后台线程中执行）
+        
+        Args:
+            songs_data: 全部歌曲
+            artists_data: 全部艺术家
+            albums_data: 全部专辑
+            generation: 数据对应的镜像版本号，重建的搜索索引按此版本整体保存
+            cancel_event: 取消事件，已被新的同步取代时不保存重建的搜索索引
+            load: 是否先尝试载入保存的搜索索引（版本相同时不必重建）
+        """
+        api_url = self.config.get_api_url()
+        if not (load and self.search_index.load(self.search_index_path, generation, api_url)):
+            self.search_index.build("songs", songs_data)
+            self.search_index.build("artists", artists_data)
+            self.search_index.build("albums", albums_data)
+            if not cancel_event.is_set():
+                self._save_search_index(generation)
+        self.catalog_index.build("songs", songs_data)
+        self.catalog_index.build("albums", albums_data)
     
-    def _load_albums(self) -> None:
-        """加载专辑列表"""
+    def _save_search_index(self, generation: int) -> None:
+        """
+        保存搜索索引（在后台线程中执行）
+        
+        Args:
+            generation: 索引对应的镜像版本号
+        """
         try:
-            # 暂未实现API获取所有专辑，通过艺术家获取
-            albums = []
-            artists_data = self.song_service.get_all_artists()
-            
-            for artist_data in artists_data:
-                artist_id = artist_data.get('id')
-                artist_albums = self.song_service.get_albums_by_artist(artist_id)
-                albums.extend(artist_albums)
-            
-            self.albums_list.clear()
-            
-            for album_data in albums:
-                album = Album.from_dict(album_data)
-                
-                text = album.title
-                if album.artist_name:
-                    text += f" - {album.artist_name}"
-                
-                item = QListWidgetItem(text)
-                item.setData(Qt.ItemDataRole.UserRole, album)
-                self.albums_list.addItem(item)
-        except Exception as e:
-            QMessageBox.warning(self, "加载失败", f"无法加载专辑: {str(e)}")
+            self.search_index.save(self.search_index_path, generation, self.config.get_api_url())
+        except OSError as e:
+            print(f"保存搜索索引失败: {e}")
+    
+    def _save_search_index_changes(self, previous: int, generation: int, changes: dict) -> None:
+        """
+        把一次增量变更追加到搜索索引的变更日志（在后台线程中执行）
+        
+        Args:
+            previous: 变更前的镜像版本号
+            generation: 变更后的镜像版本号
+            changes: 类型 → (新增或修改的记录, 删除的记录ID)
+        """
+        try:
+            self.search_index.save_changes(
+                self.search_index_path, previous, generation, changes, self.config.get_api_url()
+            )
+        except OSError as e:
+            print(f"保存搜索索引失败: {e}")
+    
+    def _show_catalog(self, catalog: dict) -> None:
+        """
+        显示曲库（只刷新catalog中包含的部分）
+        
+        Args:
+            catalog: 包含songs、artists、albums、playlists中若干项的字典，
+                首次全量同步时还可能只包含first_songs（第一批歌曲）；
+                写入了新快照时还包含snapshot_generation和snapshot
+        """
+        if catalog.keys() & {"songs", "artists", "albums"}:
+            # 曲库已变化，缓存的服务器搜索结果作废
+            self.search_cache.clear()
+        
+        if "snapshot_generation" in catalog:
+            # 后台写入了新快照；新快照能打开时换掉旧的映射（列表仍在使用的旧分区各自持有原来的映射）
+            self.snapshot_generation = catalog["snapshot_generation"]
+            if catalog["snapshot"] is not None:
+                self.catalog_snapshot = catalog["snapshot"]
+        
+        if "first_songs" in catalog:
+            self._show_songs(catalog["first_songs"])
+        if "songs" in catalog:
+            self._on_songs_loaded(catalog["songs"])
+        if "artists" in catalog:
+            self._show_artists(catalog["artists"])
+        if "albums" in catalog:
+            self.albums_list.model().set_items(catalog["albums"])
+        if "playlists" in catalog:
+            self.playlist_widget.show_playlists(catalog["playlists"])
+    
+    def _on_songs_loaded(self, songs_data: list) -> None:
+        """
+        处理全部歌曲加载完成
+        
+        Args:
+            songs_data: 歌曲数据列表
+        """
+        self._show_songs(songs_data)
+        
+        # 首次加载后恢复上次的播放队列
+        self._restore_play_queue()
+    
+    def _restore_play_queue(self) -> None:
+        """播放队列为空时恢复上次保存的队列（歌曲在播放到时才查找）"""
+        queue = self.player_widget.queue
+        snapshot = self.config.get_play_queue()
+        if not snapshot or len(queue) > 0:
+            return
+        
+        queue.restore(snapshot, self._queue_song)
+    
+    def _show_songs(self, songs_data: list, show_album: bool = False, more=None) -> None:
+        """
+        显示歌曲列表
+        
+        Args:
+            songs_data: 歌曲数据列表（分页时为第一页）
+            show_album: 是否在标题后显示专辑名（默认显示艺术家名）
+            more: 请求下一页的函数，为None表示没有更多页
+        """
+        self.songs_list.model().set_items(
+            songs_data, format_song_with_album if show_album else format_song, more=more
+        )
+    
+    def _show_artists(self, artists_data: list, more=None) -> None:
+        """
+        显示艺术家列表
+        
+        Args:
+            artists_data: 艺术家数据列表（分页时为第一页）
+            more: 请求下一页的函数，为None表示没有更多页
+        """
+        self.artists_list.model().set_items(artists_data, more=more)
+    
+    def _show_albums(self, albums_data: list, more=None) -> None:
+        """
+        显示专辑列表
+        
+        Args:
+            albums_data: 专辑数据列表（分页时为第一页）
+            more: 请求下一页的函数，为None表示没有更多页
+        """
+        self.albums_list.model().set_items(albums_data, more=more)
+    
+    def _on_tab_changed(self, index: int) -> None:
+        """
+        处理选项卡切换，有搜索内容时在新选项卡中搜索
+        
+        Args:
+            index: 选项卡索引
+        """
+        if self.search_input.text().strip():
+            self.search_timer.start()
     
     def _on_search(self) -> None:
         """处理搜索"""
+        self.search_timer.stop()
         query = self.search_input.text().strip()
         if not query:
             return
@@ -599,37 +1030,75 @@ class MainWindow(QMainWindow):
         # 确定当前选项卡
         current_tab = self.tabs.currentIndex()
         
-        try:
-            if current_tab == 0:  # 歌曲
-                self._search_songs(query)
-            elif current_tab == 1:  # 艺术家
-                self._search_artists(query)
-            elif current_tab == 2:  # 专辑
-                self._search_albums(query)
-        except Exception as e:
-            QMessageBox.warning(self, "搜索失败", f"搜索失败: {str(e)}")
+        if current_tab == 0:  # 歌曲
+            self._search_songs(query)
+        elif current_tab == 1:  # 艺术家
+            self._search_artists(query)
+        elif current_tab == 2:  # 专辑
+            self._search_albums(query)
     
-    def _search_songs(self, query: str) -> None:
+    def _on_search_failed(self, error: str) -> None:
         """
-        搜索歌曲
+        处理搜索失败
         
         Args:
+            error: 错误信息
+        """
+        QMessageBox.warning(self, "搜索失败", f"搜索失败: {error}")
+    
+    def _show_local_results(self, kind: str, query: str, show, page_size: int = 200) -> None:
+        """
+        显示本地索引的检索结果（每页单独检索，只排序有限的候选）
+        
+        Args:
+            kind: 搜索类型（songs、artists、albums）
             query: 搜索关键词
+            show: 显示结果的方法
+            page_size: 每页的数量
         """
-        songs_data = self.song_service.search_songs(query)
+        shown = []
         
-        self.songs_list.clear()
+        def next_page(exclude: list):
+            page = self.search_index.search(kind, query, page_size, exclude)
+            shown.extend(record["id"] for record in page)
+            return page, (more if len(page) == page_size else None)
         
-        for song_data in songs_data:
-            song = Song.from_dict(song_data)
-            
-            text = song.title
-            if song.artist_name:
-                text += f" - {song.artist_name}"
+        def more(deliver) -> None:
+            deliver(*next_page(shown))
+        
+        page, following = next_page(())
+        if following is None:
+            # 不满一页就是全部结果，之后较长的查询可以在其中细化
+            self.search_cache.put(("local", kind), query, page)
+        show(page, more=following)
+    
+    def _show_in_pages(self, show, results: list, page_size: int = 500) -> None:
+        """
+        分页显示已经在内存中的完整结果
+        
+        Args:
+            show: 显示结果的方法
+            results: 全部结果
+            page_size: 每页的数量
+        """
+        def more_from(start: int):
+            if start >= len(results):
+                return None
             
-            item = QListWidgetItem(text)
-            item.setData(Qt.ItemDataRole.UserRole, song)
-            self.songs_list.addItem(item)
+            def more(deliver) -> None:
+                deliver(results[start:start + page_size], more_from(start + page_size))
+            return more
+        
+        show(results[:page_size], more=more_from(page_size))
+    
+    def _search_songs(self, query: str) -> None:
+        """
+        搜索歌曲
+        
+        Args:
+            query: 搜索关键词
+        """
+        self._run_search("songs", query, self.song_service.iter_search_songs, self._show_songs, "title")
     
     def _search_artists(self, query: str) -> None:
         """
@@ -638,16 +1107,7 @@ class MainWindow(QMainWindow):
         Args:
             query: 搜索关键词
         """
-        artists_data = self.song_service.search_artists(query)
-        
-        self.artists_list.clear()
-        
-        for artist_data in artists_data:
-            artist = Artist.from_dict(artist_data)
-            
-            item = QListWidgetItem(artist.name)
-            item.setData(Qt.ItemDataRole.UserRole, artist)
-            self.artists_list.addItem(item)
+        self._run_search("artists", query, self.song_service.iter_search_artists, self._show_artists, "name")
     
     def _search_albums(self, query: str) -> None:
         """
@@ -656,103 +1116,166 @@ class MainWindow(QMainWindow):
         Args:
             query: 搜索关键词
         """
-        albums_data = self.song_service.search_albums(query)
+        self._run_search("albums", query, self.song_service.iter_search_albums, self._show_albums, "title")
+    
+    def _run_search(self, kind: str, query: str, pages_fn, show, field: str) -> None:
+        """
+        执行搜索：优先使用本地索引，其次是缓存，最后请求服务器
+        
+        本地索引每次只排出一页，滚动到末尾时跳过已显示的结果再取下一页；不满一页的
+        完整结果放入缓存，较长的查询由索引在缓存的前缀结果中细化。
+        缓存的服务器结果是完整的列表，同样分页显示。服务器结果按页获取：先显示第一页，列表滚动到末尾时才请求下一页，
+        全部页都获取后结果才放入缓存。新的搜索会取代同一类型尚未返回的
+        服务器请求，旧请求的结果直接丢弃。
+        
+        Args:
+            kind: 搜索类型（songs、artists、albums）
+            query: 搜索关键词
+            pages_fn: 服务器分页搜索方法
+            show: 显示结果的方法
+            field: 结果中用于本地过滤的字段
+        """
+        if self.search_index.is_complete(kind):
+            self.jobs.cancel(kind)
+            local = ("local", kind)
+            results = self.search_cache.get(local, query)
+            if results is None:
+                results = self.search_cache.refine(
+                    local, query, field, lambda broader: self.search_index.refine(kind, query, broader)
+                )
+            if results is not None:
+                show(results)
+            else:
+                self._show_local_results(kind, query, show)
+            return
         
-        self.albums_list.clear()
+        # 缓存命中，或由已缓存的较短前缀的结果过滤得到
+        results = self.search_cache.get(kind, query)
+        if results is None:
+            results = self.search_cache.refine(kind, query, field)
+        if results is not None:
+            self.jobs.cancel(kind)
+            self._show_in_pages(show, results)
+            return
+        
+        # 同一查询的请求已在进行中（没有被其他任务取代）
+        pending = self.pending_searches.get(kind)
+        if pending and pending[0] == query and not pending[1].is_set() and self.jobs.is_running(kind):
+            return
         
-        for album_data in albums_data:
-            album = Album.from_dict(album_data)
+        pages = pages_fn(query)
+        fetched = []
+        
+        def fetch_page(deliver=None) -> None:
+            """获取下一页；deliver为None时是第一页，直接替换列表内容"""
+            def on_page(page) -> None:
+                fetched.extend(page)
+                if page.last:
+                    self.search_cache.put(kind, query, fetched)
+                more = None if page.last else fetch_page
+                if deliver is None:
+                    show(page, more=more)
+                else:
+                    deliver(page, more)
             
-            text = album.title
-            if album.artist_name:
-                text += f" - {album.artist_name}"
+            def on_failed(error: str) -> None:
+                if deliver is not None:
+                    deliver([], None)
+                self._on_search_failed(error)
             
-            item = QListWidgetItem(text)
-            item.setData(Qt.ItemDataRole.UserRole, album)
-            self.albums_list.addItem(item)
+            cancel_event = self.jobs.submit(
+                kind, next, pages,
+                on_success=on_page,
+                on_error=on_failed
+            )
+            self.pending_searches[kind] = (query, cancel_event)
+        
+        fetch_page()
     
-    def _on_song_double_clicked(self, item: QListWidgetItem) -> None:
+    def _on_song_double_clicked(self, index: QModelIndex) -> None:
         """
         处理歌曲双击
         
         Args:
-            item: 双击的列表项
+            index: 双击的列表行
         """
-        song = item.data(Qt.ItemDataRole.UserRole)
-        self._play_song(song)
+        self._play_from_songs_list(index.row())
+    
+    def _play_from_songs_list(self, row: int) -> None:
+        """
+        以歌曲列表当前内容作为播放队列，从指定行开始播放
+        
+        Args:
+            row: 行号
+        """
+        queue = self.player_widget.queue
+        queue.set_source(self.songs_list.model().ids(), self._queue_song, row, "songs")
+        self._play_song(queue.current())
     
-    def _on_artist_double_clicked(self, item: QListWidgetItem) -> None:
+    def _on_artist_double_clicked(self, index: QModelIndex) -> None:
         """
         处理艺术家双击
         
         Args:
-            item: 双击的列表项
+            index: 双击的列表行
         """
-        artist = item.data(Qt.ItemDataRole.UserRole)
+        artist = index.data(CatalogListModel.EntityRole)
         
-        try:
-            # 获取艺术家的歌曲
-            songs_data = self.song_service.get_songs_by_artist(artist.id)
-            
-            # 切换到歌曲选项卡
-            self.tabs.setCurrentIndex(0)
-            
-            # 更新列表
-            self.songs_list.clear()
-            
-            for song_data in songs_data:
-                song = Song.from_dict(song_data)
-                
-                text = song.title
-                if song.album_title:
-                    text += f" ({song.album_title})"
-                
-                item = QListWidgetItem(text)
-                item.setData(Qt.ItemDataRole.UserRole, song)
-                self.songs_list.addItem(item)
-        except Exception as e:
-            QMessageBox.warning(self, "加载失败", f"无法加载艺术家歌曲: {str(e)}")
+        # 切换到歌曲选项卡
+        self.tabs.setCurrentIndex(0)
+        
+        # 曲库已完整加载时直接使用本地索引
+        songs_data = self.catalog_index.songs_by_artist(artist.id)
+        if songs_data is not None:
+            self.jobs.cancel("songs")
+            self._show_songs(songs_data, show_album=True)
+            return
+        
+        # 获取艺术家的歌曲
+        self.jobs.submit(
+            "songs", self.song_service.get_songs_by_artist, artist.id,
+            on_success=lambda songs_data: self._show_songs(songs_data, show_album=True),
+            on_error=lambda error: QMessageBox.warning(self, "加载失败", f"无法加载艺术家歌曲: {error}")
+        )
     
-    def _on_album_double_clicked(self, item: QListWidgetItem) -> None:
+    def _on_album_double_clicked(self, index: QModelIndex) -> None:
         """
         处理专辑双击
         
         Args:
-            item: 双击的列表项
+            index: 双击的列表行
         """
-        album = item.data(Qt.ItemDataRole.UserRole)
+        album = index.data(CatalogListModel.EntityRole)
         
-        try:
-            # 获取专辑的歌曲
-            songs_data = self.song_service.get_songs_by_album(album.id)
-            
-            # 切换到歌曲选项卡
-            self.tabs.setCurrentIndex(0)
-            
-            # 更新列表
-            self.songs_list.clear()
-            
-            for song_data in songs_data:
-                song = Song.from_dict(song_data)
-                
-                text = song.title
-                if song.artist_name:
-                    text += f" - {song.artist_name}"
-                
-                item = QListWidgetItem(text)
-                item.setData(Qt.ItemDataRole.UserRole, song)
-                self.songs_list.addItem(item)
-        except Exception as e:
-            QMessageBox.warning(self, "加载失败", f"无法加载专辑歌曲: {str(e)}")
+        # 切换到歌曲选项卡
+        self.tabs.setCurrentIndex(0)
+        
+        # 曲库已完整加载时直接使用本地索引
+        songs_data = self.catalog_index.songs_by_album(album.id)
+        if songs_data is not None:
+            self.jobs.cancel("songs")
+            self._show_songs(songs_data)
+            return
+        
+        # 获取专辑的歌曲
+        self.jobs.submit(
+            "songs", self.song_service.get_songs_by_album, album.id,
+            on_success=self._show_songs,
+            on_error=lambda error: QMessageBox.warning(self, "加载失败", f"无法加载专辑歌曲: {error}")
+        )
     
-    def _on_playlist_song_selected(self, song: Song) -> None:
+    def _on_playlist_song_selected(self, playlist_id: int, songs: list, index: int) -> None:
         """
-        处理从播放列表选择歌曲
+        处理从播放列表选择歌曲，以该播放列表作为播放队列
         
         Args:
-            song: 选中的歌曲
+            playlist_id: 播放列表ID
+            songs: 播放列表中的歌曲
+            index: 选中歌曲的位置
         """
-        self._play_song(song)
+        queue = self.player_widget.queue
+        queue.set_songs(songs, index, f"playlist:{playlist_id}")
+        self._play_song(queue.current())
     
     def _play_song(self, song: Song) -> None:
         """
@@ -765,171 +1288,220 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            # 获取文件URL
-            file_url = song.file_url
-            
-            # 重新构建文件URL，指向新的文件API
-            if not file_url.startswith(("http://", "https://")):
-                # 从文件路径中提取文件名
-                file_name = file_url.split('/')[-1]
-                # 使用新的API端点构建URL
-                file_url = f"{self.config.get_api_url()}/api/files/music/{file_name}"
-            
-            # 播放歌曲
-            self.player_widget.play_song(song, file_url)
-            
-            # 增加播放次数
-            self.song_service.increment_play_count(song.id)
+            file_url, local_path = self._resolve_song_url(song)
             
-            # 保存最后播放的歌曲
-            self.config.set_last_played_song(song.id)
+            # 优先从本地缓存播放
+            self.player_widget.play_song(song, local_path or file_url)
+            self._on_song_started(song, file_url, local_path)
         except Exception as e:
             import traceback
             traceback.print_exc()  # 打印详细错误
             QMessageBox.warning(self, "播放失败", f"无法播放歌曲: {str(e)}")
     
-    def _on_next_song_requested(self, random=False) -> None:
+    def _resolve_song_url(self, song: Song) -> Tuple[str, Optional[str]]:
         """
-        处理请求下一首歌曲
+        获取歌曲的远程文件URL和本地缓存路径
         
         Args:
-            random: 是否随机选择下一首
+            song: 歌曲对象
+            
+        Returns:
+            (远程文件URL, 本地缓存路径或None)
         """
-        print(f"请求下一首歌曲，随机模式: {random}")
+        # 获取文件URL
+        file_url = song.file_url
         
-        # 获取当前活动的歌曲列表
-        active_list = None
+        # 重新构建文件URL，指向新的文件API
+        if not file_url.startswith(("http://", "https://")):
+            # 从文件路径中提取文件名
+            file_name = file_url.split('/')[-1]
+            # 使用新的API端点构建URL
+            file_url = f"{self.config.get_api_url()}/api/files/music/{file_name}"
         
-        # 检查当前激活的播放列表
-        if hasattr(self.playlist_widget, 'song_list') and self.playlist_widget.current_playlist:
-            print("使用播放列表中的歌曲列表")
-            active_list = self.playlist_widget.song_list
-        # 如果没有激活的播放列表，则使用当前选项卡中的列表
-        elif self.tabs.currentIndex() == 0:  # 歌曲选项卡
-            print("使用歌曲选项卡中的列表")
-            active_list = self.songs_list
-        
-        if not active_list or active_list.count() == 0:
-            print("没有可用的歌曲列表或列表为空")
-            return
+        return file_url, self.audio_cache.lookup(song.id, file_url)
+    
+    def _on_song_started(self, song: Song, file_url: str, local_path: Optional[str]) -> None:
+        """
+        歌曲开始播放后的后台处理
         
-        current_row = active_list.currentRow()
-        print(f"当前行: {current_row}, 总行数: {active_list.count()}")
-        
-        if random:
-            # 随机模式：随机选择一首不是当前播放的歌曲
-            import random as rnd
-            if active_list.count() > 1:
-                # 生成除当前行外的所有可能行号
-                available_rows = [i for i in range(active_list.count()) if i != current_row]
-                next_row = rnd.choice(available_rows)
-                print(f"随机选择下一行: {next_row}")
-            else:
-                next_row = 0  # 只有一首歌曲时就播放它
-                print("只有一首歌，继续播放")
-        else:
-            # 正常/循环模式：顺序播放下一首
-            next_row = current_row + 1
-            print(f"尝试播放下一行: {next_row}")
-            
-            # 如果到达列表末尾，处理循环
-            if next_row >= active_list.count():
-                # 检查播放模式
-                play_mode = self.player_widget.player.play_mode
-                print(f"当前播放模式: {play_mode}")
-                
-                if play_mode == self.player_widget.player.PLAY_MODE_LOOP:
-                    # 循环模式：回到第一首
-                    next_row = 0
-                    print("循环模式：回到第一首")
-                else:
-                    # 正常模式：停止播放
-                    print("正常模式：到达列表末尾，停止播放")
-                    return
-        
-        # 设置当前行并播放
-        print(f"设置当前行为: {next_row} 并播放")
-        active_list.setCurrentRow(next_row)
-        item = active_list.item(next_row)
-        if item:
-            song = item.data(Qt.ItemDataRole.UserRole)
-            self._play_song(song)
+        Args:
+            song: 歌曲对象
+            file_url: 远程文件URL
+            local_path: 本地缓存路径，未缓存时为None
+        """
+        if local_path:
+            # 换成了已缓存的歌曲，之前那首的下载不再需要
+            self.long_jobs.cancel("audio_fill")
+            # 后台完整校验，损坏的文件会被删除，下次播放时重新下载；顺便写入查找时更新的访问时间
+            self.jobs.submit(None, self.audio_cache.verify, song.id, file_url)
+            self.jobs.submit(None, self.audio_cache.flush)
         else:
-            print(f"无法获取行 {next_row} 的歌曲数据")
-
-    def _on_previous_song_requested(self) -> None:
-        """处理请求上一首歌曲"""
-        # 获取当前活动的歌曲列表
-        active_list = None
+            # 未缓存时边播放远程文件边在后台填充缓存
+            self._fill_audio_cache(song, file_url)
         
-        # 检查当前选项卡
-        current_tab = self.tabs.currentIndex()
-        if current_tab == 0:  # 歌曲选项卡
-            active_list = self.songs_list
+        # 增加播放次数（只写本地日志，由后台批量提交；界面上所有显示这首歌的地方立即更新）
+        self.play_counts.record(song.id)
+        identity_map.update(song, play_count=(song.play_count or 0) + 1)
+        self._schedule_play_count_flush()
         
-        # 如果有选中的播放列表，优先使用播放列表
-        if hasattr(self.playlist_widget, 'current_playlist') and self.playlist_widget.current_playlist:
-            active_list = self.playlist_widget.song_list
+        # 保存最后播放的歌曲
+        self.config.set_last_played_song(song.id)
+    
+    def _schedule_play_count_flush(self) -> None:
+        """有未提交的播放次数且没有排定提交时，排定下一次提交"""
+        if self.play_count_timer.isActive() or self.jobs.is_running("play_counts"):
+            return
+        if self.play_counts.pending_count() == 0:
+            return
+        delay = self.play_counts.next_delay(self.play_count_interval)
+        self.play_count_timer.start(int(delay * 1000))
+    
+    def _flush_play_counts(self) -> None:
+        """在后台提交一批播放次数，完成后继续排定剩余部分"""
+        self.jobs.submit(
+            "play_counts", self.play_counts.flush, self.song_service.increment_play_counts,
+            on_success=lambda _: self._schedule_play_count_flush(),
+            on_error=lambda error: print(f"提交播放次数失败: {error}")
+        )
+    
+    def _fill_audio_cache(self, song: Song, file_url: str) -> None:
+        """
+        在后台下载歌曲文件到本地缓存
         
-        if not active_list or active_list.count() == 0:
+        同一时间只填充正在播放的歌曲：切换到另一首歌时，之前的下载被取消。
+        
+        Args:
+            song: 歌曲对象
+            file_url: 远程文件URL
+        """
+        if self.audio_cache.is_filling(song.id, file_url):
             return
         
-        current_row = active_list.currentRow()
-        prev_row = current_row - 1
+        def on_cached(local_path: Optional[str]) -> None:
+            # 仍在播放这首歌时，之后的重播（例如单曲循环）直接使用本地文件
+            current = self.player_widget.current_song
+            if local_path and current and current.id == song.id:
+                self.player_widget.current_url = local_path
         
-        # 如果到达列表开头，根据播放模式处理
-        if prev_row < 0:
-            if self.player_widget.player.play_mode == self.player_widget.player.PLAY_MODE_LOOP:
-                # 循环模式：跳到最后一首
-                prev_row = active_list.count() - 1
-            else:
-                # 正常模式：保持在第一首
-                prev_row = 0
+        def fill(cancel_event) -> Optional[str]:
+            return self.audio_cache.store(song.id, file_url, self.api_client.download(file_url), cancel_event)
         
-        # 设置当前行并播放
-        active_list.setCurrentRow(prev_row)
-        item = active_list.item(prev_row)
-        if item:
-            song = item.data(Qt.ItemDataRole.UserRole)
-            self._play_song(song)
+        self.long_jobs.submit(
+            "audio_fill", fill,
+            with_cancel_event=True,
+            on_success=on_cached,
+            on_error=lambda error: print(f"缓存音频失败: {error}")
+        )
     
-    def _play_next_from_list(self, list_widget: QListWidget) -> None:
+    def _queue_view(self) -> Optional[CatalogListView]:
         """
-        从列表中播放下一首歌曲
+        获取显示当前播放队列来源的列表视图
+        
+        Returns:
+            列表视图，来源当前没有显示时为None
+        """
+        source = self.player_widget.queue.source
+        if source == "songs":
+            return self.songs_list
+        playlist = self.playlist_widget.current_playlist
+        if playlist and source == f"playlist:{playlist.id}":
+            return self.playlist_widget.song_list
+        return None
+    
+    def _select_queue_current(self) -> None:
+        """在来源列表中选中队列的当前歌曲（列表内容已变化时不选中）"""
+        queue = self.player_widget.queue
+        view = self._queue_view()
+        song = queue.current()
+        if view is None or song is None:
+            return
+        entity = view.entity_at(queue.index)
+        if entity is not None and entity.id == song.id:
+            view.set_current_row(queue.index)
+    
+    def _queue_song(self, song_id: int) -> Optional[Song]:
+        """
+        由ID获取播放队列中的歌曲：依次查找已有的实例、歌曲列表的存储和目录索引
         
         Args:
-            list_widget: 列表控件
+            song_id: 歌曲ID
+            
+        Returns:
+            歌曲对象，都找不到时为None
         """
-        current_row = list_widget.currentRow()
-        next_row = current_row + 1
+        song = identity_map.get(Song, song_id)
+        if song is not None:
+            return song
+        
+        store = self.songs_list.model().store
+        rows = store.rows_for_id(song_id)
+        if rows:
+            return store.entity(rows[0])
+        
+        data = self.catalog_index.song(song_id)
+        if data is not None:
+            return Song.from_dict(data)
+        return None
+    
+    def _ensure_queue(self) -> None:
+        """播放队列为空时，以歌曲列表作为来源（从第一首开始）"""
+        queue = self.player_widget.queue
+        if len(queue) == 0 and self.songs_list.count() > 0:
+            queue.set_source(self.songs_list.model().ids(), self._queue_song, -1, "songs")
+    
+    def _on_next_song_requested(self) -> None:
+        """处理请求下一首歌曲"""
+        self._ensure_queue()
+        song = self.player_widget.queue.next()
+        if not song:
+            print("播放队列已结束")
+            return
         
-        if next_row >= list_widget.count():
-            next_row = 0  # 循环到第一首
+        self._select_queue_current()
+        self._play_song(song)
+    
+    def _on_preload_requested(self) -> None:
+        """当前歌曲即将结束，预加载下一首以便无缝切换"""
+        player = self.player_widget.player
+        
+        if player.play_mode == player.PLAY_MODE_SINGLE_LOOP:
+            # 单曲循环：预加载当前歌曲本身，队列不前进
+            song = self.player_widget.current_song
+            self.preload_from_queue = False
+        else:
+            # 只查看不前进，切换成功后再前进到同一首
+            song = self.player_widget.queue.peek_next()
+            self.preload_from_queue = True
+        
+        if not song:
+            return
         
-        list_widget.setCurrentRow(next_row)
-        item = list_widget.item(next_row)
-        if item:
-            song = item.data(Qt.ItemDataRole.UserRole)
-            self._play_song(song)
+        file_url, local_path = self._resolve_song_url(song)
+        self.player_widget.preload_song(song, local_path or file_url)
     
-    def _play_previous_from_list(self, list_widget: QListWidget) -> None:
+    def _on_preloaded_song_started(self, song: Song) -> None:
         """
-        从列表中播放上一首歌曲
+        处理已无缝切换到预加载的歌曲
         
         Args:
-            list_widget: 列表控件
+            song: 开始播放的歌曲
         """
-        current_row = list_widget.currentRow()
-        prev_row = current_row - 1
+        if self.preload_from_queue:
+            self.player_widget.queue.next()
+            self._select_queue_current()
         
-        if prev_row < 0:
-            prev_row = list_widget.count() - 1  # 循环到最后一首
+        file_url, local_path = self._resolve_song_url(song)
+        self._on_song_started(song, file_url, local_path)
+
+    def _on_previous_song_requested(self) -> None:
+        """处理请求上一首歌曲"""
+        self._ensure_queue()
+        song = self.player_widget.queue.previous()
+        if not song:
+            return
         
-        list_widget.setCurrentRow(prev_row)
-        item = list_widget.item(prev_row)
-        if item:
-            song = item.data(Qt.ItemDataRole.UserRole)
-            self._play_song(song)
+        self._select_queue_current()
+        self._play_song(song)
     
     def _show_upload_dialog(self) -> None:
         """显示上传歌曲对话框"""
@@ -939,14 +1511,13 @@ class MainWindow(QMainWindow):
         
         # 选择文件
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "选择音乐文件", "", "音乐文件 (*.mp3 *.wav *.ogg)"
+            self, "选择音乐文件", "", "音乐文件 (*.mp3 *.wav *.ogg *.flac)"
         )
         
         if not file_path:
             return
         
         # 获取歌曲标题（默认为文件名）
-        import os
         default_title = os.path.splitext(os.path.basename(file_path))[0]
         
         title, ok = QInputDialog.getText(
@@ -958,141 +1529,274 @@ class MainWindow(QMainWindow):
             return
         
         # 处理艺术家选择
-        try:
-            artists_data = self.song_service.get_all_artists()
+        self.jobs.submit(
+            "upload", self.song_service.get_all_artists,
+            on_success=lambda artists_data: self._choose_upload_artist(title, file_path, artists_data),
+            on_error=lambda error: QMessageBox.critical(self, "错误", f"发生错误: {error}")
+        )
+    
+    def _choose_upload_artist(self, title: str, file_path: str, artists_data: list) -> None:
+        """
+        选择上传歌曲的艺术家
+        
+        Args:
+            title: 歌曲标题
+            file_path: 本地文件路径
+            artists_data: 所有艺术家数据
+        """
+        # 添加"创建新艺术家"选项
+        artist_names = ["创建新艺术家..."] + [artist['name'] for artist in artists_data]
+        artist_name, ok = QInputDialog.getItem(
+            self, "选择艺术家", "艺术家:", 
+            artist_names, 0, False
+        )
+        
+        if not ok:
+            return
+        
+        # 如果选择了"创建新艺术家"
+        if artist_name == "创建新艺术家...":
+            new_artist_name, ok = QInputDialog.getText(
+                self, "新艺术家", "艺术家名称:"
+            )
+            
+            if not ok or not new_artist_name:
+                return
             
-            # 添加"创建新艺术家"选项
-            artist_names = ["创建新艺术家..."] + [artist['name'] for artist in artists_data]
-            artist_name, ok = QInputDialog.getItem(
-                self, "选择艺术家", "艺术家:", 
-                artist_names, 0, False
+            # 获取可选的艺术家简介
+            new_artist_bio, ok = QInputDialog.getText(
+                self, "艺术家简介", "简介 (可选):"
             )
             
             if not ok:
                 return
             
-            artist_id = None
-            is_new_artist = False  # 标记是否创建了新艺术家
+            new_artist_data = {
+                "name": new_artist_name,
+                "bio": new_artist_bio if new_artist_bio else ""
+            }
             
-            # 如果选择了"创建新艺术家"
-            if artist_name == "创建新艺术家...":
-                new_artist_name, ok = QInputDialog.getText(
-                    self, "新艺术家", "艺术家名称:"
-                )
+            def on_artist_created(response: dict) -> None:
+                artist_id = response.get('id')
                 
-                if not ok or not new_artist_name:
-                    return
+                # 同步曲库
+                self._load_data()
                 
-                # 获取可选的艺术家简介
-                new_artist_bio, ok = QInputDialog.getText(
-                    self, "艺术家简介", "简介 (可选):"
+                QMessageBox.information(
+                    self, "创建成功", 
+                    f"艺术家「{new_artist_name}」创建成功！"
                 )
                 
-                if not ok:
-                    return
-                
-                # 创建新艺术家
-                try:
-                    new_artist_data = {
-                        "name": new_artist_name,
-                        "bio": new_artist_bio if new_artist_bio else ""
-                    }
-                    
-                    # 创建艺术家的API调用
-                    response = self.api_client.post("/api/artists", new_artist_data)
-                    artist_id = response.get('id')
-                    artist_name = new_artist_name
-                    
-                    # 刷新艺术家列表
-                    self._load_artists()
-                    
-                    QMessageBox.information(
-                        self, "创建成功", 
-                        f"艺术家「{new_artist_name}」创建成功！"
-                    )
-                    
-                    is_new_artist = True  # 标记创建了新艺术家
-                except Exception as e:
-                    QMessageBox.critical(self, "创建失败", f"无法创建艺术家: {str(e)}")
-                    return
-            else:
-                # 查找选择的艺术家ID
-                for artist in artists_data:
-                    if artist['name'] == artist_name:
-                        artist_id = artist['id']
-                        break
+                if artist_id:
+                    # 新创建的艺术家不需要尝试获取专辑列表，直接提供创建选项
+                    self._choose_upload_album(title, file_path, artist_id, [])
             
-            if not artist_id:
+            # 创建艺术家的API调用
+            self.jobs.submit(
+                None, self.api_client.post, "/api/artists", new_artist_data,
+                on_success=on_artist_created,
+                on_error=lambda error: QMessageBox.critical(self, "创建失败", f"无法创建艺术家: {error}")
+            )
+            return
+        
+        # 查找选择的艺术家ID
+        artist_id = None
+        for artist in artists_data:
+            if artist['name'] == artist_name:
+                artist_id = artist['id']
+                break
+        
+        if not artist_id:
+            return
+        
+        # 选择专辑（可选），曲库已完整加载时直接使用本地索引
+        albums_data = self.catalog_index.albums_by_artist(artist_id)
+        if albums_data is not None:
+            self._choose_upload_album(title, file_path, artist_id, albums_data)
+            return
+        
+        self.jobs.submit(
+            "upload", self.song_service.get_albums_by_artist, artist_id,
+            on_success=lambda albums_data: self._choose_upload_album(title, file_path, artist_id, albums_data),
+            on_error=lambda error: QMessageBox.critical(self, "错误", f"发生错误: {error}")
+        )
+    
+    def _choose_upload_album(self, title: str, file_path: str, artist_id: int, albums_data: list) -> None:
+        """
+        选择上传歌曲的专辑
+        
+        Args:
+            title: 歌曲标题
+            file_path: 本地文件路径
+            artist_id: 艺术家ID
+            albums_data: 该艺术家的专辑数据
+        """
+        album_id = None
+        album_names = ["(无专辑)", "创建新专辑..."]
+        if albums_data:
+            album_names += [album['title'] for album in albums_data]
+        
+        album_name, ok = QInputDialog.getItem(
+            self, "选择专辑", "专辑:", 
+            album_names, 0, False
+        )
+        
+        if not ok:
+            return
+        
+        if album_name == "创建新专辑...":
+            # 实现创建新专辑的代码
+            new_album_title, ok = QInputDialog.getText(
+                self, "新专辑", "专辑名称:"
+            )
+            
+            if not ok or not new_album_title:
                 return
             
-            # 选择专辑（可选）
-            # 如果是新创建的艺术家，不需要尝试获取专辑列表，直接提供创建选项
-            albums_data = [] if is_new_artist else self.song_service.get_albums_by_artist(artist_id)
+            new_album_data = {
+                "title": new_album_title,
+                "artistId": artist_id
+            }
             
-            album_id = None
-            album_names = ["(无专辑)", "创建新专辑..."]
-            if albums_data:
-                album_names += [album['title'] for album in albums_data]
+            def on_album_created(response: dict) -> None:
+                if response and response.get('id') is not None:
+                    self.catalog_index.update("albums", [response])
+                QMessageBox.information(
+                    self, "创建成功", 
+                    f"专辑「{new_album_title}」创建成功！"
+                )
+                self._upload_song(title, artist_id, response.get('id'), file_path)
             
-            album_name, ok = QInputDialog.getItem(
-                self, "选择专辑", "专辑:", 
-                album_names, 0, False
+            # 调用创建专辑API
+            self.jobs.submit(
+                None, self.api_client.post, "/api/albums", new_album_data,
+                on_success=on_album_created,
+                on_error=lambda error: QMessageBox.critical(self, "创建失败", f"无法创建专辑: {error}")
             )
-            
-            if not ok:
+            return
+        elif album_name != "(无专辑)":
+            # 查找选择的专辑ID
+            for album in albums_data:
+                if album['title'] == album_name:
+                    album_id = album['id']
+                    break
+        
+        self._upload_song(title, artist_id, album_id, file_path)
+    
+    def _upload_song(self, title: str, artist_id: int, album_id: Optional[int], file_path: str) -> None:
+        """
+        上传歌曲
+        
+        Args:
+            title: 歌曲标题
+            artist_id: 艺术家ID
+            album_id: 专辑ID (可选)
+            file_path: 本地文件路径
+        """
+        # 上传进度，取消时停止读取文件（分块上传时下次上传同一文件会续传）
+        progress_dialog = QProgressDialog(f"正在上传「{title}」...", "取消", 0, 100, self)
+        progress_dialog.setWindowTitle("上传歌曲")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+        progress_dialog.setValue(0)
+        progress_dialog.canceled.connect(lambda: self.long_jobs.cancel(("upload_song", file_path)))
+        
+        def on_progress(value: tuple) -> None:
+            sent, total = value
+            progress_dialog.setValue(sent * 100 // total if total else 100)
+        
+        def on_uploaded(song: dict) -> None:
+            progress_dialog.reset()
+            if song and song.get("duplicate"):
+                QMessageBox.information(
+                    self, "歌曲已存在",
+                    f"相同内容的歌曲「{song.get('title', '')}」已经上传过，未重复上传。"
+                )
                 return
             
-            if album_name == "创建新专辑...":
-                # 实现创建新专辑的代码
-                new_album_title, ok = QInputDialog.getText(
-                    self, "新专辑", "专辑名称:"
-                )
-                
-                if not ok or not new_album_title:
-                    return
-                
-                # 创建新专辑
-                try:
-                    new_album_data = {
-                        "title": new_album_title,
-                        "artistId": artist_id
-                    }
-                    
-                    # 调用创建专辑API
-                    response = self.api_client.post("/api/albums", new_album_data)
-                    album_id = response.get('id')
-                    
-                    QMessageBox.information(
-                        self, "创建成功", 
-                        f"专辑「{new_album_title}」创建成功！"
-                    )
-                except Exception as e:
-                    QMessageBox.critical(self, "创建失败", f"无法创建专辑: {str(e)}")
-                    return
-            elif album_name != "(无专辑)":
-                # 查找选择的专辑ID
-                for album in albums_data:
-                    if album['title'] == album_name:
-                        album_id = album['id']
-                        break
+            # 新歌立即加入本地索引，不必等待同步
+            if song and song.get("id") is not None:
+                self.search_index.update("songs", [song])
+                self.catalog_index.update("songs", [song])
             
-            # 上传歌曲
-            try:
-                song_data = self.song_service.upload_song(
-                    title, artist_id, album_id, file_path
-                )
-                
-                QMessageBox.information(
-                    self, "上传成功", 
-                    "歌曲上传成功！将刷新歌曲列表。"
+            QMessageBox.information(
+                self, "上传成功", 
+                "歌曲上传成功！将刷新歌曲列表。"
+            )
+            
+            # 同步曲库
+            self._load_data()
+        
+        def on_failed(error: str) -> None:
+            progress_dialog.reset()
+            QMessageBox.critical(self, "上传失败", f"无法上传歌曲: {error}")
+        
+        self.long_jobs.submit(
+            ("upload_song", file_path), self.song_service.upload_song, title, artist_id, album_id, file_path,
+            on_success=on_uploaded,
+            on_error=on_failed,
+            on_progress=on_progress
+        )
+    
+    def _show_import_dialog(self) -> None:
+        """选择目录并批量导入其中的音乐文件"""
+        if not self.current_user:
+            QMessageBox.warning(self, "未登录", "请先登录后再导入歌曲")
+            return
+        
+        root = QFileDialog.getExistingDirectory(self, "选择要导入的目录")
+        if not root:
+            return
+        
+        importer = BulkImporter(
+            self.song_service, self.artist_service,
+            upload_workers=self.config.get("import_upload_workers", 4)
+        )
+        
+        progress_dialog = QProgressDialog("正在扫描...", "取消", 0, 0, self)
+        progress_dialog.setWindowTitle("批量导入")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setAutoReset(False)
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.canceled.connect(lambda: self.long_jobs.cancel(("bulk_import", root)))
+        
+        stage_names = {"scan": "扫描", "resolve": "建立艺术家和专辑", "upload": "上传"}
+        
+        def on_progress(state: dict) -> None:
+            total = state["total"] or 0
+            progress_dialog.setMaximum(total)
+            progress_dialog.setValue(min(state["done"], total) if total else 0)
+            name = os.path.basename(state["path"]) if state["path"] else ""
+            progress_dialog.setLabelText(
+                f"{stage_names[state['stage']]}: {state['done']}" + (f"/{total}" if total else "") + f"\n{name}"
+            )
+        
+        def on_finished(summary: dict) -> None:
+            progress_dialog.reset()
+            message = (
+                f"上传 {summary['uploaded']} 首，跳过重复 {summary['duplicates']} 首，"
+                f"跳过已导入 {summary['skipped']} 首，失败 {summary['failed']} 首。\n"
+                f"用时 {summary['elapsed']:.0f} 秒，每分钟 {summary['files_per_minute']:.1f} 个文件。"
+            )
+            if summary["errors"]:
+                message += "\n\n" + "\n".join(
+                    f"{os.path.basename(path)}: {error}" for path, error in summary["errors"][:5]
                 )
-                
-                # 刷新歌曲列表
-                self._load_songs()
-            except Exception as e:
-                QMessageBox.critical(self, "上传失败", f"无法上传歌曲: {str(e)}")
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"发生错误: {str(e)}")
+            QMessageBox.information(self, "导入完成", message)
+            
+            if summary["uploaded"]:
+                self._load_data()
+        
+        def on_failed(error: str) -> None:
+            progress_dialog.reset()
+            QMessageBox.critical(self, "导入失败", f"批量导入失败: {error}")
+        
+        self.long_jobs.submit(
+            ("bulk_import", root), importer.run, root,
+            on_success=on_finished,
+            on_error=on_failed,
+            on_progress=on_progress
+        )
     
     def _show_settings_dialog(self) -> None:
         """显示设置对话框"""
@@ -1106,12 +1810,58 @@ class MainWindow(QMainWindow):
         if ok and url:
             self.config.set("api_url", url)
             self.api_client.base_url = url
+            if self.async_jobs is not None:
+                # 旧会话的连接都指向原来的服务器，关闭后下次请求时重新创建
+                self.async_api_client.base_url = url
+                self.async_jobs.submit(None, self.async_api_client.close)
+            # 正在进行的同步属于原来的服务器，结果（包括写入的快照）不再使用
+            self.long_jobs.cancel("catalog")
+            self.catalog_store.bind_server(url)
+            self.snapshot_generation = None
+            self.search_index = SearchIndex()
+            self.catalog_index = CatalogIndex()
             
             QMessageBox.information(
                 self, "设置已保存", 
                 "设置已更新。建议重新启动应用程序使设置生效。"
             )
     
+    def _update_position_visibility(self) -> None:
+        """窗口隐藏或最小化时停止刷新播放进度"""
+        visible = self.isVisible() and not self.isMinimized()
+        self.player_widget.player.set_position_updates_visible(visible)
+    
+    def showEvent(self, event) -> None:
+        """
+        处理窗口显示事件
+        
+        Args:
+            event: 显示事件
+        """
+        super().showEvent(event)
+        self._update_position_visibility()
+    
+    def hideEvent(self, event) -> None:
+        """
+        处理窗口隐藏事件
+        
+        Args:
+            event: 隐藏事件
+        """
+        super().hideEvent(event)
+        self._update_position_visibility()
+    
+    def changeEvent(self, event) -> None:
+        """
+        处理窗口状态变化（最小化/还原）
+        
+        Args:
+            event: 状态变化事件
+        """
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_position_visibility()
+    
     def closeEvent(self, event) -> None:
         """
         处理窗口关闭事件
@@ -1123,7 +1873,34 @@ class MainWindow(QMainWindow):
         volume = self.player_widget.volume_slider.value()
         self.config.set_volume(volume)
         
+        # 保存播放队列
+        if len(self.player_widget.queue) > 0:
+            self.config.set_play_queue(self.player_widget.queue.snapshot())
+        
         # 停止播放
         self.player_widget.stop()
         
+        # 取消所有后台任务
+        self.jobs.cancel_all()
+        self.long_jobs.cancel_all()
+        self.playlist_widget.jobs.cancel_all()
+        
+        # 写入音频缓存的访问时间
+        self.audio_cache.flush()
+        
+        # 关闭HTTP会话，释放连接池
+        self.api_client.close()
+        if self.async_jobs is not None:
+            self.async_jobs.shutdown(self.async_api_client.close())
+        
+        # 取消只是置位事件，等待仍在运行的同步、音频填充和播放次数提交退出后再关闭它们使用的
+        # 镜像和播放日志；超时仍未退出时不关闭，由进程退出时释放（未提交的播放次数下次启动时提交）
+        finished = self.long_pool.waitForDone(5000)
+        finished = QThreadPool.globalInstance().waitForDone(2000) and finished
+        if finished:
+            self.catalog_store.close()
+            self.play_counts.close()
+        else:
+            print("后台任务未能及时退出，跳过关闭曲库镜像和播放日志")
+        
         super().closeEvent(event)
\ No newline at end of file
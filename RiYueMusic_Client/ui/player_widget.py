@@ -10,6 +10,7 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QIcon, QPixmap, QAction
 
 from ..utils.player import AudioPlayer
+from ..utils.play_queue import PlayQueue
 from ..models.song import Song
 from ..utils.config import Config
 
@@ -18,8 +19,10 @@ class PlayerWidget(QWidget):
     """音乐播放器控件"""
     
     # 自定义信号
-    next_song_requested = pyqtSignal(bool)  # 请求下一首歌曲，参数表示是否随机
+    next_song_requested = pyqtSignal()  # 请求下一首歌曲（顺序由播放队列决定）
     previous_song_requested = pyqtSignal()  # 请求上一首歌曲
+    preload_requested = pyqtSignal()  # 当前歌曲即将结束，请求预加载下一首
+    preloaded_song_started = pyqtSignal(Song)  # 已无缝切换到预加载的歌曲
     
     def __init__(self, config=None, parent=None):
         """
@@ -40,10 +43,21 @@ class PlayerWidget(QWidget):
         self.player.duration_changed.connect(self._on_duration_changed)
         self.player.playback_status_changed.connect(self._on_playback_status_changed)
         self.player.media_finished.connect(self._on_media_finished)
+        self.player.preload_requested.connect(self.preload_requested)
+        self.player.preloaded_media_started.connect(self._on_preloaded_media_started)
+        if self.config:
+            self.player.preload_threshold_ms = self.config.get("preload_threshold_ms", 15000)
+            self.player.position_refresh_ms = self.config.get("position_refresh_ms", 200)
         
         # 当前播放的歌曲
         self.current_song = None
         
+        # 已预加载的下一首 (歌曲, URL)
+        self.preloaded = None
+        
+        # 播放队列，播放顺序随播放模式变化
+        self.queue = PlayQueue()
+        
         self._init_ui()
         
         # 加载保存的播放模式
@@ -252,17 +266,18 @@ class PlayerWidget(QWidget):
                 # 重新播放
                 self.play_song(self.current_song, self.current_url)
         else:
-            # 其他模式：请求下一首
-            play_mode = self.player.play_mode
-            if play_mode == self.player.PLAY_MODE_NORMAL:
-                print("正常模式：请求下一首")
-                self.next_song_requested.emit(False)
-            elif play_mode == self.player.PLAY_MODE_LOOP:
-                print("循环模式：请求下一首")
-                self.next_song_requested.emit(False)
-            elif play_mode == self.player.PLAY_MODE_SHUFFLE:
-                print("随机模式：请求随机下一首")
-                self.next_song_requested.emit(True)
+            # 其他模式：请求下一首，顺序或随机由播放队列决定
+            self.next_song_requested.emit()
+    
+    def _on_preloaded_media_started(self) -> None:
+        """处理播放器已切换到预加载的歌曲"""
+        if not self.preloaded:
+            return
+        
+        song, url = self.preloaded
+        self.preloaded = None
+        self._show_song(song, url)
+        self.preloaded_song_started.emit(song)
     
     def _on_progress_slider_moved(self, position: int) -> None:
         """
@@ -294,9 +309,7 @@ class PlayerWidget(QWidget):
     
     def _on_next_clicked(self) -> None:
         """处理下一首按钮点击"""
-        # 传递参数，表示是否随机选择下一首
-        is_random = (self.player.play_mode == self.player.PLAY_MODE_SHUFFLE)
-        self.next_song_requested.emit(is_random)
+        self.next_song_requested.emit()
     
     def _on_volume_button_clicked(self) -> None:
         """处理音量按钮点击"""
@@ -331,6 +344,15 @@ class PlayerWidget(QWidget):
         """
         self.player.set_play_mode(mode)
         
+        # 同步播放队列的顺序；已按旧顺序预加载的下一首作废
+        self.queue.set_mode(
+            shuffle=(mode == self.player.PLAY_MODE_SHUFFLE),
+            repeat=(mode in (self.player.PLAY_MODE_LOOP, self.player.PLAY_MODE_SHUFFLE))
+        )
+        if self.preloaded:
+            self.preloaded = None
+            self.player.cancel_preload()
+        
         # 更新菜单项选中状态
         self.normal_mode_action.setChecked(mode == 0)
         self.loop_mode_action.setChecked(mode == 1)
@@ -364,6 +386,31 @@ class PlayerWidget(QWidget):
         if not song:
             return
         
+        self.preloaded = None
+        self._show_song(song, url)
+        
+        # 播放歌曲
+        self.player.play(url)
+    
+    def preload_song(self, song: Song, url: str) -> None:
+        """
+        预加载下一首歌曲，当前歌曲结束时无缝切换
+        
+        Args:
+            song: 下一首歌曲
+            url: 音频文件URL或本地路径
+        """
+        self.preloaded = (song, url)
+        self.player.preload(url)
+    
+    def _show_song(self, song: Song, url: str) -> None:
+        """
+        设置当前歌曲并更新界面
+        
+        Args:
+            song: 歌曲对象
+            url: 音频文件URL
+        """
         self.current_song = song
         self.current_url = url
         
@@ -380,12 +427,10 @@ class PlayerWidget(QWidget):
         else:
             # 没有服务器时长，初始显示0:00，等待播放器解析
             self.duration_label.setText("0:00")
-        
-        # 播放歌曲
-        self.player.play(url)
     
     def stop(self) -> None:
         """停止播放"""
+        self.preloaded = None
         self.player.stop()
         self.current_song = None
         self.song_title_label.setText("未播放")
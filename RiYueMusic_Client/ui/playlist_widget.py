@@ -6,18 +6,21 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QListWidget, QListWidgetItem, QMenu, QInputDialog, QMessageBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QModelIndex
+from typing import Callable, Dict, Optional
 
 from ..models.playlist import Playlist
 from ..models.song import Song
 from ..api.playlist_service import PlaylistService
+from ..utils.workers import JobRunner
+from .catalog_model import CatalogListModel, CatalogListView, format_song
 
 
 class PlaylistWidget(QWidget):
     """播放列表控件"""
     
     # 自定义信号
-    song_selected = pyqtSignal(Song)  # 选择歌曲信号
+    song_selected = pyqtSignal(int, list, int)  # 选择歌曲信号：播放列表ID, 播放列表中的歌曲, 选中的位置
     
     def __init__(self, playlist_service: PlaylistService, parent=None):
         """
@@ -33,6 +36,12 @@ class PlaylistWidget(QWidget):
         self.current_playlist = None
         self.playlists = []
         
+        # 已获取内容的播放列表（按ID），摘要的版本（updatedAt）不变时直接使用
+        self.contents: Dict[int, Playlist] = {}
+        
+        # 后台任务调度器
+        self.jobs = JobRunner(self)
+        
         self._init_ui()
     
     def _init_ui(self) -> None:
@@ -63,8 +72,8 @@ class PlaylistWidget(QWidget):
         # 歌曲列表
         layout.addWidget(QLabel("歌曲:"))
         
-        self.song_list = QListWidget()
-        self.song_list.itemDoubleClicked.connect(self._on_song_double_clicked)
+        self.song_list = CatalogListView(CatalogListModel(Song, format_song, parent=self))
+        self.song_list.doubleClicked.connect(self._on_song_double_clicked)
         self.song_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.song_list.customContextMenuRequested.connect(self._show_song_context_menu)
         layout.addWidget(self.song_list)
@@ -73,20 +82,93 @@ class PlaylistWidget(QWidget):
     
     def load_playlists(self) -> None:
         """加载用户的播放列表"""
-        try:
-            # 获取用户播放列表
-            playlists_data = self.playlist_service.get_my_playlists()
+        # 获取用户播放列表
+        self.jobs.submit(
+            "playlists", self.playlist_service.get_my_playlists,
+            on_success=self.show_playlists,
+            on_error=lambda error: QMessageBox.warning(self, "加载失败", f"无法加载播放列表: {error}")
+        )
+    
+    def show_playlists(self, playlists_data: list) -> None:
+        """
+        显示播放列表（从服务器或本地曲库镜像加载完成后）
+        
+        Args:
+            playlists_data: 播放列表数据
+        """
+        # 转换为播放列表摘要（歌曲在打开播放列表时才创建）
+        self.playlists = []
+        for playlist_data in playlists_data:
+            playlist = Playlist.from_dict(playlist_data)
+            self.playlists.append(playlist)
+            if playlist.is_hydrated:
+                self.contents[playlist.id] = playlist
+        
+        # 丢弃已删除的播放列表的内容缓存
+        playlist_ids = {playlist.id for playlist in self.playlists}
+        for playlist_id in list(self.contents):
+            if playlist_id not in playlist_ids:
+                del self.contents[playlist_id]
+        
+        # 更新播放列表选择器
+        self._update_playlist_list()
+    
+    def _cached_content(self, playlist: Playlist) -> Optional[Playlist]:
+        """
+        获取仍然有效的播放列表内容
+        
+        Args:
+            playlist: 播放列表摘要
             
-            # 转换为播放列表对象
-            self.playlists = []
-            for playlist_data in playlists_data:
-                playlist = Playlist.from_dict(playlist_data)
-                self.playlists.append(playlist)
+        Returns:
+            包含歌曲的播放列表；没有缓存或版本已变化时为None
+        """
+        if playlist.is_hydrated:
+            return playlist
+        content = self.contents.get(playlist.id)
+        if content is not None and playlist.version is not None and content.version == playlist.version:
+            return content
+        return None
+    
+    def _with_content(self, playlist: Playlist, callback: Callable[[Playlist], None]) -> None:
+        """
+        取得播放列表内容后调用callback：有效的缓存立即使用，否则从服务器获取
+        
+        Args:
+            playlist: 播放列表摘要
+            callback: 参数为包含歌曲的播放列表
+        """
+        content = self._cached_content(playlist)
+        if content is not None:
+            self.jobs.cancel("playlist_content")
+            callback(content)
+            return
+        
+        def on_loaded(playlist_data: dict) -> None:
+            content = Playlist.from_dict(playlist_data)
+            self.contents[content.id] = content
+            callback(content)
+        
+        self.jobs.submit(
+            "playlist_content", self.playlist_service.get_playlist, playlist.id,
+            on_success=on_loaded,
+            on_error=lambda error: QMessageBox.warning(self, "加载失败", f"无法加载播放列表: {error}")
+        )
+    
+    def _find_playlist(self, playlist_id: int) -> Optional[Playlist]:
+        """
+        按ID查找播放列表摘要
+        
+        Args:
+            playlist_id: 播放列表ID
             
-            # 更新播放列表选择器
-            self._update_playlist_list()
-        except Exception as e:
-            QMessageBox.warning(self, "加载失败", f"无法加载播放列表: {str(e)}")
+        Returns:
+            播放列表摘要，不存在时为None
+        """
+        for playlist in self.playlists:
+            if playlist.id == playlist_id:
+                return playlist
+        return None
     
     def _update_playlist_list(self) -> None:
         """更新播放列表选择器"""
@@ -99,19 +181,11 @@ class PlaylistWidget(QWidget):
     
     def _update_song_list(self) -> None:
         """更新歌曲列表"""
-        self.song_list.clear()
-        
         if not self.current_playlist:
+            self.song_list.model().clear()
             return
         
-        for song in self.current_playlist.songs:
-            text = f"{song.title}"
-            if song.artist_name:
-                text += f" - {song.artist_name}"
-            
-            item = QListWidgetItem(text)
-            item.setData(Qt.ItemDataRole.UserRole, song)
-            self.song_list.addItem(item)
+        self.song_list.model().set_entities(self.current_playlist.songs)
             
     def _on_playlist_selected(self, item: QListWidgetItem) -> None:
         """
@@ -120,31 +194,46 @@ class PlaylistWidget(QWidget):
         Args:
             item: 选中的列表项
         """
-        playlist_id = item.data(Qt.ItemDataRole.UserRole)
+        playlist = self._find_playlist(item.data(Qt.ItemDataRole.UserRole))
+        if playlist is None:
+            return
         
-        # 查找选中的播放列表
-        for playlist in self.playlists:
-            if playlist.id == playlist_id:
-                self.current_playlist = playlist
-                break
+        # 内容未就绪前先清空歌曲列表，避免显示上一个播放列表的歌曲
+        self.current_playlist = playlist
+        if self._cached_content(playlist) is None:
+            self.song_list.model().clear()
+        self._with_content(playlist, self._show_content)
+    
+    def _show_content(self, content: Playlist) -> None:
+        """
+        显示播放列表内容（仅在该播放列表仍被选中时）
         
-        # 重新加载播放列表内容
-        try:
-            playlist_data = self.playlist_service.get_playlist(playlist_id)
-            self.current_playlist = Playlist.from_dict(playlist_data)
+        Args:
+            content: 包含歌曲的播放列表
+        """
+        if self.current_playlist and self.current_playlist.id == content.id:
+            self.current_playlist = content
             self._update_song_list()
-        except Exception as e:
-            QMessageBox.warning(self, "加载失败", f"无法加载播放列表: {str(e)}")
     
-    def _on_song_double_clicked(self, item: QListWidgetItem) -> None:
+    def _show_playlist_content(self, playlist_data: dict) -> None:
+        """
+        显示播放列表内容（例如修改播放列表后服务器返回的详情）
+        
+        Args:
+            playlist_data: 播放列表详情
+        """
+        self.current_playlist = Playlist.from_dict(playlist_data)
+        self.contents[self.current_playlist.id] = self.current_playlist
+        self._update_song_list()
+    
+    def _on_song_double_clicked(self, index: QModelIndex) -> None:
         """
         处理歌曲双击
         
         Args:
-            item: 双击的列表项
+            index: 双击的列表行
         """
-        song = item.data(Qt.ItemDataRole.UserRole)
-        self.song_selected.emit(song)
+        self.song_selected.emit(self.current_playlist.id, self.current_playlist.songs, index.row())
     
     def _on_create_playlist(self) -> None:
         """处理创建播放列表"""
@@ -154,26 +243,34 @@ class PlaylistWidget(QWidget):
         )
         
         if ok and name:
-            try:
-                # 创建播放列表
-                playlist_data = self.playlist_service.create_playlist(name)
-                
-                # 添加到播放列表集合
-                playlist = Playlist.from_dict(playlist_data)
-                self.playlists.append(playlist)
-                
-                # 更新UI
-                self._update_playlist_list()
-                
-                # 选择新创建的播放列表
-                for i in range(self.playlist_list.count()):
-                    item = self.playlist_list.item(i)
-                    if item.data(Qt.ItemDataRole.UserRole) == playlist.id:
-                        self.playlist_list.setCurrentItem(item)
-                        self._on_playlist_selected(item)
-                        break
-            except Exception as e:
-                QMessageBox.warning(self, "创建失败", f"无法创建播放列表: {str(e)}")
+            # 创建播放列表
+            self.jobs.submit(
+                None, self.playlist_service.create_playlist, name,
+                on_success=self._on_playlist_created,
+                on_error=lambda error: QMessageBox.warning(self, "创建失败", f"无法创建播放列表: {error}")
+            )
+    
+    def _on_playlist_created(self, playlist_data: dict) -> None:
+        """
+        处理播放列表创建成功
+        
+        Args:
+            playlist_data: 新播放列表详情
+        """
+        # 添加到播放列表集合
+        playlist = Playlist.from_dict(playlist_data)
+        self.playlists.append(playlist)
+        
+        # 更新UI
+        self._update_playlist_list()
+        
+        # 选择新创建的播放列表
+        for i in range(self.playlist_list.count()):
+            item = self.playlist_list.item(i)
+            if item.data(Qt.ItemDataRole.UserRole) == playlist.id:
+                self.playlist_list.setCurrentItem(item)
+                self._on_playlist_selected(item)
+                break
     
     def _show_playlist_context_menu(self, position) -> None:
         """显示播放列表上下文菜单"""
@@ -193,22 +290,29 @@ class PlaylistWidget(QWidget):
         action = menu.exec(self.playlist_list.mapToGlobal(position))
         
         if action == play_action:
-            # 播放整个播放列表
-            for playlist in self.playlists:
-                if playlist.id == playlist_id:
-                    self.current_playlist = playlist
-                    self._update_song_list()
-                    # 如果播放列表有歌曲，播放第一首
-                    if len(playlist.songs) > 0:
-                        self.song_list.setCurrentRow(0)
-                        song = self.song_list.item(0).data(Qt.ItemDataRole.UserRole)
-                        self.song_selected.emit(song)
-                    break
+            # 播放整个播放列表（内容未缓存时先获取）
+            playlist = self._find_playlist(playlist_id)
+            if playlist is not None:
+                self.current_playlist = playlist
+                self._with_content(playlist, self._play_content)
         elif action == rename_action:
             self._rename_playlist(playlist_id, item.text())
         elif action == delete_action:
             self._delete_playlist(playlist_id)
     
+    def _play_content(self, content: Playlist) -> None:
+        """
+        显示并从第一首开始播放播放列表
+        
+        Args:
+            content: 包含歌曲的播放列表
+        """
+        self._show_content(content)
+        # 如果播放列表有歌曲，播放第一首
+        if self.current_playlist is content and len(content.songs) > 0:
+            self.song_list.set_current_row(0)
+            self.song_selected.emit(content.id, content.songs, 0)
+    
     def _rename_playlist(self, playlist_id: int, current_name: str) -> None:
         """
         重命名播放列表
@@ -223,23 +327,16 @@ class PlaylistWidget(QWidget):
         )
         
         if ok and name and name != current_name:
-            try:
-                # 获取当前描述
-                description = ""
-                for playlist in self.playlists:
-                    if playlist.id == playlist_id:
-                        description = playlist.description or ""
-                        break
-                
-                # 更新播放列表
-                playlist_data = self.playlist_service.update_playlist(
-                    playlist_id, name, description
-                )
-                
-                # 重新加载播放列表
-                self.load_playlists()
-            except Exception as e:
-                QMessageBox.warning(self, "重命名失败", f"无法重命名播放列表: {str(e)}")
+            # 获取当前描述
+            playlist = self._find_playlist(playlist_id)
+            description = (playlist.description or "") if playlist else ""
+            
+            # 更新播放列表，完成后重新加载
+            self.jobs.submit(
+                None, self.playlist_service.update_playlist, playlist_id, name, description,
+                on_success=lambda _: self.load_playlists(),
+                on_error=lambda error: QMessageBox.warning(self, "重命名失败", f"无法重命名播放列表: {error}")
+            )
     
     def _delete_playlist(self, playlist_id: int) -> None:
         """
@@ -255,19 +352,29 @@ class PlaylistWidget(QWidget):
         )
         
         if confirm == QMessageBox.StandardButton.Yes:
-            try:
-                # 删除播放列表
-                self.playlist_service.delete_playlist(playlist_id)
-                
-                # 如果当前显示的就是被删除的播放列表，清空
-                if self.current_playlist and self.current_playlist.id == playlist_id:
-                    self.current_playlist = None
-                    self.song_list.clear()
-                
-                # 重新加载播放列表
-                self.load_playlists()
-            except Exception as e:
-                QMessageBox.warning(self, "删除失败", f"无法删除播放列表: {str(e)}")
+            # 删除播放列表
+            self.jobs.submit(
+                None, self.playlist_service.delete_playlist, playlist_id,
+                on_success=lambda _: self._on_playlist_deleted(playlist_id),
+                on_error=lambda error: QMessageBox.warning(self, "删除失败", f"无法删除播放列表: {error}")
+            )
+    
+    def _on_playlist_deleted(self, playlist_id: int) -> None:
+        """
+        处理播放列表删除成功
+        
+        Args:
+            playlist_id: 已删除的播放列表ID
+        """
+        # 如果当前显示的就是被删除的播放列表，清空
+        if self.current_playlist and self.current_playlist.id == playlist_id:
+            self.jobs.cancel("playlist_content")
+            self.current_playlist = None
+            self.song_list.model().clear()
+        self.contents.pop(playlist_id, None)
+        
+        # 重新加载播放列表
+        self.load_playlists()
     
     def _show_song_context_menu(self, position) -> None:
         """
@@ -279,11 +386,11 @@ class PlaylistWidget(QWidget):
         if not self.current_playlist:
             return
         
-        item = self.song_list.itemAt(position)
-        if not item:
+        index = self.song_list.indexAt(position)
+        if not index.isValid():
             return
         
-        song = item.data(Qt.ItemDataRole.UserRole)
+        song = index.data(CatalogListModel.EntityRole)
         
         # 创建上下文菜单
         menu = QMenu()
@@ -294,7 +401,7 @@ class PlaylistWidget(QWidget):
         action = menu.exec(self.song_list.mapToGlobal(position))
         
         if action == play_action:
-            self.song_selected.emit(song)
+            self.song_selected.emit(self.current_playlist.id, self.current_playlist.songs, index.row())
         elif action == remove_action:
             self._remove_song_from_playlist(song.id)
     
@@ -308,14 +415,16 @@ class PlaylistWidget(QWidget):
         if not self.current_playlist:
             return
         
-        try:
-            # 从播放列表移除歌曲
-            playlist_data = self.playlist_service.remove_song_from_playlist(
-                self.current_playlist.id, song_id
-            )
-            
-            # 更新当前播放列表
-            self.current_playlist = Playlist.from_dict(playlist_data)
-            self._update_song_list()
-        except Exception as e:
-            QMessageBox.warning(self, "移除失败", f"无法从播放列表移除歌曲: {str(e)}")
\ No newline at end of file
+        playlist_id = self.current_playlist.id
+        
+        def on_removed(playlist_data: dict) -> None:
+            # 仅在仍显示该播放列表时更新
+            if self.current_playlist and self.current_playlist.id == playlist_id:
+                self._show_playlist_content(playlist_data)
+        
+        # 从播放列表移除歌曲，完成后更新当前播放列表
+        self.jobs.submit(
+            None, self.playlist_service.remove_song_from_playlist, playlist_id, song_id,
+            on_success=on_removed,
+            on_error=lambda error: QMessageBox.warning(self, "移除失败", f"无法从播放列表移除歌曲: {error}")
+        )
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+异步任务 - 在专用线程的asyncio事件循环中执行协程，结果回到界面线程
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class _AsyncJobSignals(QObject):
+    """协程结果信号（从事件循环线程发出，在界面线程中以排队方式接收）"""
+
+    succeeded = pyqtSignal(object, int, object)  # 任务键, 任务代号, 结果
+    failed = pyqtSignal(object, int, str)        # 任务键, 任务代号, 错误信息
+
+
+class AsyncJobRunner(QObject):
+    """
+    界面与asyncio之间的桥梁
+
+    所有协程都在同一个后台线程的事件循环中运行，因此成百上千个并发请求
+    只占用一个线程，也不会阻塞界面。submit()的用法与JobRunner相同：
+    同一个键的新任务会取消尚未完成的旧任务，回调都在界面线程中执行。
+    线程池中的同步任务可以用run()等待协程完成。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """
+        初始化并启动事件循环线程
+
+        Args:
+            parent: 父对象
+        """
+        super().__init__(parent)
+
+        self._signals = _AsyncJobSignals()
+        self._signals.succeeded.connect(self._on_succeeded)
+        self._signals.failed.connect(self._on_failed)
+
+        self._generation = itertools.count(1)
+        self._anonymous_keys = itertools.count()
+        self._jobs: Dict[Hashable, Dict[str, Any]] = {}
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="asyncio", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        """事件循环线程"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, key: Optional[Hashable], coro_fn: Callable[..., Awaitable], *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None,
+               **kwargs) -> concurrent.futures.Future:
+        """
+        提交协程任务
+
+        Args:
+            key: 任务键，为None时不与其他任务合并
+            coro_fn: 协程函数
+            *args: 位置参数
+            on_success: 成功回调，参数为返回值
+            on_error: 失败回调，参数为错误信息
+            **kwargs: 关键字参数
+
+        Returns:
+            任务的Future，可以调用cancel()取消
+        """
+        if key is None:
+            key = ("anonymous", next(self._anonymous_keys))
+        else:
+            self.cancel(key)
+
+        generation = next(self._generation)
+        future = asyncio.run_coroutine_threadsafe(coro_fn(*args, **kwargs), self.loop)
+        self._jobs[key] = {
+            "generation": generation,
+            "on_success": on_success,
+            "on_error": on_error,
+            "future": future,
+        }
+
+        signals = self._signals
+
+        def done(finished: concurrent.futures.Future) -> None:
+            if finished.cancelled():
+                return
+            error = finished.exception()
+            if error is not None:
+                signals.failed.emit(key, generation, str(error))
+            else:
+                signals.succeeded.emit(key, generation, finished.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def run(self, coro: Awaitable, cancel_event: Optional[threading.Event] = None) -> Any:
+        """
+        在事件循环中执行协程并等待结果（只能在后台线程中调用）
+
+        Args:
+            coro: 协程
+            cancel_event: 取消事件，置位后取消协程
+
+        Returns:
+            协程的返回值，被取消时为None
+
+        Raises:
+            Exception: 协程抛出的异常
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                if cancel_event is not None and cancel_event.is_set():
+                    future.cancel()
+                    return None
+            except concurrent.futures.CancelledError:
+                return None
+
+    def cancel(self, key: Hashable) -> None:
+        """
+        取消指定键的任务
+
+        Args:
+            key: 任务键
+        """
+        job = self._jobs.pop(key, None)
+        if job:
+            job["future"].cancel()
+
+    def cancel_all(self) -> None:
+        """取消所有未完成的任务"""
+        for key in list(self._jobs):
+            self.cancel(key)
+
+    def is_running(self, key: Hashable) -> bool:
+        """
+        指定键的任务是否仍在进行
+
+        Args:
+            key: 任务键
+
+        Returns:
+            是否仍在进行
+        """
+        return key in self._jobs
+
+    def shutdown(self, cleanup: Optional[Awaitable] = None, timeout: float = 2.0) -> None:
+        """
+        取消所有任务并停止事件循环
+
+        Args:
+            cleanup: 停止前执行的协程（例如关闭AsyncApiClient）
+            timeout: 等待清理和线程退出的最长时间（秒）
+        """
+        self.cancel_all()
+        if cleanup is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(cleanup, self.loop).result(timeout)
+            except Exception as e:
+                print(f"关闭异步任务失败: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+
+    def _current(self, key: Hashable, generation: int) -> Optional[Dict[str, Any]]:
+        """获取仍然有效的任务记录"""
+        job = self._jobs.get(key)
+        if job and job["generation"] == generation:
+            return job
+        return None
+
+    def _on_succeeded(self, key: Hashable, generation: int, result: Any) -> None:
+        """处理任务成功"""
+        job = self._current(key, generation)
+        if not job:
+            return
+        del self._jobs[key]
+        if job["on_success"]:
+            job["on_success"](result)
+
+    def _on_failed(self, key: Hashable, generation: int, error: str) -> None:
+        """处理任务失败"""
+        job = self._current(key, generation)
+        if not job:
+            return
+        del self._jobs[key]
+        if job["on_error"]:
+            job["on_error"](error)
+        else:
+            print(f"异步任务失败: {error}")
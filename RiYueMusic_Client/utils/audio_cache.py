@@ -0,0 +1,297 @@
+"""
+音频缓存 - 在本地磁盘缓存已播放的音频文件，按最近最少使用淘汰
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from . import json_codec
+
+
+def default_cache_dir() -> str:
+    """
+    获取当前用户的缓存目录
+
+    Returns:
+        音频缓存目录路径
+    """
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "RiYueMusic", "audio")
+
+
+class AudioCache:
+    """
+    音频文件的本地缓存
+
+    以歌曲ID和文件URL作为键；文件先写入临时文件再原子重命名，
+    写入时记录大小和SHA-256。查找时只校验大小，完整的哈希校验由verify()
+    在后台进行。总大小超过预算时按最近访问时间淘汰。
+    查找只在内存中更新访问时间，由flush()在后台或退出时写入索引。
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        初始化音频缓存
+
+        Args:
+            cache_dir: 缓存目录，默认为用户缓存目录下的RiYueMusic/audio
+            max_bytes: 缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._verified = set()
+        self._filling = set()
+        self._dirty = False
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+        self._remove_partial_files()
+
+    @staticmethod
+    def make_key(song_id: int, url: str) -> str:
+        """
+        生成缓存键
+
+        Args:
+            song_id: 歌曲ID
+            url: 文件URL
+
+        Returns:
+            缓存键
+        """
+        return hashlib.sha1(f"{song_id}:{url}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """缓存文件路径"""
+        return os.path.join(self.cache_dir, key)
+
+    def _load_index(self) -> None:
+        """从磁盘加载索引"""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        try:
+            with open(index_path, "rb") as f:
+                self._entries = json_codec.loads(f.read())
+        except (IOError, ValueError):
+            self._entries = {}
+
+    def _save_index(self) -> None:
+        """将索引原子写入磁盘（调用方需持有锁）"""
+        self._dirty = False
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json_codec.dumps(self._entries))
+            os.replace(tmp_path, index_path)
+        except IOError as e:
+            print(f"保存音频缓存索引失败: {e}")
+
+    def _remove_partial_files(self) -> None:
+        """删除上次异常退出时残留的临时文件"""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".part") or name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+    
+    def _remove(self, key: str) -> None:
+        """删除缓存条目及文件（调用方需持有锁）"""
+        self._entries.pop(key, None)
+        self._verified.discard(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _check_size(self, key: str, entry: dict) -> bool:
+        """校验缓存文件的大小"""
+        try:
+            return os.path.getsize(self._path(key)) == entry["size"]
+        except OSError:
+            return False
+
+    def lookup(self, song_id: int, url: str) -> Optional[str]:
+        """
+        查找已缓存的音频文件
+
+        Args:
+            song_id: 歌曲ID
+            url: 文件URL
+
+        Returns:
+            本地文件路径，未缓存或校验失败时为None
+        """
+        key = self.make_key(song_id, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+
+            if not self._check_size(key, entry):
+                print(f"音频缓存校验失败，已删除: {entry.get('url')}")
+                self._remove(key)
+                self._save_index()
+                return None
+
+            entry["last_access"] = time.time()
+            self._dirty = True
+            return self._path(key)
+
+    def flush(self) -> None:
+        """把查找时更新的访问时间写入索引（有变化时才写，应在后台线程或退出时调用）"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def verify(self, song_id: int, url: str) -> bool:
+        """
+        完整校验缓存文件的哈希（读取整个文件，应在后台线程调用）
+
+        每个文件在本次运行中只校验一次，校验失败的条目会被删除。
+
+        Args:
+            song_id: 歌曲ID
+            url: 文件URL
+
+        Returns:
+            缓存文件是否完好；未缓存时为False
+        """
+        key = self.make_key(song_id, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return False
+            if key in self._verified:
+                return True
+            expected = entry["sha256"]
+
+        digest = hashlib.sha256()
+        try:
+            with open(self._path(key), "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        except OSError:
+            pass
+
+        with self._lock:
+            if digest.hexdigest() == expected:
+                self._verified.add(key)
+                return True
+            if self._entries.get(key) is entry:
+                print(f"音频缓存校验失败，已删除: {entry.get('url')}")
+                self._remove(key)
+                self._save_index()
+            return False
+    
+    def is_filling(self, song_id: int, url: str) -> bool:
+        """
+        是否正在填充指定的缓存
+
+        Args:
+            song_id: 歌曲ID
+            url: 文件URL
+
+        Returns:
+            是否正在下载
+        """
+        with self._lock:
+            return self.make_key(song_id, url) in self._filling
+
+    def store(self, song_id: int, url: str, chunks: Iterable[bytes],
+              cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        将数据流写入缓存
+
+        数据先写入同目录下的临时文件，全部写完后再重命名为正式文件，
+        中途失败或取消不会留下不完整的缓存。
+
+        Args:
+            song_id: 歌曲ID
+            url: 文件URL
+            chunks: 数据块迭代器
+            cancel_event: 取消事件，每写入一块检查一次，置位后放弃下载
+
+        Returns:
+            本地文件路径；同一文件正在由其他线程填充或已取消时为None
+
+        Raises:
+            Exception: 下载或写入失败
+        """
+        key = self.make_key(song_id, url)
+        with self._lock:
+            if key in self._filling:
+                return None
+            self._filling.add(key)
+
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.part"
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(tmp_path, self._path(key))
+
+            with self._lock:
+                self._entries[key] = {
+                    "song_id": song_id,
+                    "url": url,
+                    "size": size,
+                    "sha256": digest.hexdigest(),
+                    "last_access": time.time()
+                }
+                self._verified.add(key)
+                self._evict()
+                self._save_index()
+                # 单个文件超过缓存上限时会被立即淘汰
+                if key not in self._entries:
+                    return None
+            return self._path(key)
+        finally:
+            with self._lock:
+                self._filling.discard(key)
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _evict(self) -> None:
+        """按最近访问时间淘汰，直到总大小不超过上限（调用方需持有锁）"""
+        total = sum(entry["size"] for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return
+
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries[key]["size"]
+            self._remove(key)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._save_index()
@@ -0,0 +1,433 @@
+"""
+批量导入 - 扫描目录，并行读取标签和哈希，批量建立艺术家和专辑后并发上传
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import mutagen
+except ImportError:  # 可选依赖：没有时标题取文件名，艺术家记为未知
+    mutagen = None
+
+from . import json_codec
+from .audio_cache import default_cache_dir
+from .content_hash import hash_file
+from .multipart import UploadCancelled
+
+AUDIO_EXTENSIONS = (".mp3", ".flac", ".wav", ".ogg", ".m4a", ".aac", ".opus", ".wma")
+UNKNOWN_ARTIST = "未知艺术家"
+
+
+def iter_audio_files(root: str) -> Iterator[str]:
+    """
+    逐个返回目录下的音频文件（边遍历边返回，不先收集整个目录树）
+
+    Args:
+        root: 根目录
+
+    Yields:
+        音频文件路径
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                yield entry.path
+
+
+def _first_tag(tags: Any, *names: str) -> Optional[str]:
+    """取第一个非空的标签值"""
+    for name in names:
+        values = tags.get(name) if tags is not None else None
+        if values:
+            value = str(values[0]).strip()
+            if value:
+                return value
+    return None
+
+
+def read_file_info(path: str) -> Dict[str, Any]:
+    """
+    读取文件的标签、时长和内容哈希（在子进程中执行）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        包含path、title、artist、album、duration、hash的字典，
+        文件无法读取时包含error
+    """
+    info = {
+        "path": path,
+        "title": os.path.splitext(os.path.basename(path))[0],
+        "artist": UNKNOWN_ARTIST,
+        "album": None,
+        "duration": None
+    }
+    if mutagen is not None:
+        try:
+            audio = mutagen.File(path, easy=True)
+        except Exception:
+            # 标签损坏不影响上传，沿用文件名
+            audio = None
+        if audio is not None:
+            tags = audio.tags
+            info["title"] = _first_tag(tags, "title") or info["title"]
+            info["artist"] = _first_tag(tags, "albumartist", "artist") or UNKNOWN_ARTIST
+            info["album"] = _first_tag(tags, "album")
+            if audio.info is not None:
+                info["duration"] = getattr(audio.info, "length", None)
+
+    try:
+        # 进程池已经按文件并行，单个文件内不再开线程
+        info["hash"] = hash_file(path, workers=1)
+    except OSError as e:
+        info["error"] = str(e)
+    return info
+
+
+def default_manifest_path(root: str) -> str:
+    """
+    获取目录对应的导入清单路径
+
+    Args:
+        root: 导入的根目录
+
+    Returns:
+        缓存目录旁imports目录下以根目录路径哈希命名的文件
+    """
+    name = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()
+    return os.path.join(os.path.dirname(default_cache_dir()), "imports", name + ".jsonl")
+
+
+class ImportManifest:
+    """
+    导入清单
+
+    每处理完一个文件追加一行记录，中断后重新导入同一目录时，
+    路径、大小和修改时间都未变的已完成文件直接跳过，不再读取和哈希。
+    """
+
+    DONE = ("uploaded", "duplicate")
+
+    def __init__(self, path: str):
+        """
+        初始化导入清单
+
+        Args:
+            path: 清单文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # 路径 → 最新记录，哈希 → 歌曲ID（已上传的内容）
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hashes: Dict[str, Optional[int]] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json_codec.loads(line)
+                    except ValueError:
+                        continue
+                    self._remember(entry)
+        except IOError:
+            pass
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _remember(self, entry: Dict[str, Any]) -> None:
+        self.entries[entry["path"]] = entry
+        if entry.get("status") == "uploaded" and entry.get("hash"):
+            self.hashes[entry["hash"]] = entry.get("song_id")
+
+    @staticmethod
+    def stat_key(path: str) -> Tuple[int, int]:
+        """文件的(大小, 修改时间)"""
+        stat = os.stat(path)
+        return stat.st_size, int(stat.st_mtime)
+
+    def is_done(self, path: str) -> bool:
+        """
+        文件是否已在之前的导入中完成
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            是否已完成且文件未变化
+        """
+        entry = self.entries.get(path)
+        if entry is None or entry.get("status") not in self.DONE:
+            return False
+        try:
+            return tuple(entry.get("stat") or ()) == self.stat_key(path)
+        except OSError:
+            return False
+
+    def record(self, path: str, status: str, content_hash: Optional[str] = None,
+               song_id: Optional[int] = None, error: Optional[str] = None) -> None:
+        """
+        记录一个文件的处理结果
+
+        Args:
+            path: 文件路径
+            status: uploaded、duplicate或failed
+            content_hash: 内容哈希
+            song_id: 上传后的歌曲ID
+            error: 失败原因
+        """
+        try:
+            stat = list(self.stat_key(path))
+        except OSError:
+            stat = None
+        entry = {"path": path, "stat": stat, "status": status, "hash": content_hash, "song_id": song_id}
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._remember(entry)
+            self._file.write(json_codec.dumps_text(entry) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """关闭清单文件"""
+        with self._lock:
+            self._file.close()
+
+
+class BulkImporter:
+    """
+    目录批量导入
+
+    分三个阶段：
+    1. 扫描：边遍历目录边把文件交给进程池读取标签、时长和哈希，
+       在途任务数有上限；清单中已完成的文件和重复内容直接跳过。
+    2. 建立：一次获取所有艺术家，按需获取专辑，缺少的艺术家和专辑批量创建。
+    3. 上传：线程池并发上传，每完成一个文件写入清单。
+    """
+
+    def __init__(self, song_service, artist_service, scan_workers: Optional[int] = None,
+                 upload_workers: int = 4, manifest_path: Optional[str] = None):
+        """
+        初始化批量导入
+
+        Args:
+            song_service: 歌曲服务
+            artist_service: 艺术家服务
+            scan_workers: 读取标签和哈希的进程数，默认为CPU核数
+            upload_workers: 同时上传的文件数
+            manifest_path: 导入清单路径，默认为default_manifest_path(根目录)
+        """
+        self.song_service = song_service
+        self.artist_service = artist_service
+        self.scan_workers = scan_workers or os.cpu_count() or 2
+        self.upload_workers = upload_workers
+        self.manifest_path = manifest_path
+
+    def run(self, root: str, progress: Callable[[Dict[str, Any]], None],
+            cancel_event: threading.Event) -> Dict[str, Any]:
+        """
+        导入目录（在后台线程中执行）
+
+        Args:
+            root: 根目录
+            progress: 进度回调，参数为包含stage、done、total、path的字典
+            cancel_event: 取消事件
+
+        Returns:
+            导入统计，包括各状态的文件数、耗时和每分钟处理的文件数
+        """
+        started = time.monotonic()
+        manifest = ImportManifest(self.manifest_path or default_manifest_path(root))
+        summary = {"scanned": 0, "uploaded": 0, "duplicates": 0, "skipped": 0, "failed": 0, "errors": []}
+
+        try:
+            files = self._scan(root, manifest, summary, progress, cancel_event)
+            if not cancel_event.is_set() and files:
+                progress({"stage": "resolve", "done": 0, "total": len(files), "path": None})
+                targets, errors = self._resolve(files, cancel_event)
+                self._upload(files, targets, errors, manifest, summary, progress, cancel_event)
+        finally:
+            manifest.close()
+
+        elapsed = time.monotonic() - started
+        processed = summary["uploaded"] + summary["duplicates"] + summary["failed"]
+        summary["elapsed"] = elapsed
+        summary["files_per_minute"] = processed * 60 / elapsed if elapsed > 0 else 0.0
+        summary["cancelled"] = cancel_event.is_set()
+        return summary
+
+    def _fail(self, summary: Dict[str, Any], manifest: ImportManifest, path: str,
+              error: str, content_hash: Optional[str] = None) -> None:
+        """记录失败的文件"""
+        summary["failed"] += 1
+        if len(summary["errors"]) < 20:
+            summary["errors"].append((path, error))
+        manifest.record(path, "failed", content_hash, error=error)
+
+    def _scan(self, root: str, manifest: ImportManifest, summary: Dict[str, Any],
+              progress: Callable, cancel_event: threading.Event) -> List[Dict[str, Any]]:
+        """扫描阶段：返回需要上传的文件信息（已去除重复内容）"""
+        files: List[Dict[str, Any]] = []
+        seen = dict(manifest.hashes)
+        paths = iter_audio_files(root)
+
+        # 在Qt进程中fork不安全，子进程用spawn启动
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.scan_workers, mp_context=context) as executor:
+            in_flight = set()
+
+            def submit_next() -> bool:
+                for path in paths:
+                    if manifest.is_done(path):
+                        summary["skipped"] += 1
+                        continue
+                    in_flight.add(executor.submit(read_file_info, path))
+                    return True
+                return False
+
+            for _ in range(self.scan_workers * 4):
+                if not submit_next():
+                    break
+
+            try:
+                while in_flight and not cancel_event.is_set():
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.discard(future)
+                        info = future.result()
+                        summary["scanned"] += 1
+                        progress({"stage": "scan", "done": summary["scanned"], "total": None,
+                                  "path": info["path"]})
+
+                        if "error" in info:
+                            self._fail(summary, manifest, info["path"], info["error"])
+                        elif info["hash"] in seen:
+                            summary["duplicates"] += 1
+                            manifest.record(info["path"], "duplicate", info["hash"], seen[info["hash"]])
+                        else:
+                            seen[info["hash"]] = None
+                            files.append(info)
+                        submit_next()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+        return files
+
+    def _resolve(self, files: List[Dict[str, Any]],
+                 cancel_event: threading.Event) -> Tuple[Dict, Dict[str, str]]:
+        """建立阶段：返回 (艺术家名, 专辑名) → (艺术家ID, 专辑ID)，建立失败的艺术家 → 错误信息"""
+        artist_ids = {
+            artist["name"].casefold(): artist["id"]
+            for artist in self.song_service.get_all_artists()
+        }
+
+        wanted: Dict[str, set] = {}
+        for info in files:
+            wanted.setdefault(info["artist"], set()).add(info["album"])
+
+        def resolve_artist(name: str, albums: set) -> Dict[Tuple[str, Optional[str]], Tuple[int, Optional[int]]]:
+            artist_id = artist_ids.get(name.casefold())
+            known_albums = {}
+            if artist_id is None:
+                artist_id = self.artist_service.create_artist(name)["id"]
+            else:
+                known_albums = {
+                    album["title"].casefold(): album["id"]
+                    for album in self.song_service.get_albums_by_artist(artist_id)
+                }
+
+            resolved = {}
+            for album in albums:
+                album_id = None
+                if album is not None:
+                    album_id = known_albums.get(album.casefold())
+                    if album_id is None:
+                        album_id = self.song_service.create_album(album, artist_id)["id"]
+                        known_albums[album.casefold()] = album_id
+                resolved[(name, album)] = (artist_id, album_id)
+            return resolved
+
+        targets = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            futures = {executor.submit(resolve_artist, name, albums): name for name, albums in wanted.items()}
+            for future, name in futures.items():
+                if cancel_event.is_set():
+                    break
+                try:
+                    targets.update(future.result())
+                except Exception as e:
+                    errors[name] = str(e)
+        return targets, errors
+
+    def _upload(self, files: List[Dict[str, Any]], targets: Dict, errors: Dict[str, str],
+                manifest: ImportManifest,
+                summary: Dict[str, Any], progress: Callable, cancel_event: threading.Event) -> None:
+        """上传阶段：线程池并发上传，在途任务数不超过upload_workers"""
+        pending = iter(files)
+        total = len(files)
+        done_count = 0
+
+        def upload(info: Dict[str, Any]) -> Dict[str, Any]:
+            target = targets.get((info["artist"], info["album"]))
+            if target is None:
+                raise RuntimeError(f"无法建立艺术家或专辑: {errors.get(info['artist'], '已取消')}")
+            artist_id, album_id = target
+            return self.song_service.upload_song(
+                info["title"], artist_id, album_id, info["path"],
+                cancel_event=cancel_event, content_hash=info["hash"]
+            )
+
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            in_flight = {}
+
+            def submit_next() -> bool:
+                info = next(pending, None)
+                if info is None:
+                    return False
+                in_flight[executor.submit(upload, info)] = info
+                return True
+
+            for _ in range(self.upload_workers):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    info = in_flight.pop(future)
+                    try:
+                        song = future.result()
+                    except UploadCancelled:
+                        continue
+                    except Exception as e:
+                        self._fail(summary, manifest, info["path"], str(e), info["hash"])
+                    else:
+                        if song and song.get("duplicate"):
+                            # 相同内容之前已经上传过（内容索引中有记录）
+                            summary["duplicates"] += 1
+                            manifest.record(info["path"], "duplicate", info["hash"], song.get("id"))
+                        else:
+                            summary["uploaded"] += 1
+                            manifest.record(info["path"], "uploaded", info["hash"], (song or {}).get("id"))
+
+                    done_count += 1
+                    progress({"stage": "upload", "done": done_count, "total": total, "path": info["path"]})
+                    if not cancel_event.is_set():
+                        submit_next()
@@ -0,0 +1,195 @@
+"""
+目录索引 - 在内存中按艺术家和专辑分组歌曲、按艺术家分组专辑，下钻浏览无需请求服务器
+"""
+
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+
+class _Grouping:
+    """
+    一类记录及其按外键的分组
+
+    记录按内部编号保存，删除后留空；每个外键对应一个记录编号的数组。
+    """
+
+    def __init__(self, keys: Dict[str, str]):
+        """
+        初始化分组
+
+        Args:
+            keys: 分组名到记录中外键字段的映射，例如{"artist": "artistId"}
+        """
+        self.keys = keys
+        self.records: List[Optional[dict]] = []
+        self.doc_by_id: Dict[int, int] = {}
+        self.groups: Dict[str, Dict[int, array]] = {name: {} for name in keys}
+
+    def _add(self, record: dict) -> None:
+        """添加一条记录，已存在同ID的记录时先删除"""
+        record_id = record["id"]
+        if record_id in self.doc_by_id:
+            self._remove(record_id)
+
+        doc = len(self.records)
+        self.records.append(record)
+        self.doc_by_id[record_id] = doc
+        for name, field in self.keys.items():
+            key = record.get(field)
+            if key is not None:
+                docs = self.groups[name].get(key)
+                if docs is None:
+                    docs = self.groups[name][key] = array("I")
+                docs.append(doc)
+
+    def _remove(self, record_id: int) -> None:
+        """删除一条记录"""
+        doc = self.doc_by_id.pop(record_id, None)
+        if doc is None:
+            return
+        record = self.records[doc]
+        self.records[doc] = None
+        for name, field in self.keys.items():
+            docs = self.groups[name].get(record.get(field))
+            if docs is not None:
+                docs.remove(doc)
+                if not docs:
+                    del self.groups[name][record.get(field)]
+
+    def build(self, records: Iterable[dict]) -> None:
+        """批量添加（一次遍历）"""
+        for record in records:
+            if record.get("id") is not None:
+                self._add(record)
+
+    def update(self, records: Iterable[dict], deleted_ids: Iterable[int]) -> None:
+        """增量添加、修改和删除"""
+        for record_id in deleted_ids:
+            self._remove(record_id)
+        self.build(records)
+
+    def get(self, record_id: int) -> Optional[dict]:
+        """按ID获取记录"""
+        doc = self.doc_by_id.get(record_id)
+        return None if doc is None else self.records[doc]
+
+    def lookup(self, name: str, key: int) -> List[dict]:
+        """获取某一分组中的记录"""
+        records = self.records
+        return [records[doc] for doc in self.groups[name].get(key, ())]
+
+
+class CatalogIndex:
+    """
+    目录索引
+
+    歌曲按艺术家和专辑分组，专辑按艺术家分组，查询只是一次字典查找加上按编号取记录。
+    与SearchIndex一样，批量建立在调用线程中完成后整体替换；
+    某一类型不完整（例如只加载了部分数据）时查询返回None，调用方应改为请求服务器。
+    """
+
+    # 类型到(分组名 → 外键字段)的映射
+    KEYS = {
+        "songs": {"artist": "artistId", "album": "albumId"},
+        "albums": {"artist": "artistId"},
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groupings = {kind: _Grouping(keys) for kind, keys in self.KEYS.items()}
+        self._complete = {kind: False for kind in self.KEYS}
+
+    def build(self, kind: str, records: Iterable[dict], complete: bool = True) -> None:
+        """
+        用完整数据重建一类索引
+
+        Args:
+            kind: songs或albums
+            records: 接口格式的记录
+            complete: records是否是该类型的全部数据
+        """
+        grouping = _Grouping(self.KEYS[kind])
+        grouping.build(records)
+        with self._lock:
+            self._groupings[kind] = grouping
+            self._complete[kind] = complete
+
+    def update(self, kind: str, records: Iterable[dict] = (), deleted_ids: Iterable[int] = ()) -> None:
+        """
+        增量更新一类索引（例如上传或删除歌曲后）
+
+        Args:
+            kind: songs或albums
+            records: 新增或修改的记录
+            deleted_ids: 删除的记录ID
+        """
+        with self._lock:
+            self._groupings[kind].update(records, deleted_ids)
+
+    def is_complete(self, kind: str) -> bool:
+        """
+        索引是否包含该类型的全部数据
+
+        Args:
+            kind: songs或albums
+
+        Returns:
+            是否完整
+        """
+        return self._complete[kind]
+
+    def song(self, song_id: int) -> Optional[dict]:
+        """
+        按ID获取歌曲数据（索引不完整时也可使用）
+
+        Args:
+            song_id: 歌曲ID
+
+        Returns:
+            歌曲数据，不在索引中时为None
+        """
+        with self._lock:
+            return self._groupings["songs"].get(song_id)
+
+    def _lookup(self, kind: str, name: str, key: int) -> Optional[List[dict]]:
+        with self._lock:
+            if not self._complete[kind]:
+                return None
+            return self._groupings[kind].lookup(name, key)
+
+    def songs_by_artist(self, artist_id: int) -> Optional[List[dict]]:
+        """
+        获取艺术家的歌曲
+
+        Args:
+            artist_id: 艺术家ID
+
+        Returns:
+            歌曲数据列表，索引不完整时为None
+        """
+        return self._lookup("songs", "artist", artist_id)
+
+    def songs_by_album(self, album_id: int) -> Optional[List[dict]]:
+        """
+        获取专辑的歌曲
+
+        Args:
+            album_id: 专辑ID
+
+        Returns:
+            歌曲数据列表，索引不完整时为None
+        """
+        return self._lookup("songs", "album", album_id)
+
+    def albums_by_artist(self, artist_id: int) -> Optional[List[dict]]:
+        """
+        获取艺术家的专辑
+
+        Args:
+            artist_id: 艺术家ID
+
+        Returns:
+            专辑数据列表，索引不完整时为None
+        """
+        return self._lookup("albums", "artist", artist_id)
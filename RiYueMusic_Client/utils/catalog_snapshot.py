@@ -0,0 +1,443 @@
+"""
+曲库快照 - 把歌曲、艺术家和专辑写成可内存映射的二进制文件，启动时无需解析即可显示
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from dataclasses import fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..models.identity_map import identity_map
+from ..models.song import Album, Artist, Song
+from . import json_codec
+from .audio_cache import default_cache_dir
+
+MAGIC = b"RYCATSNP"
+FORMAT_VERSION = 1
+
+# 文件头：魔数、格式版本、元数据JSON长度；其后依次是元数据、各类型的记录表和字符串堆
+_HEADER = struct.Struct("<8sII")
+
+# 快照包含的类型及其实体类
+KINDS = {"songs": Song, "artists": Artist, "albums": Album}
+
+# 整数字段，其余字段都是字符串
+INT_FIELDS = {"id", "artist_id", "album_id", "play_count"}
+
+# 整数为None、字符串为None时的存储值
+_NULL_INT = -(1 << 63)
+_NULL_OFFSET = 0xFFFFFFFF
+
+# 接口字段名（与from_dict一致），写入快照时从接口字典中取值
+_KEYS = {cls: cls.FIELD_KEYS for cls in KINDS.values()}
+
+
+def default_snapshot_path() -> str:
+    """
+    获取默认的快照路径
+
+    Returns:
+        与音频缓存同级目录下的catalog.snapshot
+    """
+    return os.path.join(os.path.dirname(default_cache_dir()), "catalog.snapshot")
+
+
+def _layout(cls: type) -> Tuple[struct.Struct, List[Tuple[str, bool, int]]]:
+    """
+    计算实体类的记录格式
+
+    整数字段占8字节；字符串字段是字符串堆中的(偏移, 长度)，各占4字节。
+
+    Returns:
+        (记录结构, [(字段名, 是否整数, 在记录中的偏移)])
+    """
+    parts = []
+    columns = []
+    offset = 0
+    for f in fields(cls):
+        is_int = f.name in INT_FIELDS
+        parts.append("q" if is_int else "II")
+        columns.append((f.name, is_int, offset))
+        offset += 8
+    return struct.Struct("<" + "".join(parts)), columns
+
+
+_LAYOUTS = {cls: _layout(cls) for cls in KINDS.values()}
+
+
+def write_snapshot(path: str, catalog: Dict[str, List[Dict]], generation: int = 0,
+                   api_url: Optional[str] = None) -> None:
+    """
+    把曲库写成快照文件
+
+    先写入同目录下的临时文件再替换，读取方不会看到写了一半的文件。
+    旧快照仍被映射而无法替换时（Windows），新文件保留为path + ".new"，
+    下次打开时再替换。
+
+    Args:
+        path: 快照路径
+        catalog: 包含songs、artists、albums的字典（接口返回的原始字典）
+        generation: 曲库镜像的版本号
+        api_url: 曲库所属的服务器地址
+    """
+    heap = bytearray()
+    offsets: Dict[str, Tuple[int, int]] = {}
+    sections = []
+
+    def add_string(value: Any) -> Tuple[int, int]:
+        if value is None:
+            return _NULL_OFFSET, 0
+        ref = offsets.get(value)
+        if ref is None:
+            data = str(value).encode("utf-8")
+            ref = offsets[value] = (len(heap), len(data))
+            heap.extend(data)
+        return ref
+
+    for kind, cls in KINDS.items():
+        record, columns = _LAYOUTS[cls]
+        keys = _KEYS[cls]
+        table = bytearray(record.size * len(catalog.get(kind) or []))
+        position = 0
+        for data in catalog.get(kind) or []:
+            values = []
+            for name, is_int, _ in columns:
+                value = data.get(keys[name])
+                if is_int:
+                    values.append(_NULL_INT if value is None else int(value))
+                else:
+                    values.extend(add_string(value))
+            record.pack_into(table, position, *values)
+            position += record.size
+        sections.append((kind, table))
+
+    # 元数据中的偏移取决于元数据本身的长度：按预留长度计算，放不下时加大预留长度重新计算
+    meta_size = 256
+    while True:
+        meta = {"generation": generation, "api_url": api_url, "sections": {}}
+        position = _HEADER.size + meta_size
+        for kind, table in sections:
+            meta["sections"][kind] = [position, len(table) // _LAYOUTS[KINDS[kind]][0].size]
+            position += len(table)
+        meta["heap"] = [position, len(heap)]
+        meta_bytes = json_codec.dumps(meta)
+        if len(meta_bytes) <= meta_size:
+            meta_bytes = meta_bytes.ljust(meta_size)
+            break
+        meta_size = len(meta_bytes) + 64
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # 每次写入使用唯一的临时文件，同时进行的两次写入互不干扰
+    fd, temp_path = tempfile.mkstemp(dir=directory or None, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(meta_bytes)))
+            f.write(meta_bytes)
+            for _, table in sections:
+                f.write(table)
+            f.write(heap)
+        try:
+            os.replace(temp_path, path)
+        except OSError:
+            os.replace(temp_path, path + ".new")
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class CatalogSnapshot:
+    """
+    只读的曲库快照
+
+    打开时只读取文件头，记录在访问时才从内存映射中解码。
+    """
+
+    def __init__(self, path: str, buffer: mmap.mmap, meta: Dict[str, Any]):
+        self.path = path
+        self.generation: int = meta.get("generation") or 0
+        self.api_url: Optional[str] = meta.get("api_url")
+        self._buffer = buffer
+        self._sections = meta["sections"]
+        self._heap_offset = meta["heap"][0]
+
+    @classmethod
+    def open(cls, path: Optional[str] = None) -> Optional["CatalogSnapshot"]:
+        """
+        打开快照
+
+        Args:
+            path: 快照路径，默认为default_snapshot_path()
+
+        Returns:
+            快照；文件不存在、格式版本不符或已损坏时为None
+        """
+        path = path or default_snapshot_path()
+        if os.path.exists(path + ".new"):
+            try:
+                os.replace(path + ".new", path)
+            except OSError:
+                pass
+
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, version, meta_size = _HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("快照格式不符")
+            meta = json_codec.loads(buffer[_HEADER.size:_HEADER.size + meta_size])
+            end = meta["heap"][0] + meta["heap"][1]
+            if end > len(buffer):
+                raise ValueError("快照已截断")
+        except (struct.error, ValueError, KeyError, TypeError):
+            buffer.close()
+            return None
+        return cls(path, buffer, meta)
+
+    def close(self) -> None:
+        """关闭内存映射"""
+        self._buffer.close()
+
+    def count(self, kind: str) -> int:
+        """
+        获取某一类型的记录数
+
+        Args:
+            kind: songs、artists或albums
+
+        Returns:
+            记录数
+        """
+        section = self._sections.get(kind)
+        return section[1] if section else 0
+
+    def section(self, kind: str) -> "SnapshotSection":
+        """
+        获取某一类型的记录，可直接作为CatalogListModel的存储
+
+        Args:
+            kind: songs、artists或albums
+
+        Returns:
+            快照存储
+        """
+        return SnapshotSection(self, KINDS[kind], *(self._sections.get(kind) or (0, 0)))
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        """从字符串堆中读取字符串"""
+        if offset == _NULL_OFFSET:
+            return None
+        start = self._heap_offset + offset
+        return self._buffer[start:start + length].decode("utf-8")
+
+
+class SnapshotSection:
+    """
+    快照中一种实体的记录
+
+    接口与CompactEntityStore相同。快照本身只读：更新的行和追加的行保存在内存中，
+    读取时优先于快照中的记录。
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot, entity_cls: type, offset: int, count: int):
+        """
+        初始化快照存储
+
+        Args:
+            snapshot: 快照
+            entity_cls: 实体类
+            offset: 记录表在文件中的偏移
+            count: 记录数
+        """
+        self.snapshot = snapshot
+        self.entity_cls = entity_cls
+        self._record, self._columns = _LAYOUTS[entity_cls]
+        self._offset = offset
+        self._count = count
+        self._overrides: Dict[int, tuple] = {}
+        self._extra: List[tuple] = []
+        # ID到行号的映射；ID有重复时值为行号列表
+        self._id_rows: Optional[Dict[Any, Any]] = None
+
+    def __len__(self) -> int:
+        return self._count + len(self._extra)
+
+    def clear(self) -> None:
+        """清空存储（不再使用快照中的记录）"""
+        self._count = 0
+        self._overrides = {}
+        self._extra = []
+        self._id_rows = None
+
+    def extend_dicts(self, data_list: Iterable[dict]) -> int:
+        """
+        追加接口返回的字典数据
+
+        Args:
+            data_list: 实体字典列表
+
+        Returns:
+            追加的行数
+        """
+        cls = self.entity_cls
+
+        def build(data: dict) -> Any:
+            identity_map.merge_existing(cls, data)
+            return cls._build(data)
+
+        return self.extend_entities(build(data) for data in data_list)
+
+    def extend_entities(self, entities: Iterable[Any]) -> int:
+        """
+        追加实体对象
+
+        Args:
+            entities: 实体对象列表
+
+        Returns:
+            追加的行数
+        """
+        before = len(self._extra)
+        self._extra.extend(self._values(entity) for entity in entities)
+        self._id_rows = None
+        return len(self._extra) - before
+
+    def _values(self, entity: Any) -> tuple:
+        return tuple(getattr(entity, name) for name, _, _ in self._columns)
+
+    def update(self, row: int, entity: Any) -> None:
+        """
+        用实体对象覆盖指定行
+
+        Args:
+            row: 行号
+            entity: 实体对象
+        """
+        if row >= self._count:
+            self._extra[row - self._count] = self._values(entity)
+        else:
+            self._overrides[row] = self._values(entity)
+
+    def ids(self) -> List[Any]:
+        """
+        按行获取实体ID（只读取ID列，不解码记录）
+
+        Returns:
+            ID列表
+        """
+        # ID是每条记录的第一个8字节整数，按记录长度跨步读取整列
+        with memoryview(self.snapshot._buffer) as view:
+            table = view[self._offset:self._offset + self._count * self._record.size]
+            with table, table.cast("q") as words, words[::self._record.size // 8] as column:
+                ids = column.tolist()
+        ids = [None if value == _NULL_INT else value for value in ids] if _NULL_INT in ids else ids
+        ids.extend(values[0] for values in self._extra)
+        return ids
+
+    def rows_for_id(self, entity_id: Any) -> List[int]:
+        """
+        查找实体所在的行（首次调用时扫描ID列）
+
+        Args:
+            entity_id: 实体ID
+
+        Returns:
+            行号列表
+        """
+        if self._id_rows is None:
+            ids = self.ids()
+            # 通常每个ID只出现一次，直接建立ID到行号的映射；有重复时再逐行归并
+            single = dict(zip(ids, range(len(ids))))
+            if len(single) == len(ids):
+                self._id_rows = single
+            else:
+                id_rows: Dict[Any, List[int]] = {}
+                for row, value in enumerate(ids):
+                    id_rows.setdefault(value, []).append(row)
+                self._id_rows = id_rows
+        rows = self._id_rows.get(entity_id)
+        if rows is None:
+            return []
+        return [rows] if isinstance(rows, int) else rows
+
+    def _values_at(self, row: int) -> tuple:
+        """解码一整行"""
+        if row >= self._count:
+            return self._extra[row - self._count]
+        values = self._overrides.get(row)
+        if values is not None:
+            return values
+
+        raw = self._record.unpack_from(self.snapshot._buffer, self._offset + row * self._record.size)
+        string = self.snapshot._string
+        values = []
+        index = 0
+        for _, is_int, _ in self._columns:
+            if is_int:
+                value = raw[index]
+                values.append(None if value == _NULL_INT else value)
+                index += 1
+            else:
+                values.append(string(raw[index], raw[index + 1]))
+                index += 2
+        return tuple(values)
+
+    def _field(self, row: int, field_index: int) -> Any:
+        """只解码一行中的单个字段"""
+        if row >= self._count or row in self._overrides:
+            return self._values_at(row)[field_index]
+
+        _, is_int, offset = self._columns[field_index]
+        position = self._offset + row * self._record.size + offset
+        buffer = self.snapshot._buffer
+        if is_int:
+            value = struct.unpack_from("<q", buffer, position)[0]
+            return None if value == _NULL_INT else value
+        return self.snapshot._string(*struct.unpack_from("<II", buffer, position))
+
+    def entity(self, row: int) -> Any:
+        """
+        获取指定行的实体对象（已有唯一实例时直接返回该实例）
+
+        Args:
+            row: 行号
+
+        Returns:
+            实体对象
+        """
+        entity = identity_map.get(self.entity_cls, self._field(row, 0))
+        if entity is None:
+            entity = identity_map.adopt(self.entity_cls(*self._values_at(row)))
+        return entity
+
+    def view(self, row: int) -> Any:
+        """
+        获取用于显示的行对象（这里就是实体对象）
+
+        Args:
+            row: 行号
+
+        Returns:
+            实体对象
+        """
+        return self.entity(row)
+
+    def value(self, row: int, field_index: int) -> Any:
+        """
+        读取指定行的单个字段
+
+        Args:
+            row: 行号
+            field_index: 字段序号（与数据类字段顺序一致）
+
+        Returns:
+            字段值
+        """
+        return self._field(row, field_index)
@@ -0,0 +1,419 @@
+"""
+曲库镜像 - 在本地SQLite数据库中保存歌曲、艺术家、专辑和播放列表
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import json_codec
+from .audio_cache import default_cache_dir
+
+
+def default_catalog_path() -> str:
+    """
+    获取默认的曲库数据库路径
+
+    Returns:
+        与音频缓存同级目录下的catalog.sqlite3
+    """
+    return os.path.join(os.path.dirname(default_cache_dir()), "catalog.sqlite3")
+
+
+class CatalogStore:
+    """
+    曲库的本地镜像
+
+    每条记录以接口返回的原始字典（JSON）保存，另外拆出用于查询的列并建立索引。
+    启动时直接从磁盘读取，随后由后台同步按水位线增量更新。
+    连接可在多个线程中使用，所有访问都在锁内进行。
+    """
+
+    SCHEMA_VERSION = 1
+
+    # 表名到(额外列, 接口字段)的映射
+    TABLES = {
+        "songs": (("title", "title"), ("artist_id", "artistId"), ("album_id", "albumId")),
+        "artists": (("name", "name"),),
+        "albums": (("title", "title"), ("artist_id", "artistId")),
+    }
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化曲库镜像
+
+        Args:
+            path: 数据库文件路径，默认为default_catalog_path()
+        """
+        self.path = path or default_catalog_path()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        """创建表和索引；版本不一致时重建"""
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                for table in ("songs", "artists", "albums", "playlists", "playlist_songs", "meta"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS songs (
+                    id INTEGER PRIMARY KEY, title TEXT, artist_id INTEGER, album_id INTEGER, data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_songs_artist ON songs (artist_id);
+                CREATE INDEX IF NOT EXISTS idx_songs_album ON songs (album_id);
+                CREATE INDEX IF NOT EXISTS idx_songs_title ON songs (title);
+
+                CREATE TABLE IF NOT EXISTS artists (
+                    id INTEGER PRIMARY KEY, name TEXT, data TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS albums (
+                    id INTEGER PRIMARY KEY, title TEXT, artist_id INTEGER, data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_albums_artist ON albums (artist_id);
+                CREATE INDEX IF NOT EXISTS idx_albums_title ON albums (title);
+
+                CREATE TABLE IF NOT EXISTS playlists (
+                    id INTEGER PRIMARY KEY, position INTEGER NOT NULL, data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS playlist_songs (
+                    playlist_id INTEGER NOT NULL, position INTEGER NOT NULL, song_id INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (playlist_id, position)
+                );
+                CREATE INDEX IF NOT EXISTS idx_playlist_songs_song ON playlist_songs (song_id);
+
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    # 元数据
+    def get_meta(self, key: str) -> Optional[str]:
+        """
+        获取元数据
+
+        Args:
+            key: 键
+
+        Returns:
+            值，不存在时为None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: Optional[str]) -> None:
+        """
+        设置元数据
+
+        Args:
+            key: 键
+            value: 值，为None时删除
+        """
+        with self._lock, self._conn:
+            self._set_meta(key, value)
+
+    def _set_meta(self, key: str, value: Optional[str]) -> None:
+        """设置元数据（调用方需持有锁并处于事务中）"""
+        if value is None:
+            self._conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+        else:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def get_watermark(self) -> Optional[str]:
+        """
+        获取上次同步的水位线（服务器时间）
+
+        Returns:
+            水位线，从未增量同步过时为None
+        """
+        return self.get_meta("watermark")
+
+    def generation(self) -> int:
+        """
+        获取镜像的版本号（歌曲、艺术家或专辑每次变化后加一）
+
+        Returns:
+            版本号，从未写入过时为0
+        """
+        return int(self.get_meta("generation") or 0)
+
+    def _bump_generation(self) -> None:
+        """版本号加一（调用方需持有锁并处于事务中）"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        self._set_meta("generation", int(row[0]) + 1 if row else 1)
+
+    def bind_server(self, api_url: str) -> None:
+        """
+        绑定服务器地址，地址变化时清空镜像
+
+        Args:
+            api_url: API基础URL
+        """
+        if self.get_meta("api_url") == api_url:
+            return
+        with self._lock, self._conn:
+            for table in ("songs", "artists", "albums", "playlists", "playlist_songs", "meta"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._set_meta("api_url", api_url)
+
+    def bind_user(self, user_id: Optional[int]) -> None:
+        """
+        绑定当前用户，用户变化时清空上一个用户的播放列表和水位线
+
+        播放列表只属于当前用户；增量接口返回的内容也可能因用户而不同，
+        清空水位线后下次同步重新获取全部记录。
+
+        Args:
+            user_id: 用户ID，未登录时为None
+        """
+        value = None if user_id is None else str(user_id)
+        if self.get_meta("user_id") == value:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM playlists")
+            self._conn.execute("DELETE FROM playlist_songs")
+            self._set_meta("watermark", None)
+            self._set_meta("user_id", value)
+
+    # 读取
+    def is_empty(self) -> bool:
+        """
+        镜像中是否还没有任何歌曲
+
+        Returns:
+            是否为空
+        """
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM songs LIMIT 1").fetchone() is None
+
+    def _select(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """执行查询并解析data列"""
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json_codec.loads(row[0]) for row in rows]
+
+    def songs(self) -> List[Dict]:
+        """
+        获取全部歌曲
+
+        Returns:
+            歌曲数据列表（与接口返回格式相同）
+        """
+        return self._select("SELECT data FROM songs ORDER BY id")
+
+    def artists(self) -> List[Dict]:
+        """
+        获取全部艺术家
+
+        Returns:
+            艺术家数据列表
+        """
+        return self._select("SELECT data FROM artists ORDER BY id")
+
+    def albums(self) -> List[Dict]:
+        """
+        获取全部专辑
+
+        Returns:
+            专辑数据列表
+        """
+        return self._select("SELECT data FROM albums ORDER BY id")
+
+    def songs_by_artist(self, artist_id: int) -> List[Dict]:
+        """
+        获取艺术家的歌曲
+
+        Args:
+            artist_id: 艺术家ID
+
+        Returns:
+            歌曲数据列表
+        """
+        return self._select("SELECT data FROM songs WHERE artist_id = ? ORDER BY id", (artist_id,))
+
+    def songs_by_album(self, album_id: int) -> List[Dict]:
+        """
+        获取专辑的歌曲
+
+        Args:
+            album_id: 专辑ID
+
+        Returns:
+            歌曲数据列表
+        """
+        return self._select("SELECT data FROM songs WHERE album_id = ? ORDER BY id", (album_id,))
+
+    def albums_by_artist(self, artist_id: int) -> List[Dict]:
+        """
+        获取艺术家的专辑
+
+        Args:
+            artist_id: 艺术家ID
+
+        Returns:
+            专辑数据列表
+        """
+        return self._select("SELECT data FROM albums WHERE artist_id = ? ORDER BY id", (artist_id,))
+
+    def playlists(self) -> List[Dict]:
+        """
+        获取全部播放列表（包含歌曲）
+
+        Returns:
+            播放列表数据列表
+        """
+        with self._lock:
+            playlist_rows = self._conn.execute("SELECT id, data FROM playlists ORDER BY position").fetchall()
+            member_rows = self._conn.execute("""
+                SELECT playlist_songs.playlist_id, COALESCE(songs.data, playlist_songs.data)
+                FROM playlist_songs LEFT JOIN songs ON songs.id = playlist_songs.song_id
+                ORDER BY playlist_songs.playlist_id, playlist_songs.position
+            """).fetchall()
+
+        members: Dict[int, List[Dict]] = {}
+        for playlist_id, data in member_rows:
+            members.setdefault(playlist_id, []).append(json_codec.loads(data))
+
+        playlists = []
+        for playlist_id, data in playlist_rows:
+            playlist = json_codec.loads(data)
+            playlist["songs"] = members.get(playlist_id, [])
+            playlists.append(playlist)
+        return playlists
+
+    def load(self) -> Dict[str, List[Dict]]:
+        """
+        读取整个镜像
+
+        Returns:
+            包含songs、artists、albums、playlists的字典
+        """
+        return {
+            "songs": self.songs(),
+            "artists": self.artists(),
+            "albums": self.albums(),
+            "playlists": self.playlists()
+        }
+
+    # 写入（调用方需持有锁并处于事务中）
+    def _upsert(self, table: str, records: Iterable[Dict]) -> None:
+        """插入或更新记录"""
+        columns = self.TABLES[table]
+        names = ", ".join(["id"] + [column for column, _ in columns] + ["data"])
+        placeholders = ", ".join("?" * (len(columns) + 2))
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({names}) VALUES ({placeholders})",
+            (
+                [record["id"]] + [record.get(field) for _, field in columns] + [json_codec.dumps_text(record)]
+                for record in records if record.get("id") is not None
+            )
+        )
+
+    def _delete(self, table: str, ids: Iterable[int]) -> None:
+        """按ID删除记录"""
+        self._conn.executemany(f"DELETE FROM {table} WHERE id = ?", ((record_id,) for record_id in ids))
+
+    def _replace_playlists(self, playlists: List[Dict]) -> None:
+        """替换全部播放列表及其歌曲"""
+        self._conn.execute("DELETE FROM playlists")
+        self._conn.execute("DELETE FROM playlist_songs")
+        for position, playlist in enumerate(playlists):
+            songs = playlist.get("songs") or []
+            data = {key: value for key, value in playlist.items() if key != "songs"}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists (id, position, data) VALUES (?, ?, ?)",
+                (playlist["id"], position, json_codec.dumps_text(data))
+            )
+            # 同时保存歌曲数据，歌曲表中没有这首歌时使用
+            self._conn.executemany(
+                "INSERT INTO playlist_songs (playlist_id, position, song_id, data) VALUES (?, ?, ?, ?)",
+                (
+                    (playlist["id"], index, song["id"], json_codec.dumps_text(song))
+                    for index, song in enumerate(songs)
+                )
+            )
+
+    # 同步
+    def replace_all(self, songs: List[Dict], artists: List[Dict], albums: List[Dict],
+                    watermark: Optional[str] = None) -> None:
+        """
+        用完整数据替换歌曲、艺术家和专辑（全量同步）
+
+        Args:
+            songs: 全部歌曲
+            artists: 全部艺术家
+            albums: 全部专辑
+            watermark: 本次同步的水位线，服务器不支持增量同步时为None
+        """
+        with self._lock, self._conn:
+            for table, records in (("songs", songs), ("artists", artists), ("albums", albums)):
+                self._conn.execute(f"DELETE FROM {table}")
+                self._upsert(table, records)
+            self._set_meta("watermark", watermark)
+            self._bump_generation()
+
+    def apply_changes(self, changes: Dict[str, Any]) -> bool:
+        """
+        应用增量变更
+
+        Args:
+            changes: 增量接口返回的数据，包含songs、artists、albums（新增或修改的记录）、
+                     deleted（各类型被删除的ID）和serverTime（新的水位线）
+
+        Returns:
+            是否有记录发生变化
+        """
+        deleted = changes.get("deleted") or {}
+        changed = False
+
+        with self._lock, self._conn:
+            for table in self.TABLES:
+                records = changes.get(table) or []
+                removed = deleted.get(table) or []
+                if records or removed:
+                    changed = True
+                    self._upsert(table, records)
+                    self._delete(table, removed)
+            if changed:
+                self._bump_generation()
+            self._set_meta("watermark", changes.get("serverTime"))
+
+        return changed
+
+    def replace_playlists(self, playlists: List[Dict]) -> None:
+        """
+        替换全部播放列表
+
+        Args:
+            playlists: 播放列表数据（包含歌曲）
+        """
+        with self._lock, self._conn:
+            self._replace_playlists(playlists)
+
+    def delete_songs(self, song_ids: Iterable[int]) -> None:
+        """
+        删除歌曲（例如本地已确认删除成功）
+
+        Args:
+            song_ids: 歌曲ID
+        """
+        song_ids = list(song_ids)
+        with self._lock, self._conn:
+            self._delete("songs", song_ids)
+            self._conn.executemany("DELETE FROM playlist_songs WHERE song_id = ?", ((song_id,) for song_id in song_ids))
+            self._bump_generation()
@@ -2,10 +2,11 @@
 配置工具 - 管理应用程序配置和状态
 """
 
-import json
 import os
 from typing import Dict, Any, Optional
 
+from . import json_codec
+
 
 class Config:
     """应用程序配置管理"""
@@ -29,7 +30,30 @@ class Config:
             "token": None,
             "volume": 80,
             "last_played_song_id": None,
-            "theme": "light"
+            "theme": "light",
+            "http_pool_maxsize": 16,
+            "http_max_retries": 2,
+            "http_connect_timeout": 5.0,
+            "http_read_timeout": 30.0,
+            "async_http": True,
+            "async_http_max_connections": 64,
+            "audio_cache_dir": None,
+            "audio_cache_size_mb": 1024,
+            "preload_threshold_ms": 15000,
+            "position_refresh_ms": 200,
+            "catalog_db_path": None,
+            "catalog_snapshot_path": None,
+            "search_debounce_ms": 250,
+            "search_cache_size": 128,
+            "search_cache_ttl_s": 60,
+            "play_count_journal": None,
+            "play_count_flush_s": 10,
+            "http_cache_dir": None,
+            "http_cache_memory_mb": 32,
+            "http_cache_disk_mb": 128,
+            "import_upload_workers": 4,
+            "long_job_threads": 2,
+            "content_index_path": None
         }
         
         # 加载保存的配置
@@ -39,18 +63,18 @@ class Config:
         """从文件加载配置"""
         if os.path.exists(self.config_path):
             try:
-                with open(self.config_path, "r") as f:
-                    loaded_config = json.load(f)
+                with open(self.config_path, "rb") as f:
+                    loaded_config = json_codec.loads(f.read())
                     self.config.update(loaded_config)
-            except (json.JSONDecodeError, IOError):
+            except (ValueError, IOError):
                 # 如果配置文件损坏或无法读取，使用默认配置
                 pass
     
     def save(self) -> None:
         """将配置保存到文件"""
         try:
-            with open(self.config_path, "w") as f:
-                json.dump(self.config, f, indent=2)
+            with open(self.config_path, "wb") as f:
+                f.write(json_codec.dumps(self.config, indent=True))
         except IOError:
             # 无法写入配置文件
             pass
@@ -88,6 +112,70 @@ class Config:
         """
         return self.get("api_url")
     
+    def get_http_options(self) -> Dict[str, Any]:
+        """
+        获取HTTP连接池和超时设置
+        
+        Returns:
+            可直接传给ApiClient的关键字参数
+        """
+        return {
+            "pool_maxsize": self.get("http_pool_maxsize", 16),
+            "max_retries": self.get("http_max_retries", 2),
+            "connect_timeout": self.get("http_connect_timeout", 5.0),
+            "read_timeout": self.get("http_read_timeout", 30.0)
+        }
+    
+    def get_async_http_options(self) -> Dict[str, Any]:
+        """
+        获取异步HTTP客户端的连接池和超时设置
+        
+        Returns:
+            可直接传给AsyncApiClient的关键字参数
+        """
+        return {
+            "pool_maxsize": self.get("async_http_max_connections", 64),
+            "connect_timeout": self.get("http_connect_timeout", 5.0),
+            "read_timeout": self.get("http_read_timeout", 30.0)
+        }
+    
+    def get_audio_cache_options(self) -> Dict[str, Any]:
+        """
+        获取音频缓存设置
+        
+        Returns:
+            可直接传给AudioCache的关键字参数
+        """
+        return {
+            "cache_dir": self.get("audio_cache_dir"),
+            "max_bytes": int(self.get("audio_cache_size_mb", 1024)) * 1024 * 1024
+        }
+    
+    def get_http_cache_options(self) -> Dict[str, Any]:
+        """
+        获取HTTP响应缓存设置
+        
+        Returns:
+            可直接传给HttpCache的关键字参数
+        """
+        return {
+            "cache_dir": self.get("http_cache_dir"),
+            "max_memory_bytes": int(self.get("http_cache_memory_mb", 32)) * 1024 * 1024,
+            "max_disk_bytes": int(self.get("http_cache_disk_mb", 128)) * 1024 * 1024
+        }
+    
+    def get_search_cache_options(self) -> Dict[str, Any]:
+        """
+        获取搜索缓存设置
+        
+        Returns:
+            可直接传给SearchCache的关键字参数
+        """
+        return {
+            "max_entries": self.get("search_cache_size", 128),
+            "ttl": float(self.get("search_cache_ttl_s", 60))
+        }
+    
     def get_token(self) -> Optional[str]:
         """
         获取认证令牌
@@ -162,4 +250,22 @@ class Config:
         Args:
             mode: 播放模式
         """
-        self.set("play_mode", mode)
\ No newline at end of file
+        self.set("play_mode", mode)
+
+    def get_play_queue(self) -> Optional[Dict[str, Any]]:
+        """
+        获取上次保存的播放队列
+        
+        Returns:
+            播放队列状态，没有时为None
+        """
+        return self.get("play_queue")
+
+    def set_play_queue(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        """
+        保存播放队列
+        
+        Args:
+            snapshot: 播放队列状态
+        """
+        self.set("play_queue", snapshot)
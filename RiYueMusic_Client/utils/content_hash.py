@@ -0,0 +1,272 @@
+"""
+内容哈希 - 分块计算音频文件的BLAKE2哈希，并记录已上传内容对应的歌曲和未完成的上传
+"""
+
+import hashlib
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from . import json_codec
+from .audio_cache import default_cache_dir
+
+# 树形哈希的块大小，改变后已有索引中的哈希全部失效
+CHUNK_SIZE = 1024 * 1024
+
+
+def _chunk_digest(chunk: bytes, index: int) -> bytes:
+    """计算一块数据的摘要（块序号参与计算，调换块的顺序会得到不同的结果）"""
+    return hashlib.blake2b(chunk, digest_size=32, node_offset=index, node_depth=0,
+                           person=b"RiYue-leaf").digest()
+
+
+def hash_file(path: str, chunk_size: int = CHUNK_SIZE, workers: Optional[int] = None) -> str:
+    """
+    分块计算文件的BLAKE2b树形哈希（不把整个文件读入内存）
+
+    文件按固定大小分块，各块的BLAKE2b摘要在线程池中并行计算
+    （hashlib处理大块数据时释放GIL），最后对所有块摘要和文件长度再做一次BLAKE2b。
+    同时在内存中的块不超过workers * 2个。哈希值与chunk_size有关，
+    索引中保存的哈希都使用默认的CHUNK_SIZE。
+
+    Args:
+        path: 文件路径
+        chunk_size: 块大小（字节）
+        workers: 计算线程数，默认为CPU核数（最多4个）；为1时在当前线程中计算
+
+    Returns:
+        十六进制哈希值
+    """
+    workers = workers or min(4, os.cpu_count() or 1)
+    root = hashlib.blake2b(digest_size=32, node_depth=1, person=b"RiYue-root")
+    size = 0
+
+    with open(path, "rb", buffering=0) as f:
+        if workers == 1:
+            index = 0
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                root.update(_chunk_digest(chunk, index))
+                index += 1
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                index = 0
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    pending.append(executor.submit(_chunk_digest, chunk, index))
+                    index += 1
+                    if len(pending) >= workers * 2:
+                        root.update(pending.popleft().result())
+                while pending:
+                    root.update(pending.popleft().result())
+
+    root.update(size.to_bytes(8, "little"))
+    return root.hexdigest()
+
+
+def default_index_path() -> str:
+    """
+    获取默认的内容索引路径
+
+    Returns:
+        与音频缓存同级目录下的content_index.jsonl
+    """
+    return os.path.join(os.path.dirname(default_cache_dir()), "content_index.jsonl")
+
+
+class ContentIndex:
+    """
+    内容哈希 → 歌曲ID的本地索引
+
+    每次上传成功后追加一行记录；删除歌曲时追加一条song_id为null的记录。
+    索引只在本地维护，服务器上的歌曲可能已被别处删除，使用前应确认歌曲仍然存在。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化内容索引
+
+        Args:
+            path: 索引文件路径，默认为default_index_path()
+        """
+        self.path = path or default_index_path()
+        self._lock = threading.Lock()
+        self._songs: Dict[str, int] = {}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json_codec.loads(line)
+                        content_hash = entry["hash"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if entry.get("song_id") is None:
+                        self._songs.pop(content_hash, None)
+                    else:
+                        self._songs[content_hash] = entry["song_id"]
+        except IOError:
+            pass
+
+    def lookup(self, content_hash: str) -> Optional[int]:
+        """
+        查找内容对应的歌曲
+
+        Args:
+            content_hash: 内容哈希
+
+        Returns:
+            歌曲ID，没有记录时为None
+        """
+        with self._lock:
+            return self._songs.get(content_hash)
+
+    def add(self, content_hash: str, song_id: int) -> None:
+        """
+        记录上传的内容
+
+        Args:
+            content_hash: 内容哈希
+            song_id: 歌曲ID
+        """
+        with self._lock:
+            self._songs[content_hash] = song_id
+            self._append({"hash": content_hash, "song_id": song_id})
+
+    def forget_song(self, song_id: int) -> None:
+        """
+        删除歌曲的所有记录
+
+        Args:
+            song_id: 歌曲ID
+        """
+        with self._lock:
+            for content_hash in [h for h, known_id in self._songs.items() if known_id == song_id]:
+                del self._songs[content_hash]
+                self._append({"hash": content_hash, "song_id": None})
+
+    def _append(self, entry: Dict) -> None:
+        """追加一条记录（调用方需持有锁）"""
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json_codec.dumps_text(entry) + "\n")
+        except IOError as e:
+            print(f"写入内容索引失败: {e}")
+
+
+def pending_uploads_path(index_path: Optional[str] = None) -> str:
+    """
+    获取未完成上传记录的路径
+
+    Args:
+        index_path: 内容索引路径，默认为default_index_path()
+
+    Returns:
+        内容索引同目录下的pending_uploads.jsonl
+    """
+    return os.path.join(os.path.dirname(index_path or default_index_path()), "pending_uploads.jsonl")
+
+
+class PendingUploads:
+    """
+    未完成的分块上传：(路径, 大小, 修改时间) → 上传ID
+
+    每次创建或结束上传会话时追加一行记录，程序重启后仍能从服务器已收到的位置续传。
+    文件被修改后大小或修改时间变化，旧记录不再匹配。启动时没有未完成的上传就清空文件。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化未完成上传记录
+
+        Args:
+            path: 记录文件路径，为None时只保存在内存中
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._uploads: Dict[Tuple[str, int, int], str] = {}
+
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json_codec.loads(line)
+                        key = (entry["path"], int(entry["size"]), int(entry["mtime"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if entry.get("upload_id") is None:
+                        self._uploads.pop(key, None)
+                    else:
+                        self._uploads[key] = str(entry["upload_id"])
+        except IOError:
+            return
+        if not self._uploads:
+            try:
+                open(self.path, "w").close()
+            except IOError:
+                pass
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[str]:
+        """
+        查找文件未完成的上传
+
+        Args:
+            key: (绝对路径, 大小, 修改时间)
+
+        Returns:
+            上传ID，没有记录时为None
+        """
+        with self._lock:
+            return self._uploads.get(key)
+
+    def set(self, key: Tuple[str, int, int], upload_id: str) -> None:
+        """
+        记录新建的上传会话
+
+        Args:
+            key: (绝对路径, 大小, 修改时间)
+            upload_id: 服务器返回的上传ID
+        """
+        with self._lock:
+            self._uploads[key] = upload_id
+            self._append(key, upload_id)
+
+    def discard(self, key: Tuple[str, int, int]) -> None:
+        """
+        删除上传记录（上传完成或会话失效时调用）
+
+        Args:
+            key: (绝对路径, 大小, 修改时间)
+        """
+        with self._lock:
+            if self._uploads.pop(key, None) is not None:
+                self._append(key, None)
+
+    def _append(self, key: Tuple[str, int, int], upload_id: Optional[str]) -> None:
+        """追加一条记录（调用方需持有锁）"""
+        if not self.path:
+            return
+        path, size, mtime = key
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json_codec.dumps_text({"path": path, "size": size, "mtime": mtime,
+                                               "upload_id": upload_id}) + "\n")
+        except IOError as e:
+            print(f"写入未完成上传记录失败: {e}")
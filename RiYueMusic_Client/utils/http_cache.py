@@ -0,0 +1,268 @@
+"""
+HTTP响应缓存 - 按ETag/Last-Modified条件请求，未变化时复用已解析的响应
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from . import json_codec
+from .audio_cache import default_cache_dir
+
+
+def default_http_cache_dir() -> str:
+    """
+    获取默认的HTTP缓存目录
+
+    Returns:
+        与音频缓存同级的http目录
+    """
+    return os.path.join(os.path.dirname(default_cache_dir()), "http")
+
+
+class CachedResponse:
+    """一条缓存的GET响应：校验器、原始响应体和解析后的对象"""
+
+    __slots__ = ("etag", "last_modified", "body", "parsed")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str],
+                 body: bytes, parsed: Any = None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self.parsed = parsed
+
+    def validators(self) -> Dict[str, str]:
+        """
+        条件请求头
+
+        Returns:
+            If-None-Match/If-Modified-Since请求头
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    带校验器的GET响应缓存
+
+    内存中按最近最少使用保存解析后的对象，总大小按响应体字节数限制；
+    磁盘上每条响应一个文件，超过预算时按修改时间淘汰，重启后仍可做条件请求。
+    缓存条目只在服务器返回304时复用，从不跳过服务器校验。
+    返回的解析对象在多次调用间共享，调用方应当只读。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_memory_bytes: int = 32 * 1024 * 1024,
+                 max_disk_bytes: int = 128 * 1024 * 1024):
+        """
+        初始化HTTP缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录，默认为default_http_cache_dir()；为空字符串时只用内存
+            max_memory_bytes: 内存中响应体的总大小上限
+            max_disk_bytes: 磁盘缓存的总大小上限
+        """
+        self.cache_dir = default_http_cache_dir() if cache_dir is None else cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._memory_bytes = 0
+        # 键 → 请求路径，用于按资源失效（包括只在磁盘上的条目）
+        self._paths: Dict[str, str] = {}
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._scan_disk()
+            except OSError as e:
+                print(f"HTTP缓存目录不可用: {e}")
+                self.cache_dir = ""
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict], auth: Optional[str]) -> str:
+        """
+        生成缓存键
+
+        Args:
+            url: 请求URL
+            params: URL参数
+            auth: Authorization请求头（不同用户的响应分开缓存）
+
+        Returns:
+            缓存键
+        """
+        raw = json.dumps([url, sorted((params or {}).items()), auth or ""], default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _scan_disk(self) -> None:
+        """读取磁盘条目的路径，用于失效"""
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), "r", encoding="utf-8") as f:
+                    header = json_codec.loads(f.readline())
+                self._paths[name[:-5]] = header["path"]
+            except (IOError, ValueError, KeyError, TypeError):
+                continue
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        获取缓存的响应（内存中没有时从磁盘加载）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的响应或None
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            if not self.cache_dir or key not in self._paths:
+                return None
+
+        try:
+            with open(self._file(key), "rb") as f:
+                header = json_codec.loads(f.readline())
+                body = f.read()
+        except (IOError, ValueError):
+            return None
+
+        entry = CachedResponse(header.get("etag"), header.get("last_modified"), body)
+        with self._lock:
+            if key in self._paths:
+                self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, path: str, etag: Optional[str], last_modified: Optional[str],
+            body: bytes, parsed: Any) -> None:
+        """
+        缓存一条带校验器的响应
+
+        Args:
+            key: 缓存键
+            path: 请求路径（用于失效）
+            etag: ETag响应头
+            last_modified: Last-Modified响应头
+            body: 原始响应体
+            parsed: 解析后的对象
+        """
+        entry = CachedResponse(etag, last_modified, body, parsed)
+        with self._lock:
+            self._paths[key] = path
+            self._remember(key, entry)
+        if self.cache_dir:
+            self._write_disk(key, path, entry)
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        """放入内存并按大小淘汰（调用方需持有锁）"""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old.body)
+        if len(entry.body) > self.max_memory_bytes:
+            return
+        self._memory[key] = entry
+        self._memory_bytes += len(entry.body)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.body)
+
+    def _write_disk(self, key: str, path: str, entry: CachedResponse) -> None:
+        """原子写入磁盘条目并按大小淘汰"""
+        header = {"path": path, "etag": entry.etag, "last_modified": entry.last_modified}
+        tmp_path = self._file(key) + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json_codec.dumps(header) + b"\n")
+                f.write(entry.body)
+            os.replace(tmp_path, self._file(key))
+        except (IOError, OSError) as e:
+            print(f"写入HTTP缓存失败: {e}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """磁盘缓存超过预算时删除最旧的条目"""
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            file_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name[:-5]))
+            total += stat.st_size
+
+        files.sort()
+        for _, size, key in files:
+            if total <= self.max_disk_bytes:
+                break
+            self._discard(key)
+            total -= size
+
+    def touch(self, key: str) -> None:
+        """
+        标记磁盘条目为最近使用（服务器返回304时调用）
+
+        Args:
+            key: 缓存键
+        """
+        if self.cache_dir:
+            try:
+                os.utime(self._file(key))
+            except OSError:
+                pass
+
+    def _discard(self, key: str) -> None:
+        """删除一条缓存"""
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= len(entry.body)
+            self._paths.pop(key, None)
+        if self.cache_dir:
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def invalidate(self, prefixes: Iterable[str]) -> None:
+        """
+        删除路径以任一前缀开头的缓存
+
+        Args:
+            prefixes: 路径前缀，例如"/api/songs"
+        """
+        prefixes = tuple(prefixes)
+        with self._lock:
+            keys = [key for key, path in self._paths.items() if path.startswith(prefixes)]
+        for key in keys:
+            self._discard(key)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            keys = list(self._paths)
+        for key in keys:
+            self._discard(key)
+
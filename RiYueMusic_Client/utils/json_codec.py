@@ -0,0 +1,92 @@
+"""
+JSON编解码 - 导入时选择可用的最快实现（orjson、msgspec），都没有安装时使用标准库json
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # 可选依赖：没有时尝试msgspec
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # 可选依赖：没有时使用标准库json
+    msgspec = None
+
+
+# 当前使用的实现名称
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    解码JSON
+
+    Args:
+        data: JSON文本或UTF-8字节
+
+    Returns:
+        解码后的对象
+
+    Raises:
+        ValueError: 格式错误（各实现的异常都转为ValueError或其子类）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        try:
+            return _msgspec_decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    编码为UTF-8的JSON字节（非ASCII字符不转义）
+
+    Args:
+        obj: 要编码的对象
+        indent: 是否以两个空格缩进（用于人会查看的文件，例如配置）
+
+    Returns:
+        JSON字节
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if msgspec is not None:
+        data = _msgspec_encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if indent else data
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_text(obj: Any, indent: bool = False) -> str:
+    """
+    编码为JSON文本（用于按行写入的日志文件和数据库文本列）
+
+    Args:
+        obj: 要编码的对象
+        indent: 是否以两个空格缩进
+
+    Returns:
+        JSON文本
+    """
+    if orjson is None and msgspec is None:
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return dumps(obj, indent).decode("utf-8")
+
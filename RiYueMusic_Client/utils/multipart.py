@@ -0,0 +1,88 @@
+"""
+流式multipart编码 - 分块读取文件生成请求体，内存占用与文件大小无关
+"""
+
+import mimetypes
+import os
+import threading
+import uuid
+from typing import Callable, Dict, Iterator, Optional
+
+
+class UploadCancelled(Exception):
+    """上传被用户取消"""
+
+
+class MultipartEncoder:
+    """
+    multipart/form-data请求体
+
+    先输出普通字段和文件头，再按chunk_size分块读取文件，最后输出结束边界。
+    总长度预先计算，requests会据此设置Content-Length，而不必把整个文件读入内存。
+    """
+
+    def __init__(self, fields: Dict[str, object], file_field: str, file_path: str,
+                 chunk_size: int = 256 * 1024,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        """
+        初始化请求体
+
+        Args:
+            fields: 普通表单字段
+            file_field: 文件字段名
+            file_path: 本地文件路径
+            chunk_size: 每次读取的字节数
+            progress: 进度回调，参数为(已发送的文件字节数, 文件总字节数)
+            cancel_event: 取消事件，置位后停止读取并抛出UploadCancelled
+        """
+        self.boundary = uuid.uuid4().hex
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.file_size = os.path.getsize(file_path)
+
+        filename = os.path.basename(file_path)
+        file_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            )
+        parts.append(
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f"Content-Type: {file_type}\r\n\r\n"
+        )
+        self._preamble = "".join(parts).encode("utf-8")
+        self._epilogue = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def content_type(self) -> str:
+        """请求的Content-Type"""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return len(self._preamble) + self.file_size + len(self._epilogue)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._preamble
+
+        sent = 0
+        with open(self.file_path, "rb") as f:
+            while True:
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise UploadCancelled("上传已取消")
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                sent += len(chunk)
+                yield chunk
+                if self.progress is not None:
+                    self.progress(sent, self.file_size)
+
+        yield self._epilogue
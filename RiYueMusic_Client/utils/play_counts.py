@@ -0,0 +1,168 @@
+"""
+播放次数队列 - 先写入本地日志，再在后台批量提交到服务器
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from . import json_codec
+from .audio_cache import default_cache_dir
+
+
+def default_journal_path() -> str:
+    """
+    获取默认的播放日志路径
+
+    Returns:
+        与音频缓存同级目录下的play_counts.log
+    """
+    return os.path.join(os.path.dirname(default_cache_dir()), "play_counts.log")
+
+
+class PlayCountQueue:
+    """
+    播放次数的后写队列
+
+    每次播放只在日志文件末尾追加一行并更新内存中的计数，不等待服务器；
+    同一首歌的多次播放合并为一个增量。flush()在后台线程中批量提交，
+    成功后把日志压缩为剩余的计数，失败时保留日志并按指数退避延后重试。
+    程序异常退出后，下次启动时从日志恢复尚未提交的计数（至少提交一次）。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_batch: int = 100,
+                 retry_delay: float = 5.0, max_retry_delay: float = 300.0):
+        """
+        初始化播放次数队列
+
+        Args:
+            path: 日志文件路径，默认为default_journal_path()
+            max_batch: 每次提交的最多歌曲数
+            retry_delay: 首次失败后的重试间隔（秒）
+            max_retry_delay: 重试间隔上限（秒）
+        """
+        self.path = path or default_journal_path()
+        self.max_batch = max_batch
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.failures = 0
+
+        self._lock = threading.Lock()
+        self._pending: Dict[int, int] = {}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load_journal()
+        self._journal = open(self.path, "a", encoding="utf-8")
+
+    def _load_journal(self) -> None:
+        """从日志恢复尚未提交的计数（忽略异常退出时写了一半的行）"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json_codec.loads(line)
+                        song_id = int(entry["song_id"])
+                        count = int(entry.get("count", 1))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    self._pending[song_id] = self._pending.get(song_id, 0) + count
+        except IOError:
+            pass
+
+    def _rewrite_journal(self) -> None:
+        """把日志原子替换为当前计数（调用方需持有锁）"""
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for song_id, count in self._pending.items():
+                    f.write(json_codec.dumps_text({"song_id": song_id, "count": count}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal.close()
+            os.replace(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            print(f"压缩播放日志失败: {e}")
+        finally:
+            if self._journal.closed:
+                self._journal = open(self.path, "a", encoding="utf-8")
+
+    def record(self, song_id: int) -> None:
+        """
+        记录一次播放（只写本地日志，立即返回）
+
+        Args:
+            song_id: 歌曲ID
+        """
+        with self._lock:
+            self._pending[song_id] = self._pending.get(song_id, 0) + 1
+            try:
+                self._journal.write(json_codec.dumps_text({"song_id": song_id}) + "\n")
+                self._journal.flush()
+            except IOError as e:
+                print(f"写入播放日志失败: {e}")
+
+    def pending_count(self) -> int:
+        """
+        尚未提交的播放次数
+
+        Returns:
+            播放次数
+        """
+        with self._lock:
+            return sum(self._pending.values())
+
+    def next_delay(self, interval: float) -> float:
+        """
+        距离下次提交的时间
+
+        Args:
+            interval: 正常的提交间隔（秒）
+
+        Returns:
+            没有失败时为interval，否则为指数退避后的间隔（秒）
+        """
+        if self.failures == 0:
+            return interval
+        return min(self.retry_delay * 2 ** (self.failures - 1), self.max_retry_delay)
+
+    def flush(self, send: Callable[[Dict[int, int]], Dict[int, int]]) -> int:
+        """
+        提交一批计数（在后台线程中调用）
+
+        Args:
+            send: 提交函数，参数为{歌曲ID: 增量}，返回其中已成功提交的部分；
+                  全部失败时可以直接抛出异常
+
+        Returns:
+            本次成功提交的播放次数
+        """
+        with self._lock:
+            batch = dict(list(self._pending.items())[:self.max_batch])
+        if not batch:
+            return 0
+
+        try:
+            sent = send(batch)
+        except Exception as e:
+            self.failures += 1
+            print(f"提交播放次数失败: {e}")
+            return 0
+
+        with self._lock:
+            for song_id, count in sent.items():
+                remaining = self._pending.get(song_id, 0) - count
+                if remaining > 0:
+                    self._pending[song_id] = remaining
+                else:
+                    self._pending.pop(song_id, None)
+            self._rewrite_journal()
+
+        self.failures = 0 if len(sent) == len(batch) else self.failures + 1
+        return sum(sent.values())
+
+    def close(self) -> None:
+        """关闭日志文件（未提交的计数保留在日志中）"""
+        with self._lock:
+            self._journal.close()
@@ -0,0 +1,328 @@
+"""
+播放队列 - 与界面列表无关的播放顺序管理
+"""
+
+import random
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Set
+
+from ..models.song import Song
+
+
+def _resolve_nothing(song_id: int) -> Optional[Song]:
+    """空队列的查找函数"""
+    return None
+
+
+class PlayQueue:
+    """
+    播放队列
+
+    保存一个明确来源（歌曲列表、播放列表、搜索结果或专辑）的歌曲ID序列，
+    歌曲对象只在需要时通过来源提供的查找函数获取，大列表入队时不必为每行创建对象。
+    顺序播放的上一首/下一首都是O(1)；
+    随机播放使用逐步抽取的Fisher–Yates洗牌袋，一轮之内不会重复，
+    每次抽取O(1)，并用有界历史记录支持随机模式下的“上一首”。
+    """
+
+    def __init__(self, history_size: int = 100, rng: Optional[random.Random] = None):
+        """
+        初始化播放队列
+
+        Args:
+            history_size: 随机模式下保留的历史记录条数
+            rng: 随机数生成器，默认使用独立的random.Random实例
+        """
+        self.rng = rng or random.Random()
+        self.shuffle = False
+        self.repeat = False
+        self.source: Optional[Hashable] = None
+
+        self._ids: Sequence[int] = []
+        self._resolve: Callable[[int], Optional[Song]] = _resolve_nothing
+        self._removed: Set[int] = set()
+        self._index = -1
+
+        # 洗牌袋：_bag[:_bag_size]是本轮尚未播放的位置，为None时在首次抽取时创建
+        self._bag: Optional[List[int]] = None
+        self._bag_size = 0
+
+        # 已确定但尚未前进到的下一首位置（预加载时查看，前进时使用）
+        self._pending: Optional[int] = None
+        self._history = deque(maxlen=history_size)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def index(self) -> int:
+        """当前位置，队列为空时为-1"""
+        return self._index
+
+    def set_mode(self, shuffle: bool, repeat: bool) -> None:
+        """
+        设置播放顺序
+
+        Args:
+            shuffle: 是否随机播放（随机模式下一轮结束后总会重新洗牌）
+            repeat: 顺序播放到末尾时是否回到开头
+        """
+        if shuffle != self.shuffle:
+            self._bag = None
+        if shuffle != self.shuffle or repeat != self.repeat:
+            self._pending = None
+        self.shuffle = shuffle
+        self.repeat = repeat
+
+    def set_source(self, ids: Sequence[int], resolve: Callable[[int], Optional[Song]],
+                   start: int = 0, source: Optional[Hashable] = None) -> None:
+        """
+        用新的来源替换队列内容
+
+        Args:
+            ids: 按播放顺序排列的歌曲ID（例如列表存储的ID列）
+            resolve: 由歌曲ID获取歌曲对象的函数，找不到时返回None（该位置会被跳过）
+            start: 当前歌曲在ids中的位置
+            source: 来源标识，例如"songs"或("playlist", 播放列表ID)
+        """
+        self._ids = ids
+        self._resolve = resolve
+        self._removed = set()
+        self._index = start if 0 <= start < len(self._ids) else -1
+        self.source = source
+        self._reset_order()
+
+    def set_songs(self, songs: Sequence[Song], start: int = 0, source: Optional[Hashable] = None) -> None:
+        """
+        用已有的歌曲对象替换队列内容（例如播放列表的歌曲）
+
+        Args:
+            songs: 按播放顺序排列的歌曲
+            start: 当前歌曲在songs中的位置
+            source: 来源标识
+        """
+        songs_by_id = {song.id: song for song in songs}
+        self.set_source([song.id for song in songs], songs_by_id.get, start, source)
+
+    def clear(self) -> None:
+        """清空队列"""
+        self._ids = []
+        self._resolve = _resolve_nothing
+        self._removed = set()
+        self._index = -1
+        self.source = None
+        self._reset_order()
+
+    def _reset_order(self) -> None:
+        """丢弃洗牌袋、待播放位置和历史记录"""
+        self._bag = None
+        self._bag_size = 0
+        self._pending = None
+        self._history.clear()
+
+    def current(self) -> Optional[Song]:
+        """
+        获取当前歌曲
+
+        Returns:
+            当前歌曲，没有时为None
+        """
+        return self._song_at(self._index)
+
+    def jump(self, index: int) -> Optional[Song]:
+        """
+        跳到指定位置（例如在同一来源中选择了另一首歌）
+
+        Args:
+            index: 位置
+
+        Returns:
+            该位置的歌曲，位置无效时为None
+        """
+        song = self._song_at(index)
+        if song is None:
+            return None
+        if self._index >= 0:
+            self._history.append(self._index)
+        self._index = index
+        self._pending = None
+        return song
+
+    def discard(self, song_id: int) -> None:
+        """
+        移除歌曲（例如歌曲已被删除）
+
+        位置保持不变，前进时会跳过。
+
+        Args:
+            song_id: 歌曲ID
+        """
+        self._removed.add(song_id)
+        if self._pending is not None and self._ids[self._pending] == song_id:
+            self._pending = None
+
+    def peek_next(self) -> Optional[Song]:
+        """
+        查看下一首歌曲但不前进
+
+        随机模式下抽取的结果会被保留，随后的next()返回同一首歌。
+
+        Returns:
+            下一首歌曲，没有时为None
+        """
+        if self._pending is None:
+            self._pending = self._find_next()
+        return self._song_at(self._pending)
+
+    def next(self) -> Optional[Song]:
+        """
+        前进到下一首歌曲
+
+        Returns:
+            下一首歌曲，已到末尾（且不循环）时为None，此时位置不变
+        """
+        position = self._pending if self._pending is not None else self._find_next()
+        self._pending = None
+        if position is None:
+            return None
+
+        self._history.append(self._index)
+        self._index = position
+        return self._song_at(position)
+
+    def previous(self) -> Optional[Song]:
+        """
+        后退到上一首歌曲
+
+        随机模式下按历史记录后退；历史为空或顺序模式下后退到前一个位置，
+        在开头时循环模式跳到末尾，否则停留在第一首。
+
+        Returns:
+            上一首歌曲，队列为空时为None
+        """
+        self._pending = None
+
+        if self.shuffle:
+            while self._history:
+                position = self._history.pop()
+                if self._song_at(position) is not None:
+                    self._index = position
+                    return self._song_at(position)
+
+        count = len(self._ids)
+        position = self._index
+        for _ in range(count):
+            position -= 1
+            if position < 0:
+                if not self.repeat:
+                    break
+                position = count - 1
+            if self._song_at(position) is not None:
+                self._index = position
+                return self._song_at(position)
+
+        # 前面没有可播放的歌曲时停留在当前（或第一首）
+        if self._index < 0 and count:
+            return self.jump(0)
+        return self.current()
+
+    def _song_at(self, position: Optional[int]) -> Optional[Song]:
+        """按位置取歌曲，位置无效或歌曲已移除时为None"""
+        if position is None or not 0 <= position < len(self._ids):
+            return None
+        song_id = self._ids[position]
+        if song_id in self._removed:
+            return None
+        return self._resolve(song_id)
+
+    def _find_next(self) -> Optional[int]:
+        """确定下一首的位置，跳过已移除的歌曲"""
+        position = self._index
+        for _ in range(len(self._ids)):
+            position = self._draw() if self.shuffle else self._step(position)
+            if position is None:
+                return None
+            if self._song_at(position) is not None:
+                return position
+        return None
+
+    def _step(self, position: int) -> Optional[int]:
+        """顺序模式中position之后的位置"""
+        position += 1
+        if position >= len(self._ids):
+            if not self.repeat or not self._ids:
+                return None
+            position = 0
+        return position
+
+    def _fill_bag(self) -> None:
+        """开始新一轮洗牌，当前歌曲不放入袋中"""
+        count = len(self._ids)
+        self._bag = list(range(count))
+        self._bag_size = count
+        if 0 <= self._index < count and count > 1:
+            # 初始时位置i就在袋的第i格，换到末尾即可移出
+            last = count - 1
+            self._bag[self._index], self._bag[last] = self._bag[last], self._bag[self._index]
+            self._bag_size = last
+
+    def _draw(self) -> Optional[int]:
+        """从洗牌袋中抽取一个位置（Fisher–Yates的一步）"""
+        if not self._ids:
+            return None
+        if self._bag is None or self._bag_size == 0:
+            self._fill_bag()
+
+        j = self.rng.randrange(self._bag_size)
+        last = self._bag_size - 1
+        self._bag[j], self._bag[last] = self._bag[last], self._bag[j]
+        self._bag_size = last
+        return self._bag[last]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出队列状态（可JSON序列化）
+
+        Returns:
+            队列状态字典
+        """
+        return {
+            "ids": list(self._ids),
+            "index": self._index,
+            "shuffle": self.shuffle,
+            "repeat": self.repeat,
+            "source": self.source if isinstance(self.source, (str, int)) else None,
+            "bag": self._bag[:self._bag_size] if self._bag is not None else None,
+            "history": list(self._history)
+        }
+
+    def restore(self, snapshot: Mapping[str, Any], resolve: Callable[[int], Optional[Song]]) -> None:
+        """
+        从导出的状态恢复队列
+
+        播放顺序（set_mode）保持当前设置；与导出时的随机设置不同时丢弃洗牌袋。
+
+        Args:
+            snapshot: snapshot()返回的状态
+            resolve: 由歌曲ID获取歌曲对象的函数，找不到的歌曲会被跳过
+        """
+        ids = [int(song_id) for song_id in snapshot.get("ids", [])]
+        count = len(ids)
+        self._ids = ids
+        self._resolve = resolve
+        self._removed = set()
+        index = snapshot.get("index", -1)
+        self._index = index if 0 <= index < count else -1
+        self.source = snapshot.get("source")
+        self._pending = None
+
+        bag = snapshot.get("bag")
+        if bag is not None and bool(snapshot.get("shuffle")) == self.shuffle and all(0 <= position < count for position in bag):
+            self._bag = list(bag)
+            self._bag_size = len(bag)
+        else:
+            self._bag = None
+            self._bag_size = 0
+
+        self._history.clear()
+        self._history.extend(p for p in snapshot.get("history", []) if 0 <= p < count)
@@ -2,8 +2,9 @@
 音频播放器 - 使用VLC处理音频播放
 """
 
+import time
 import vlc
-from PyQt6.QtCore import QTimer, pyqtSignal, QObject
+from PyQt6.QtCore import pyqtSignal, QObject
 
 
 class AudioPlayer(QObject):
@@ -14,6 +15,14 @@ class AudioPlayer(QObject):
     duration_changed = pyqtSignal(int)
     playback_status_changed = pyqtSignal(bool)  # True表示正在播放
     media_finished = pyqtSignal()
+    preload_requested = pyqtSignal()  # 当前歌曲即将结束，请上层预加载下一首
+    preloaded_media_started = pyqtSignal()  # 已无缝切换到预加载的歌曲
+    transition_latency_measured = pyqtSignal(float)  # 切歌延迟（毫秒）：结束事件到下一首开始播放
+    
+    # 内部信号：把VLC线程中的事件转到界面线程处理
+    _end_reached = pyqtSignal(object)
+    _playing = pyqtSignal(object)
+    _time_changed = pyqtSignal(object, int)
     
     # 播放模式常量
     PLAY_MODE_NORMAL = 0   # 正常播放（播放完当前列表后停止）
@@ -28,23 +37,42 @@ class AudioPlayer(QObject):
         self.instance = vlc.Instance('--no-video')
         self.player = self.instance.media_player_new()
         
+        # 备用播放器：提前打开并缓冲下一首，结束时直接切换
+        self.standby_player = self.instance.media_player_new()
+        
         # 当前播放媒体
         self.media = None
         
+        # 预加载状态
+        self.preload_threshold_ms = 15000  # 剩余多少毫秒时请求预加载
+        self.preload_requested_for_current = False
+        self.preloaded_media = None
+        self.preload_ready = False
+        
+        # 切歌延迟统计
+        self.end_reached_at = None
+        self.last_transition_latency = None
+        self.volume = 80
+        
         # 认证令牌
         self.auth_token = None
         
-        # 更新计时器
-        self.timer = QTimer()
-        self.timer.setInterval(1000)  # 每秒更新一次
-        self.timer.timeout.connect(self._update_status)
+        # 播放位置由VLC的时间变化事件驱动，按界面刷新间隔节流
+        self.position_refresh_ms = 200  # 窗口可见时的刷新间隔
+        self.hidden_refresh_ms = 1000  # 窗口隐藏或最小化时只用于预加载判断
+        self.position_updates_visible = True
+        self._last_time_event = 0.0
         
-        # 添加事件管理器以捕获媒体信息
-        self.event_manager = self.player.event_manager()
-        self.event_manager.event_attach(vlc.EventType.MediaPlayerLengthChanged, self._handle_length_changed)
-        # 添加这一行 - 监听播放结束事件
-        self.event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._handle_end_reached)
-    
+        # 两个播放器都挂接事件，回调中根据来源区分当前播放器和备用播放器
+        self._end_reached.connect(self._on_end_reached)
+        self._playing.connect(self._on_playing)
+        self._time_changed.connect(self._on_time_changed)
+        for media_player in (self.player, self.standby_player):
+            event_manager = media_player.event_manager()
+            event_manager.event_attach(vlc.EventType.MediaPlayerLengthChanged, self._handle_length_changed, media_player)
+            event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._handle_end_reached, media_player)
+            event_manager.event_attach(vlc.EventType.MediaPlayerPlaying, self._handle_playing, media_player)
+            event_manager.event_attach(vlc.EventType.MediaPlayerTimeChanged, self._handle_time_changed, media_player)
         
         # 当前状态
         self.is_playing = False
@@ -53,12 +81,12 @@ class AudioPlayer(QObject):
 
         # 播放模式
         self.play_mode = self.PLAY_MODE_NORMAL
-        
-        # 用于随机播放的历史记录
-        self.played_history = []
 
-    def _handle_length_changed(self, event):
+    def _handle_length_changed(self, event, media_player=None):
         """处理媒体长度变化事件"""
+        if media_player is not None and media_player is not self.player:
+            return
+        
         # 获取媒体长度（毫秒）
         length = self.player.get_length()
         if length > 0:
@@ -97,17 +125,134 @@ class AudioPlayer(QObject):
         except Exception as e:
             print(f"解析服务器时长时出错: {e}")
     
-    def _update_status(self):
-        """更新播放状态和进度"""
-        if self.is_playing:
-            # 获取当前播放位置
-            position = self.player.get_time()
+    def _handle_time_changed(self, event, media_player=None):
+        """处理播放时间变化事件（VLC线程，按刷新间隔节流后转到界面线程）"""
+        if media_player is not None and media_player is not self.player:
+            return
+        
+        interval = self.position_refresh_ms if self.position_updates_visible else self.hidden_refresh_ms
+        now = time.monotonic()
+        if (now - self._last_time_event) * 1000 < interval:
+            return
+        self._last_time_event = now
+        self._time_changed.emit(media_player, event.u.new_time)
+    
+    def _on_time_changed(self, media_player, position: int) -> None:
+        """
+        在界面线程中处理播放时间变化
+        
+        Args:
+            media_player: 发出事件的VLC播放器
+            position: 当前位置（毫秒）
+        """
+        if media_player is not self.player:
+            return
+        
+        # 播放结束由MediaPlayerEndReached事件处理，这里只在接近结尾时请求预加载
+        self._check_preload(position)
+        
+        if self.position_updates_visible:
             self.position_changed.emit(position)
-            
-            # 检查是否播放结束
-            if position >= self.duration and self.duration > 0:
-                self.stop()
-                self.media_finished.emit()
+    
+    def set_position_updates_visible(self, visible: bool) -> None:
+        """
+        设置界面是否可见，隐藏或最小化时不再发出位置更新
+        
+        Args:
+            visible: 界面是否可见
+        """
+        if visible == self.position_updates_visible:
+            return
+        self.position_updates_visible = visible
+        self._last_time_event = 0.0
+        
+        # 恢复可见时立即刷新一次，不等下一个事件
+        if visible and self.media is not None:
+            self.position_changed.emit(max(self.player.get_time(), 0))
+    
+    def _check_preload(self, position: int) -> None:
+        """
+        剩余时间低于阈值时请求预加载下一首（每首歌只请求一次）
+        
+        Args:
+            position: 当前位置（毫秒）
+        """
+        if self.preload_requested_for_current or self.duration <= 0:
+            return
+        
+        if self.duration - position <= self.preload_threshold_ms:
+            self.preload_requested_for_current = True
+            self.preload_requested.emit()
+    
+    def preload(self, url: str) -> None:
+        """
+        预加载下一首：在备用播放器中静音打开并缓冲，开始播放后立即暂停
+        
+        Args:
+            url: 下一首的音频URL或本地路径
+        """
+        self.cancel_preload()
+        
+        self.preloaded_media = self.instance.media_new(url)
+        self.standby_player.set_media(self.preloaded_media)
+        self.standby_player.audio_set_volume(0)
+        self.standby_player.play()
+        print(f"预加载下一首: {url}")
+    
+    def cancel_preload(self) -> None:
+        """丢弃已预加载的媒体"""
+        if self.preloaded_media is not None:
+            self.standby_player.stop()
+        self.preloaded_media = None
+        self.preload_ready = False
+    
+    def _handle_playing(self, event, media_player):
+        """处理开始播放事件（VLC线程）"""
+        self._playing.emit(media_player)
+    
+    def _on_playing(self, media_player) -> None:
+        """
+        在界面线程中处理开始播放事件
+        
+        Args:
+            media_player: 发出事件的VLC播放器
+        """
+        if media_player is self.standby_player:
+            # 备用播放器已开始出声（静音），暂停并回到开头，等待切换
+            if self.preloaded_media is not None and not self.preload_ready:
+                self.standby_player.set_pause(1)
+                self.standby_player.set_time(0)
+                self.preload_ready = True
+            return
+        
+        # 当前播放器开始播放，记录切歌延迟
+        if self.end_reached_at is not None:
+            self.last_transition_latency = (time.perf_counter() - self.end_reached_at) * 1000
+            self.end_reached_at = None
+            print(f"切歌延迟: {self.last_transition_latency:.1f} ms")
+            self.transition_latency_measured.emit(self.last_transition_latency)
+    
+    def _switch_to_preloaded(self) -> None:
+        """切换到已预加载的备用播放器"""
+        previous = self.player
+        self.player, self.standby_player = self.standby_player, previous
+        self.media = self.preloaded_media
+        self.preloaded_media = None
+        self.preload_ready = False
+        self.preload_requested_for_current = False
+        
+        self.player.audio_set_volume(self.volume)
+        self.player.set_pause(0)
+        previous.stop()
+        
+        # 预加载期间的长度事件来自备用播放器，已被忽略，这里直接读取
+        self.duration = max(self.player.get_length(), 0)
+        self.server_duration = None
+        self.duration_changed.emit(self.duration)
+        
+        self._last_time_event = 0.0
+        self.is_playing = True
+        self.playback_status_changed.emit(True)
     
     def set_auth_token(self, token: str) -> None:
         """
@@ -126,17 +271,19 @@ class AudioPlayer(QObject):
             url: 音频URL，如果为None则播放/恢复当前音频
         """
         if url:
+            # 手动切歌时丢弃之前的预加载
+            self.cancel_preload()
+            self.preload_requested_for_current = False
+            
             # 创建新的媒体
             self.media = self.instance.media_new(url)
             self.player.set_media(self.media)
         
         # 播放
+        self._last_time_event = 0.0
         self.player.play()
         self.is_playing = True
         self.playback_status_changed.emit(True)
-        
-        # 启动更新计时器
-        self.timer.start()
 
         def _try_get_duration(self):
             """尝试再次获取媒体时长"""
@@ -151,7 +298,6 @@ class AudioPlayer(QObject):
             self.player.pause()
             self.is_playing = False
             self.playback_status_changed.emit(False)
-            self.timer.stop()
     
     def resume(self):
         """恢复播放"""
@@ -159,14 +305,14 @@ class AudioPlayer(QObject):
             self.player.play()
             self.is_playing = True
             self.playback_status_changed.emit(True)
-            self.timer.start()
     
     def stop(self):
         """停止播放"""
+        self.cancel_preload()
+        self.end_reached_at = None
         self.player.stop()
         self.is_playing = False
         self.playback_status_changed.emit(False)
-        self.timer.stop()
     
     def toggle_play_pause(self):
         """切换播放/暂停状态"""
@@ -183,6 +329,11 @@ class AudioPlayer(QObject):
             position: 位置（毫秒）
         """
         self.player.set_time(position)
+        
+        # 拖动进度条后立即刷新，不等节流后的下一个事件
+        self._last_time_event = time.monotonic()
+        if self.position_updates_visible:
+            self.position_changed.emit(position)
     
     def set_volume(self, volume):
         """
@@ -191,6 +342,7 @@ class AudioPlayer(QObject):
         Args:
             volume: 音量（0-100）
         """
+        self.volume = volume
         self.player.audio_set_volume(volume)
     
     def get_volume(self):
@@ -220,9 +372,31 @@ class AudioPlayer(QObject):
         """
         self.play_mode = mode
 
-    def _handle_end_reached(self, event):
-        """处理媒体播放结束事件"""
+    def _handle_end_reached(self, event, media_player=None):
+        """处理媒体播放结束事件（VLC线程，不能在这里调用libvlc）"""
+        if media_player is not None and media_player is not self.player:
+            return
+        self.end_reached_at = time.perf_counter()
+        self._end_reached.emit(media_player)
+    
+    def _on_end_reached(self, media_player) -> None:
+        """
+        在界面线程中处理播放结束
+        
+        Args:
+            media_player: 发出事件的VLC播放器
+        """
+        if media_player is not self.player:
+            return
+        
         print("媒体播放结束")
+        
+        # 已预加载下一首时直接切换，不再经过上层重新创建媒体
+        if self.preloaded_media is not None:
+            self._switch_to_preloaded()
+            self.preloaded_media_started.emit()
+            return
+        
         self.is_playing = False
         self.playback_status_changed.emit(False)
         
@@ -235,4 +409,8 @@ class AudioPlayer(QObject):
         else:
             # 其他模式
             self.repeat_current_song = False
-            self.media_finished.emit()
\ No newline at end of file
+            self.media_finished.emit()
+        
+        # 上层没有继续播放（例如列表已结束），不再统计切歌延迟
+        if not self.is_playing:
+            self.end_reached_at = None
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+搜索缓存 - 缓存服务器搜索结果，按最近最少使用淘汰并带有效期
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+
+
+class SearchCache:
+    """
+    (类型, 查询) → 结果的LRU缓存
+
+    服务器搜索是按包含关系匹配的，因此查询q的结果一定是q的任意前缀的结果的子集：
+    缓存中已有较短前缀的完整结果时，可以在本地过滤得到，不必再请求服务器。
+    本地索引的完整结果也可以缓存（使用另外的类型键），由索引在较短前缀的结果中细化。
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化搜索缓存
+
+        Args:
+            max_entries: 最多缓存的查询数
+            ttl: 结果有效期（秒）
+            clock: 时钟函数
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, List[dict]]]" = OrderedDict()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        规范化查询（服务器搜索不区分大小写）
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            规范化后的查询
+        """
+        return query.strip().casefold()
+
+    def get(self, kind: Hashable, query: str) -> Optional[List[dict]]:
+        """
+        获取缓存的结果
+
+        Args:
+            kind: 搜索类型（songs、artists、albums）
+            query: 查询文本
+
+        Returns:
+            结果列表，未缓存或已过期时为None
+        """
+        key = (kind, self.normalize(query))
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, results = entry
+        if self.clock() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return results
+
+    def put(self, kind: Hashable, query: str, results: List[dict]) -> None:
+        """
+        缓存结果
+
+        Args:
+            kind: 搜索类型
+            query: 查询文本
+            results: 服务器返回的完整结果
+        """
+        self._store((kind, self.normalize(query)), self.clock(), results)
+
+    def _store(self, key: Tuple[Hashable, str], stored_at: float, results: List[dict]) -> None:
+        """写入缓存并淘汰最久未使用的条目"""
+        self._entries[key] = (stored_at, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def refine(self, kind: Hashable, query: str, field: str,
+               narrow: Optional[Callable[[List[dict]], Optional[List[dict]]]] = None) -> Optional[List[dict]]:
+        """
+        用已缓存的较短前缀的结果在本地过滤出query的结果
+
+        过滤结果也会被缓存，有效期沿用前缀结果的缓存时间。
+
+        Args:
+            kind: 搜索类型
+            query: 查询文本
+            field: 用于匹配的字段（例如title、name）
+            narrow: 从较短前缀的结果中得到query结果的函数，返回None表示不能由其得到；
+                默认保留field包含query的记录
+
+        Returns:
+            过滤后的结果，没有可用的前缀结果时为None
+        """
+        normalized = self.normalize(query)
+        for length in range(len(normalized) - 1, 0, -1):
+            key = (kind, normalized[:length])
+            if self.get(kind, normalized[:length]) is None:
+                continue
+
+            stored_at, broader = self._entries[key]
+            if narrow is not None:
+                results = narrow(broader)
+                if results is None:
+                    return None
+            else:
+                results = [
+                    record for record in broader
+                    if normalized in (record.get(field) or "").casefold()
+                ]
+            self._store((kind, normalized), stored_at, results)
+            return results
+        return None
+
+    def clear(self) -> None:
+        """清空缓存（例如曲库已变化）"""
+        self._entries.clear()
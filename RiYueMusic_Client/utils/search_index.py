@@ -0,0 +1,701 @@
+"""
+搜索索引 - 在本地对歌曲标题、艺术家名和专辑标题进行检索
+"""
+
+import bisect
+import heapq
+import marshal
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, BinaryIO, Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # 未安装pypinyin时不支持拼音检索
+    lazy_pinyin = None
+
+
+# 连续的字母数字作为一个词，中日韩文字每个字单独作为一个词
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[\u3400-\u9fff\uf900-\ufaff]")
+_CJK_RE = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]")
+
+# 拼音后缀最多展开的音节数
+_MAX_PINYIN_SYLLABLES = 16
+
+# 索引文件的格式版本，与Python版本一起记录（marshal的格式随版本变化）
+FORMAT_VERSION = 1
+
+# 拼音和整个标题在倒排表中的前缀
+_PINYIN_MARK = "\1"
+_TITLE_MARK = "\0"
+
+
+# 索引文件由长度前缀的marshal帧组成；大的词典和列表分块编码，
+# 每块编码时持有GIL的时间较短，界面线程不会长时间停顿
+_FRAME = struct.Struct("<I")
+_CHUNK_ITEMS = 20000
+_END = ("end",)
+
+
+def _write_frame(f: BinaryIO, value: Any) -> int:
+    """写入一帧，返回写入的字节数"""
+    data = marshal.dumps(value)
+    f.write(_FRAME.pack(len(data)))
+    f.write(data)
+    return _FRAME.size + len(data)
+
+
+def _frames(data: bytes) -> Iterator[Tuple[Any, int]]:
+    """逐帧解码，产生(值, 该帧的结束位置)；遇到截断的帧时停止"""
+    view = memoryview(data)
+    pos = 0
+    while pos + _FRAME.size <= len(view):
+        (size,) = _FRAME.unpack_from(view, pos)
+        start = pos + _FRAME.size
+        if start + size > len(view):
+            return
+        pos = start + size
+        yield marshal.loads(view[start:pos]), pos
+
+
+def _chunks(value: Any) -> Iterator[Any]:
+    """把大的词典或列表切成多块，其他值原样作为一块"""
+    if isinstance(value, dict) and len(value) > _CHUNK_ITEMS:
+        items = list(value.items())
+        for i in range(0, len(items), _CHUNK_ITEMS):
+            yield dict(items[i:i + _CHUNK_ITEMS])
+    elif isinstance(value, list) and len(value) > _CHUNK_ITEMS:
+        for i in range(0, len(value), _CHUNK_ITEMS):
+            yield value[i:i + _CHUNK_ITEMS]
+    else:
+        yield value
+
+
+def normalize(text: Optional[str]) -> str:
+    """
+    规范化文本（全角转半角、统一大小写）
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        规范化后的文本
+    """
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词
+
+    Args:
+        text: 规范化后的文本
+
+    Returns:
+        词列表
+    """
+    return _TOKEN_RE.findall(text)
+
+
+def _trigrams(word: str) -> Set[str]:
+    """单词的三元组集合（两端补空格，使词首词尾的字母也参与比较）"""
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _pinyin_terms(text: str) -> List[str]:
+    """
+    中文文本的拼音检索词：全拼和首字母，以及从每个音节开始的后缀
+
+    例如“周杰伦”得到zhoujielun、jielun、lun、zjl、jl、l，
+    因此输入jielun或jl都能匹配。
+    """
+    if lazy_pinyin is None or not _CJK_RE.search(text):
+        return []
+
+    syllables = [s for s in lazy_pinyin(text, errors="ignore") if s.isalnum()][:_MAX_PINYIN_SYLLABLES]
+    initials = [s for s in lazy_pinyin(text, style=Style.FIRST_LETTER, errors="ignore") if s.isalnum()][:_MAX_PINYIN_SYLLABLES]
+
+    terms = []
+    for parts in (syllables, initials):
+        for i in range(len(parts)):
+            terms.append("".join(parts[i:]))
+    return terms
+
+
+class _KindIndex:
+    """
+    一类实体的倒排索引
+
+    词典分为单词、拼音和整个标题三部分，都是有序列表，前缀检索用二分查找
+    得到词的范围；英文单词另建三元组索引，用于拼写错误时的模糊匹配。
+    拼音通常不带空格输入，只用于单个查询词。文档按内部编号保存，删除后留空。
+    """
+
+    def __init__(self):
+        self.records: List[Optional[dict]] = []
+        self.texts: List[str] = []
+        self.doc_terms: List[Tuple[str, ...]] = []
+        self.doc_by_id: Dict[int, int] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.words: List[str] = []
+        self.pinyin: List[str] = []
+        self.titles: List[str] = []
+        self.term_trigrams: Dict[str, Set[str]] = {}
+
+    def _add(self, record: dict, source: str, sort_terms: bool) -> None:
+        """添加一个文档，已存在同ID的文档时先删除"""
+        record_id = record["id"]
+        if record_id in self.doc_by_id:
+            self._remove(record_id)
+
+        doc = len(self.records)
+        text = normalize(source)
+        words = tokenize(text)
+        compact = "".join(words)
+
+        self.records.append(record)
+        self.texts.append(compact)
+        self.doc_by_id[record_id] = doc
+
+        # 三部分共用倒排表，拼音和标题加前缀区分
+        terms = set(words)
+        terms.update(_PINYIN_MARK + term for term in _pinyin_terms(text))
+        if compact:
+            terms.add(_TITLE_MARK + compact)
+        self.doc_terms.append(tuple(terms))
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = set()
+                if sort_terms:
+                    bisect.insort(self._vocabulary(term), term)
+            posting.add(doc)
+
+        for word in words:
+            if len(word) >= 3 and word.isascii():
+                for trigram in _trigrams(word):
+                    self.term_trigrams.setdefault(trigram, set()).add(word)
+
+    def _remove(self, record_id: int) -> None:
+        """删除一个文档（词典中的词保留，倒排表中去掉该文档）"""
+        doc = self.doc_by_id.pop(record_id, None)
+        if doc is None:
+            return
+        for term in self.doc_terms[doc]:
+            self.postings[term].discard(doc)
+        self.records[doc] = None
+        self.doc_terms[doc] = ()
+
+    def build(self, records: Iterable[dict], field: str) -> None:
+        """批量建立索引"""
+        for record in records:
+            if record.get("id") is not None:
+                self._add(record, record.get(field) or "", sort_terms=False)
+        for term in sorted(self.postings):
+            self._vocabulary(term).append(term)
+
+    def update(self, records: Iterable[dict], field: str) -> None:
+        """增量添加或更新文档"""
+        for record in records:
+            if record.get("id") is not None:
+                self._add(record, record.get(field) or "", sort_terms=True)
+
+    def remove(self, record_ids: Iterable[int]) -> None:
+        """删除文档"""
+        for record_id in record_ids:
+            self._remove(record_id)
+
+    def _vocabulary(self, term: str) -> List[str]:
+        """词所属的有序词表"""
+        if term[0] == _TITLE_MARK:
+            return self.titles
+        if term[0] == _PINYIN_MARK:
+            return self.pinyin
+        return self.words
+
+    @staticmethod
+    def _prefix_range(terms: List[str], prefix: str) -> Tuple[int, int]:
+        """有序词表中以prefix开头的词的下标范围"""
+        start = bisect.bisect_left(terms, prefix)
+        return start, bisect.bisect_left(terms, prefix + "\U0010ffff", start)
+
+    def _has_prefix(self, terms: List[str], prefix: str) -> bool:
+        """有序词表中是否有以prefix开头的词"""
+        start, end = self._prefix_range(terms, prefix)
+        return start < end
+
+    def _fuzzy_terms(self, token: str, threshold: float) -> List[str]:
+        """与token的三元组相似度不低于threshold的单词，相似度高的在前"""
+        if len(token) < 3:
+            return []
+        token_trigrams = _trigrams(token)
+
+        hits = Counter()
+        for trigram in token_trigrams:
+            hits.update(self.term_trigrams.get(trigram, ()))
+
+        scored = []
+        for term, count in hits.items():
+            score = 2 * count / (len(token_trigrams) + len(term))
+            if score >= threshold:
+                scored.append((score, term))
+        scored.sort(reverse=True)
+        return [term for _, term in scored]
+
+    def _docs(self, terms: List[str]) -> Set[int]:
+        """多个词的倒排表的并集"""
+        if len(terms) == 1:
+            return self.postings[terms[0]]
+        return set().union(*(self.postings[term] for term in terms))
+
+    def _expand(self, tokens: List[str], fuzzy_threshold: float,
+                max_expansion: int) -> Tuple[List[Optional[List[str]]], List[Tuple[int, int]], bool]:
+        """
+        把每个查询词展开为词典中的单词：优先前缀命中，没有时用模糊匹配。
+        命中的词太多时（例如单个字母）不展开（为None），改为逐个文档检查前缀
+
+        Returns:
+            (各查询词展开的词, 未展开的查询词在单词表中的范围, 是否用了模糊匹配)
+        """
+        expansions: List[Optional[List[str]]] = []
+        broad: List[Tuple[int, int]] = []
+        fuzzy = False
+        for token in tokens:
+            start, end = self._prefix_range(self.words, token)
+            if end - start > max_expansion:
+                expansions.append(None)
+                broad.append((start, end))
+                continue
+            terms = sorted(self.words[start:end], key=len)
+            if not terms and not (len(tokens) == 1 and self._has_prefix(self.pinyin, _PINYIN_MARK + token)):
+                terms = self._fuzzy_terms(token, fuzzy_threshold)[:max_expansion]
+                fuzzy = fuzzy or bool(terms)
+            expansions.append(terms)
+        return expansions, broad, fuzzy
+
+    def is_fuzzy(self, query: str, fuzzy_threshold: float, max_expansion: int) -> bool:
+        """查询是否要用模糊匹配（模糊命中不一定在较短前缀的结果中）"""
+        tokens = list(dict.fromkeys(tokenize(normalize(query))))
+        return self._expand(tokens, fuzzy_threshold, max_expansion)[2]
+
+    def search(self, query: str, limit: int, fuzzy_threshold: float, max_candidates: int, max_expansion: int,
+               exclude: Collection[int] = (), within: Optional[Collection[int]] = None) -> List[dict]:
+        """
+        检索并按相关度排序
+
+        候选文档按优先顺序收集（标题前缀、分词前缀、拼音），凑够max_candidates个
+        （加上要排除的个数）即停止，只对候选打分并取前limit个，耗时与命中总数无关。
+        exclude是已经显示的记录ID，取下一页时跳过；within不为None时只在这些记录中检索。
+        """
+        query = normalize(query)
+        tokens = list(dict.fromkeys(tokenize(query)))
+        compact = "".join(tokenize(query))
+        if not compact or limit <= 0:
+            return []
+
+        expansions, broad, fuzzy = self._expand(tokens, fuzzy_threshold, max_expansion)
+
+        doc_by_id = self.doc_by_id
+        excluded = {doc_by_id[record_id] for record_id in exclude if record_id in doc_by_id}
+        allowed = None
+        if within is not None:
+            allowed = {doc_by_id[record_id] for record_id in within if record_id in doc_by_id}
+        cap = max_candidates + len(excluded)
+
+        candidates: Dict[int, None] = {}
+        broad_tokens = [token for token, terms in zip(tokens, expansions) if terms is None]
+
+        def collect(docs: Iterable[int], check_broad: bool = True) -> bool:
+            """收集候选，凑够时返回True"""
+            for doc in docs:
+                if len(candidates) >= cap:
+                    return True
+                if allowed is not None and doc not in allowed:
+                    continue
+                if check_broad and broad_tokens:
+                    terms = self.doc_terms[doc]
+                    if not all(any(term.startswith(token) for term in terms) for token in broad_tokens):
+                        continue
+                candidates.setdefault(doc)
+            return len(candidates) >= cap
+
+        def collect_range(terms: List[str], prefix: str) -> bool:
+            # 大词表按字典序逐个遍历，凑够候选即停止；完全相同的词排在最前
+            start, end = self._prefix_range(terms, prefix)
+            for i in range(start, end):
+                if collect(self.postings[terms[i]], check_broad=False):
+                    return True
+            return False
+
+        def collect_all() -> None:
+            # 标题以整个查询开头的优先（例如不带空格输入的英文标题）
+            if collect_range(self.titles, _TITLE_MARK + compact):
+                return
+
+            narrow = [terms for terms in expansions if terms is not None]
+            if narrow:
+                # 展开的查询词各自取并集后求交集（从最小的集合开始），再检查其余查询词
+                if len(narrow) == 1 and not broad_tokens:
+                    for term in narrow[0]:
+                        if collect(self.postings[term]):
+                            return
+                else:
+                    unions = sorted((self._docs(terms) for terms in narrow), key=len)
+                    if collect(unions[0].intersection(*unions[1:])):
+                        return
+            else:
+                # 全部是宽泛的查询词：按字典序遍历第一个词的范围
+                start, end = broad[0]
+                for i in range(start, end):
+                    if collect(self.postings[self.words[i]]):
+                        return
+
+            # 单个查询词时再匹配中文标题的拼音
+            if len(tokens) == 1 and self.pinyin:
+                collect_range(self.pinyin, _PINYIN_MARK + tokens[0])
+
+        collect_all()
+
+        exact_words = [self.postings.get(token, set()) for token in tokens]
+        scored = {}
+        rank = {}
+        for order, doc in enumerate(candidates):
+            if doc in excluded:
+                continue
+            rank[doc] = order
+            text = self.texts[doc]
+            if text == compact:
+                score = 8
+            elif text.startswith(compact):
+                score = 6
+            elif compact in text:
+                score = 4
+            elif not fuzzy:
+                score = 2  # 分词前缀或拼音命中
+            else:
+                score = 0  # 模糊命中，按候选词的相似度顺序
+            # 查询词都是完整的词时优先
+            if score and all(doc in posting for posting in exact_words):
+                score += 1
+            scored[doc] = score
+
+        best = heapq.nsmallest(
+            limit, scored,
+            key=lambda doc: (-scored[doc], len(self.texts[doc]) if scored[doc] else 0, rank[doc])
+        )
+        return [self.records[doc] for doc in best]
+
+
+class SearchIndex:
+    """
+    本地搜索索引
+
+    分别为歌曲标题、艺术家名和专辑标题建立索引，支持前缀匹配、三元组模糊匹配，
+    安装了pypinyin时还支持中文标题的全拼和首字母匹配。
+    批量建立在调用线程中完成后整体替换，检索和增量更新在锁内进行。
+
+    建立拼音检索词较慢，索引可以保存到文件，下次启动时曲库版本一致就直接载入。
+    文件由整体保存的基础部分和旁边的变更日志组成：增量同步只在日志末尾追加变更，
+    日志超过基础部分的一定比例时才整体重写。
+    """
+
+    # 索引类型到检索字段的映射
+    FIELDS = {"songs": "title", "artists": "name", "albums": "title"}
+
+    # 日志超过基础部分的这个比例时整体重写
+    MAX_LOG_RATIO = 0.25
+
+    def __init__(self, fuzzy_threshold: float = 0.4, max_candidates: int = 2000, max_expansion: int = 256):
+        """
+        初始化搜索索引
+
+        Args:
+            fuzzy_threshold: 模糊匹配的最低相似度（0-1）
+            max_candidates: 每次检索参与排序的最多候选文档数（不含要排除的已显示结果）
+            max_expansion: 单个查询词最多展开的词数，超过时改为逐个文档检查
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_candidates = max_candidates
+        self.max_expansion = max_expansion
+        self._lock = threading.Lock()
+        self._indexes = {kind: _KindIndex() for kind in self.FIELDS}
+        self._complete = {kind: False for kind in self.FIELDS}
+        # 每次修改加一，保存期间有修改时放弃这次保存
+        self._version = 0
+
+        # 文件的状态：(基础部分的标识, 基础部分加日志对应的镜像版本号)，与内存不一致时为None
+        self._file_lock = threading.Lock()
+        self._file_state: Optional[Tuple[int, int]] = None
+        self._base_bytes = 0
+        self._log_bytes = 0
+
+    def build(self, kind: str, records: Iterable[dict], complete: bool = True) -> None:
+        """
+        用完整数据重建一类索引
+
+        Args:
+            kind: songs、artists或albums
+            records: 接口格式的记录
+            complete: records是否是该类型的全部数据
+        """
+        index = _KindIndex()
+        index.build(records, self.FIELDS[kind])
+        with self._lock:
+            self._indexes[kind] = index
+            self._complete[kind] = complete
+            self._version += 1
+
+    def update(self, kind: str, records: Iterable[dict] = (), deleted_ids: Iterable[int] = ()) -> None:
+        """
+        增量更新一类索引
+
+        Args:
+            kind: songs、artists或albums
+            records: 新增或修改的记录
+            deleted_ids: 删除的记录ID
+        """
+        with self._lock:
+            index = self._indexes[kind]
+            index.remove(deleted_ids)
+            index.update(records, self.FIELDS[kind])
+            self._version += 1
+
+    def is_complete(self, kind: str) -> bool:
+        """
+        索引是否包含该类型的全部数据（不完整时应使用服务器搜索）
+
+        Args:
+            kind: songs、artists或albums
+
+        Returns:
+            是否完整
+        """
+        return self._complete[kind]
+
+    def search(self, kind: str, query: str, limit: int = 200, exclude: Collection[int] = ()) -> List[dict]:
+        """
+        检索
+
+        只对按优先顺序收集的前max_candidates个候选排序，耗时与命中总数无关。
+        取下一页时把已经显示的结果放入exclude，候选数相应增加。
+
+        Args:
+            kind: songs、artists或albums
+            query: 查询文本
+            limit: 最多返回的结果数
+            exclude: 要跳过的记录ID（已显示的结果）
+
+        Returns:
+            按相关度排序的记录（接口格式），少于limit条时说明没有更多结果
+        """
+        with self._lock:
+            return self._indexes[kind].search(
+                query, limit, self.fuzzy_threshold, self.max_candidates, self.max_expansion, exclude
+            )
+
+    def refine(self, kind: str, query: str, broader: List[dict]) -> Optional[List[dict]]:
+        """
+        在较短前缀的完整结果中检索query
+
+        前缀匹配和拼音匹配的结果一定在较短前缀的结果中；要用模糊匹配的查询不一定，
+        此时返回None，应改为完整检索。
+
+        Args:
+            kind: songs、artists或albums
+            query: 查询文本
+            broader: 较短前缀的全部结果
+
+        Returns:
+            按相关度排序的记录，不能由broader得到时为None
+        """
+        with self._lock:
+            index = self._indexes[kind]
+            if index.is_fuzzy(query, self.fuzzy_threshold, self.max_expansion):
+                return None
+            return index.search(
+                query, len(broader), self.fuzzy_threshold, self.max_candidates, self.max_expansion,
+                within=[record["id"] for record in broader]
+            )
+
+    def _header(self, api_url: Optional[str]) -> dict:
+        """索引文件头部中载入时必须一致的部分"""
+        return {
+            "version": FORMAT_VERSION,
+            "python": sys.version_info[:2],
+            "pinyin": lazy_pinyin is not None,
+            "api_url": api_url,
+        }
+
+    def save(self, path: str, generation: int, api_url: Optional[str] = None) -> bool:
+        """
+        把索引整体保存到文件，并清空变更日志
+
+        各部分分块编码，块之间其他线程可以继续运行；期间索引被修改时放弃保存。
+
+        Args:
+            path: 文件路径
+            generation: 索引对应的曲库镜像版本号
+            api_url: 曲库所属的服务器地址
+
+        Returns:
+            是否已保存（有类型不完整或保存期间被修改时为False）
+
+        Raises:
+            OSError: 写入失败
+        """
+        with self._file_lock:
+            with self._lock:
+                if not all(self._complete.values()):
+                    return False
+                version = self._version
+                states = [(kind, vars(index)) for kind, index in self._indexes.items()]
+
+            base_id = time.time_ns()
+            header = dict(self._header(api_url), generation=generation, base_id=base_id)
+            fd, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(path) or None, prefix=os.path.basename(path) + ".", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    size = _write_frame(f, header)
+                    for kind, state in states:
+                        for name, value in state.items():
+                            for chunk in _chunks(value):
+                                size += _write_frame(f, (kind, name, chunk))
+                    size += _write_frame(f, _END)
+
+                with self._lock:
+                    if self._version != version:
+                        return False
+                    os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            try:
+                os.remove(path + ".log")
+            except FileNotFoundError:
+                pass
+            self._file_state = (base_id, generation)
+            self._base_bytes = size
+            self._log_bytes = 0
+            return True
+
+    def save_changes(self, path: str, previous_generation: int, generation: int,
+                     changes: Dict[str, Tuple[List[dict], List[int]]], api_url: Optional[str] = None) -> bool:
+        """
+        把一次增量变更（已应用到内存中的索引）追加到变更日志
+
+        文件不是previous_generation的状态，或日志已经过大时改为整体保存。
+
+        Args:
+            path: 文件路径
+            previous_generation: 变更前的镜像版本号
+            generation: 变更后的镜像版本号
+            changes: 类型 → (新增或修改的记录, 删除的记录ID)
+            api_url: 曲库所属的服务器地址
+
+        Returns:
+            是否已保存
+
+        Raises:
+            OSError: 写入失败
+        """
+        with self._file_lock:
+            state = self._file_state
+            if state is not None and state[1] == previous_generation and \
+                    self._log_bytes <= self._base_bytes * self.MAX_LOG_RATIO:
+                with open(path + ".log", "ab") as f:
+                    self._log_bytes += _write_frame(f, (state[0], previous_generation, generation, changes))
+                self._file_state = (state[0], generation)
+                return True
+        return self.save(path, generation, api_url)
+
+    def load(self, path: str, generation: int, api_url: Optional[str] = None) -> bool:
+        """
+        从文件载入索引，并重放变更日志
+
+        Args:
+            path: 文件路径
+            generation: 当前曲库镜像的版本号
+            api_url: 当前服务器地址
+
+        Returns:
+            是否载入了全部类型（文件不存在、已过期或损坏时为False，索引不变）
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        try:
+            frames = _frames(data)
+            header, _ = next(frames, (None, 0))
+            if not isinstance(header, dict) or \
+                    {key: header.get(key) for key in self._header(api_url)} != self._header(api_url):
+                return False
+            states: Dict[str, dict] = {}
+            for frame, _ in frames:
+                if frame == _END:
+                    break
+                kind, name, chunk = frame
+                state = states.setdefault(kind, {})
+                if name not in state:
+                    state[name] = chunk
+                elif isinstance(chunk, dict):
+                    state[name].update(chunk)
+                else:
+                    state[name].extend(chunk)
+            else:
+                return False
+        except (EOFError, ValueError, TypeError):
+            return False
+        if set(states) != set(self.FIELDS):
+            return False
+
+        indexes = {}
+        for kind, state in states.items():
+            index = indexes[kind] = _KindIndex()
+            index.__dict__.update(state)
+
+        # 重放同一基础部分之后的变更；日志中有无法使用的部分时，下次保存改为整体保存
+        base_id = header["base_id"]
+        current = header["generation"]
+        try:
+            with open(path + ".log", "rb") as f:
+                log = f.read()
+        except OSError:
+            log = b""
+        used = 0
+        try:
+            for (entry_base, previous, following, changes), end in _frames(log):
+                if entry_base != base_id or previous != current:
+                    break
+                for kind, (records, deleted_ids) in changes.items():
+                    indexes[kind].remove(deleted_ids)
+                    indexes[kind].update(records, self.FIELDS[kind])
+                current = following
+                used = end
+        except (EOFError, ValueError, TypeError):
+            pass
+        if current != generation:
+            return False
+
+        with self._lock:
+            self._indexes.update(indexes)
+            self._complete.update(dict.fromkeys(indexes, True))
+            self._version += 1
+        with self._file_lock:
+            self._file_state = (base_id, generation) if used == len(log) else None
+            self._base_bytes = len(data)
+            self._log_bytes = len(log)
+        return True
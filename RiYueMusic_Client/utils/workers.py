@@ -0,0 +1,206 @@
+"""
+后台任务 - 在线程池中执行耗时的服务调用，避免阻塞界面
+"""
+
+import itertools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _JobSignals(QObject):
+    """任务结果信号（从工作线程发出，在界面线程中以排队方式接收）"""
+
+    succeeded = pyqtSignal(object, int, object)  # 任务键, 任务代号, 结果
+    failed = pyqtSignal(object, int, str)        # 任务键, 任务代号, 错误信息
+    progress = pyqtSignal(object, int, object)   # 任务键, 任务代号, 中间结果
+
+
+class Job(QRunnable):
+    """在线程池中执行一次服务调用"""
+
+    def __init__(self, signals: _JobSignals, key: Hashable, generation: int,
+                 fn: Callable, args: tuple, kwargs: dict, cancel_event: threading.Event):
+        """
+        初始化任务
+
+        Args:
+            signals: 结果信号对象
+            key: 任务键
+            generation: 任务代号，用于识别已被取代的任务
+            fn: 要执行的函数
+            args: 位置参数
+            kwargs: 关键字参数
+            cancel_event: 取消事件
+        """
+        super().__init__()
+        self.signals = signals
+        self.key = key
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_event = cancel_event
+
+    def run(self) -> None:
+        """在工作线程中执行"""
+        if self.cancel_event.is_set():
+            return
+
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancel_event.is_set():
+                self.signals.failed.emit(self.key, self.generation, str(e))
+        else:
+            if not self.cancel_event.is_set():
+                self.signals.succeeded.emit(self.key, self.generation, result)
+
+
+class JobRunner(QObject):
+    """
+    控件级的后台任务调度器
+
+    同一个键的新任务会取代尚未完成的旧任务：旧任务被标记为取消，
+    即使它的请求已经发出，结果也不会再回调。没有键的任务互不影响。
+    所有回调都在界面线程中执行。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None, pool: Optional[QThreadPool] = None):
+        """
+        初始化任务调度器
+
+        Args:
+            parent: 父对象
+            pool: 线程池，默认使用全局线程池
+        """
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+
+        # 信号对象不设置父对象，由任务持有引用，避免控件销毁后任务发射信号出错
+        self._signals = _JobSignals()
+        self._signals.succeeded.connect(self._on_succeeded)
+        self._signals.failed.connect(self._on_failed)
+        self._signals.progress.connect(self._on_progress)
+
+        self._generation = itertools.count(1)
+        self._anonymous_keys = itertools.count()
+        self._jobs: Dict[Hashable, Dict[str, Any]] = {}
+
+    def submit(self, key: Optional[Hashable], fn: Callable, *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None,
+               on_progress: Optional[Callable[[Any], None]] = None,
+               with_cancel_event: bool = False,
+               **kwargs) -> threading.Event:
+        """
+        提交后台任务
+
+        如果指定了on_progress，fn还会收到progress和cancel_event两个关键字参数，
+        可以在执行过程中多次调用progress(中间结果)，并在cancel_event置位后尽早返回。
+        不需要中间结果的长任务可以指定with_cancel_event，只传入cancel_event。
+
+        Args:
+            key: 任务键，为None时不与其他任务合并
+            fn: 要在后台执行的函数
+            *args: 位置参数
+            on_success: 成功回调，参数为返回值
+            on_error: 失败回调，参数为错误信息
+            on_progress: 中间结果回调
+            with_cancel_event: 是否向fn传入cancel_event关键字参数
+            **kwargs: 关键字参数
+
+        Returns:
+            任务的取消事件
+        """
+        if key is None:
+            key = ("anonymous", next(self._anonymous_keys))
+        else:
+            self.cancel(key)
+
+        generation = next(self._generation)
+        cancel_event = threading.Event()
+        self._jobs[key] = {
+            "generation": generation,
+            "on_success": on_success,
+            "on_error": on_error,
+            "on_progress": on_progress,
+            "cancel_event": cancel_event,
+        }
+
+        if on_progress is not None:
+            signals = self._signals
+
+            def report(value: Any) -> None:
+                if not cancel_event.is_set():
+                    signals.progress.emit(key, generation, value)
+
+            kwargs["progress"] = report
+            kwargs["cancel_event"] = cancel_event
+        elif with_cancel_event:
+            kwargs["cancel_event"] = cancel_event
+
+        self.pool.start(Job(self._signals, key, generation, fn, args, kwargs, cancel_event))
+        return cancel_event
+
+    def cancel(self, key: Hashable) -> None:
+        """
+        取消指定键的任务
+
+        Args:
+            key: 任务键
+        """
+        job = self._jobs.pop(key, None)
+        if job:
+            job["cancel_event"].set()
+
+    def cancel_all(self) -> None:
+        """取消所有未完成的任务"""
+        for key in list(self._jobs):
+            self.cancel(key)
+
+    def is_running(self, key: Hashable) -> bool:
+        """
+        指定键的任务是否仍在进行
+
+        Args:
+            key: 任务键
+
+        Returns:
+            是否仍在进行
+        """
+        return key in self._jobs
+
+    def _current(self, key: Hashable, generation: int) -> Optional[Dict[str, Any]]:
+        """获取仍然有效的任务记录"""
+        job = self._jobs.get(key)
+        if job and job["generation"] == generation:
+            return job
+        return None
+
+    def _on_succeeded(self, key: Hashable, generation: int, result: Any) -> None:
+        """处理任务成功"""
+        job = self._current(key, generation)
+        if not job:
+            return
+        del self._jobs[key]
+        if job["on_success"]:
+            job["on_success"](result)
+
+    def _on_failed(self, key: Hashable, generation: int, error: str) -> None:
+        """处理任务失败"""
+        job = self._current(key, generation)
+        if not job:
+            return
+        del self._jobs[key]
+        if job["on_error"]:
+            job["on_error"](error)
+        else:
+            print(f"后台任务失败: {error}")
+
+    def _on_progress(self, key: Hashable, generation: int, value: Any) -> None:
+        """处理任务中间结果"""
+        job = self._current(key, generation)
+        if job and job["on_progress"]:
+            job["on_progress"](value)
@@ -0,0 +1,93 @@
+"""
+专辑加载基准测试 - 对比逐个请求与并发扇出请求的耗时
+
+在本地启动一个模拟服务器（每个请求带固定延迟），分别测量
+get_albums_by_artist 串行调用和 get_albums_for_artists 并发调用
+在不同艺术家数量下的总耗时。
+
+用法:
+    python benchmarks/bench_album_fanout.py [--latency 0.02] [--workers 8]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RiYueMusic_Client.api.api_client import ApiClient
+from RiYueMusic_Client.api.song_service import SongService
+
+
+def make_handler(latency: float):
+    """创建带固定延迟的请求处理器"""
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            artist_id = int(self.path.rstrip("/").split("/")[-1])
+            body = json.dumps([
+                {"id": artist_id * 10 + i, "title": f"Album {i}",
+                 "artistId": artist_id, "artistName": f"Artist {artist_id}"}
+                for i in range(3)
+            ]).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+
+def run_serial(service: SongService, artist_ids) -> float:
+    start = time.perf_counter()
+    for artist_id in artist_ids:
+        service.get_albums_by_artist(artist_id)
+    return time.perf_counter() - start
+
+
+def run_fanout(service: SongService, artist_ids, max_workers: int) -> float:
+    start = time.perf_counter()
+    for _ in service.get_albums_for_artists(artist_ids, max_workers=max_workers):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="每个请求的模拟延迟（秒）")
+    parser.add_argument("--workers", type=int, default=8, help="并发请求数")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 200, 500])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = ApiClient(f"http://127.0.0.1:{server.server_port}", pool_maxsize=args.workers)
+    service = SongService(client)
+
+    print(f"latency={args.latency * 1000:.0f}ms workers={args.workers}")
+    print(f"{'artists':>8} {'serial(s)':>10} {'fan-out(s)':>11} {'speedup':>8}")
+    try:
+        for count in args.counts:
+            artist_ids = list(range(1, count + 1))
+            serial = run_serial(service, artist_ids)
+            fanout = run_fanout(service, artist_ids, args.workers)
+            print(f"{count:>8} {serial:>10.3f} {fanout:>11.3f} {serial / fanout:>7.1f}x")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
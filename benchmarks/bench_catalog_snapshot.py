@@ -0,0 +1,94 @@
+"""
+曲库快照基准测试 - 测量快照的写入、打开和随机读取，并与解析JSON后建表的启动路径比较
+
+随机生成歌曲、艺术家和专辑，分别测量：解析JSON并建立SongTable（原启动路径，不含SQLite读取）、
+写入快照、打开快照、解码首屏（前500行）、随机读取整行和单个字段，以及首次按ID查找行。
+
+用法:
+    python benchmarks/bench_catalog_snapshot.py [--songs 250000] [--reads 10000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RiYueMusic_Client.models.song_table import SongTable
+from RiYueMusic_Client.utils.catalog_snapshot import CatalogSnapshot, write_snapshot
+
+
+def make_catalog(songs: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    artists = max(10, songs // 50)
+    artists_data = [{"id": i, "name": f"Artist {i}", "bio": None, "avatarUrl": None} for i in range(1, artists + 1)]
+    albums_data = [
+        {"id": artist_id * 10 + n, "title": f"Album {artist_id * 10 + n}", "artistId": artist_id,
+         "artistName": f"Artist {artist_id}", "releaseDate": f"20{rng.randint(0, 24):02d}-01-01"}
+        for artist_id in range(1, artists + 1) for n in range(5)
+    ]
+    songs_data = []
+    for song_id in range(1, songs + 1):
+        artist_id = rng.randint(1, artists)
+        album_id = artist_id * 10 + rng.randint(0, 4)
+        songs_data.append({
+            "id": song_id, "title": f"Song {song_id} {rng.choice(['love', 'night', 'rain', '晴天'])}",
+            "artistId": artist_id, "artistName": f"Artist {artist_id}",
+            "albumId": album_id, "albumTitle": f"Album {album_id}",
+            "duration": f"{rng.randint(2, 6)}:{rng.randint(0, 59):02d}",
+            "fileUrl": f"/api/files/songs/{song_id:08d}.mp3", "lyricUrl": None,
+            "playCount": rng.randint(0, 1000),
+        })
+    return {"songs": songs_data, "artists": artists_data, "albums": albums_data}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--songs", type=int, default=250000, help="歌曲数量")
+    parser.add_argument("--reads", type=int, default=10000, help="随机读取次数")
+    args = parser.parse_args()
+
+    catalog = make_catalog(args.songs)
+    payload = json.dumps(catalog["songs"], ensure_ascii=False)
+    rng = random.Random(2)
+    rows = [rng.randrange(args.songs) for _ in range(args.reads)]
+
+    fd, path = tempfile.mkstemp(suffix=".snapshot")
+    os.close(fd)
+    try:
+        _, json_ms = timed(lambda: SongTable(json.loads(payload)))
+        _, write_ms = timed(lambda: write_snapshot(path, catalog, generation=1))
+        snapshot, open_ms = timed(lambda: CatalogSnapshot.open(path))
+        songs, section_ms = timed(lambda: snapshot.section("songs"))
+        _, first_ms = timed(lambda: [songs.view(row).title for row in range(500)])
+        _, rows_ms = timed(lambda: [songs.entity(row) for row in rows])
+        _, field_ms = timed(lambda: [songs.value(row, 1) for row in rows])
+        _, index_ms = timed(lambda: songs.rows_for_id(args.songs // 2))
+
+        print(f"songs={args.songs} file={os.path.getsize(path) / 1024 / 1024:.1f}MB")
+        print(f"{'step':<28} {'ms':>9}")
+        print(f"{'json + SongTable':<28} {json_ms:>9.1f}")
+        print(f"{'write snapshot':<28} {write_ms:>9.1f}")
+        print(f"{'open snapshot':<28} {open_ms + section_ms:>9.2f}")
+        print(f"{'first screen (500 rows)':<28} {first_ms:>9.2f}")
+        print(f"{f'random rows x{args.reads}':<28} {rows_ms:>9.1f}")
+        print(f"{f'random titles x{args.reads}':<28} {field_ms:>9.1f}")
+        print(f"{'id index (first lookup)':<28} {index_ms:>9.1f}")
+        songs = None
+        snapshot.close()
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
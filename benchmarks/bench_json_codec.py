@@ -0,0 +1,113 @@
+"""
+JSON编解码基准测试 - 比较各实现把歌曲数组解码为Song对象的吞吐量
+
+随机生成歌曲列表的JSON，分别测量：标准库json、orjson、msgspec解码为字典后
+逐个构建Song，json_codec.loads（当前选用的实现），以及msgspec按Song的字段
+直接解码为记录结构再构建Song（不创建中间字典，与_build一样驻留重复的文本）。
+未安装的实现跳过。
+
+用法:
+    python benchmarks/bench_json_codec.py [--songs 100000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import MISSING, fields
+from typing import Any, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RiYueMusic_Client.models.song import Song, intern_text
+from RiYueMusic_Client.utils import json_codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def make_body(songs: int, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    return json.dumps([
+        {
+            "id": song_id, "title": f"Song {song_id} {rng.choice(['love', 'night', 'rain', '晴天'])}",
+            "artistId": song_id % 500, "artistName": f"Artist {song_id % 500}",
+            "albumId": song_id % 2500, "albumTitle": f"Album {song_id % 2500}",
+            "duration": f"{rng.randint(2, 6)}:{rng.randint(0, 59):02d}",
+            "fileUrl": f"/api/files/songs/{song_id:08d}.mp3", "lyricUrl": None,
+            "playCount": rng.randint(0, 1000),
+        }
+        for song_id in range(1, songs + 1)
+    ], ensure_ascii=False).encode("utf-8")
+
+
+def struct_decoder(cls: type):
+    """按实体类的字段和接口字段名生成msgspec解码器，返回解码为实体列表的函数"""
+    record = msgspec.defstruct(
+        f"{cls.__name__}Record",
+        # 接口中缺少的字段取数据类的默认值，没有默认值的字段取None
+        [(f.name, Any, None if f.default is MISSING else f.default) for f in fields(cls)],
+        rename=dict(cls.FIELD_KEYS),
+    )
+    decoder = msgspec.json.Decoder(List[record])
+    to_tuple = msgspec.structs.astuple
+    # 与Song._build驻留相同的字段
+    names = [f.name for f in fields(cls)]
+    interned = [names.index(name) for name in ("artist_name", "album_title", "duration")]
+
+    def decode(body: bytes):
+        entities = []
+        for item in decoder.decode(body):
+            values = list(to_tuple(item))
+            for index in interned:
+                values[index] = intern_text(values[index])
+            entities.append(cls(*values))
+        return entities
+    return decode
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--songs", type=int, default=100000, help="歌曲数量")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    body = make_body(args.songs)
+    cases = [("json + _build", lambda: [Song._build(d) for d in json.loads(body)])]
+    if orjson is not None:
+        cases.append(("orjson + _build", lambda: [Song._build(d) for d in orjson.loads(body)]))
+    if msgspec is not None:
+        decode = msgspec.json.Decoder().decode
+        cases.append(("msgspec + _build", lambda: [Song._build(d) for d in decode(body)]))
+        decode_struct = struct_decoder(Song)
+        cases.append(("msgspec struct", lambda: decode_struct(body)))
+    cases.append((f"json_codec ({json_codec.BACKEND}) + _build",
+                  lambda: [Song._build(d) for d in json_codec.loads(body)]))
+
+    print(f"songs={args.songs} body={len(body) / 1024 / 1024:.1f}MB msgspec={'yes' if msgspec else 'no'}")
+    print(f"{'decoder':<28} {'ms':>9} {'songs/s':>12}")
+    for name, fn in cases:
+        seconds = best_of(fn, args.repeat)
+        print(f"{name:<28} {seconds * 1000:>9.1f} {args.songs / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
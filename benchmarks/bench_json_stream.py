@@ -0,0 +1,98 @@
+"""
+流式JSON解码基准测试 - 比较整体解析与逐个元素解析大数组的峰值内存和首个元素的等待时间
+
+随机生成歌曲列表的JSON响应体，按64KB分块模拟下载，分别测量：
+下载完成后整体json.loads（原get的做法，需要先保留完整响应体），
+以及iter_json_array边到达边解析。两种方式都把结果装入SongTable。
+
+用法:
+    python benchmarks/bench_json_stream.py [--songs 100000] [--chunk 65536]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RiYueMusic_Client.api.json_stream import iter_json_array
+from RiYueMusic_Client.models.song_table import SongTable
+
+
+def make_body(songs: int, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    return json.dumps([
+        {
+            "id": song_id, "title": f"Song {song_id} {rng.choice(['love', 'night', 'rain', '晴天'])}",
+            "artistId": song_id % 500, "artistName": f"Artist {song_id % 500}",
+            "albumId": song_id % 2500, "albumTitle": f"Album {song_id % 2500}",
+            "duration": f"{rng.randint(2, 6)}:{rng.randint(0, 59):02d}",
+            "fileUrl": f"/api/files/songs/{song_id:08d}.mp3", "lyricUrl": None,
+            "playCount": rng.randint(0, 1000),
+        }
+        for song_id in range(1, songs + 1)
+    ], ensure_ascii=False).encode("utf-8")
+
+
+def chunks_of(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def whole(body: bytes, size: int):
+    """先收齐响应体，再整体解析"""
+    start = time.perf_counter()
+    received = b"".join(chunks_of(body, size))
+    data = json.loads(received)
+    first = time.perf_counter() - start
+    table = SongTable(data)
+    return table, first
+
+
+def streamed(body: bytes, size: int):
+    """边到达边解析，每500个元素装入一次"""
+    start = time.perf_counter()
+    first = None
+    table = SongTable()
+    batch = []
+    for item in iter_json_array(chunks_of(body, size)):
+        if first is None:
+            first = time.perf_counter() - start
+        batch.append(item)
+        if len(batch) >= 500:
+            table.extend_dicts(batch)
+            batch = []
+    table.extend_dicts(batch)
+    return table, first
+
+
+def measure(fn, body: bytes, size: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    table, first = fn(body, size)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(table), first * 1000, total * 1000, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--songs", type=int, default=100000, help="歌曲数量")
+    parser.add_argument("--chunk", type=int, default=64 * 1024, help="每块字节数")
+    args = parser.parse_args()
+
+    body = make_body(args.songs)
+    print(f"songs={args.songs} body={len(body) / 1024 / 1024:.1f}MB chunk={args.chunk}")
+    print(f"{'mode':<10} {'rows':>8} {'first ms':>10} {'total ms':>10} {'peak MB':>9}")
+    for name, fn in (("whole", whole), ("streamed", streamed)):
+        rows, first_ms, total_ms, peak_mb = measure(fn, body, args.chunk)
+        print(f"{name:<10} {rows:>8} {first_ms:>10.1f} {total_ms:>10.1f} {peak_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
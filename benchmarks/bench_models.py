@@ -0,0 +1,136 @@
+"""
+数据模型基准测试 - 比较不同歌曲存储方式的内存占用和构建时间
+
+随机生成歌曲JSON（艺术家、专辑和文件URL前缀大量重复），解码后分别构建：
+普通dataclass（改动前的Song）、slots dataclass加字符串驻留（当前的Song）、
+经过身份映射的Song.from_dict以及列式的SongTable。内存为释放JSON数据后仍被存储占用的字节数（tracemalloc）。
+
+用法:
+    python benchmarks/bench_models.py [--counts 10000 100000 1000000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RiYueMusic_Client.models.song import Song
+from RiYueMusic_Client.models.song_table import SongTable
+
+
+@dataclass
+class PlainSong:
+    """改动前的Song：没有__slots__，字符串不驻留"""
+    id: int
+    title: str
+    artist_id: Optional[int] = None
+    artist_name: Optional[str] = None
+    album_id: Optional[int] = None
+    album_title: Optional[str] = None
+    duration: Optional[str] = None
+    file_url: Optional[str] = None
+    lyric_url: Optional[str] = None
+    play_count: int = 0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlainSong":
+        return cls(
+            id=data.get('id'),
+            title=data.get('title'),
+            artist_id=data.get('artistId'),
+            artist_name=data.get('artistName'),
+            album_id=data.get('albumId'),
+            album_title=data.get('albumTitle'),
+            duration=data.get('duration'),
+            file_url=data.get('fileUrl'),
+            lyric_url=data.get('lyricUrl'),
+            play_count=data.get('playCount', 0)
+        )
+
+
+def make_payload(count: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    artists = max(10, count // 50)
+    songs = []
+    for song_id in range(1, count + 1):
+        artist_id = rng.randint(1, artists)
+        album_id = artist_id * 10 + rng.randint(0, 4)
+        songs.append({
+            "id": song_id,
+            "title": f"Song {song_id} {rng.choice(['love', 'night', 'rain', 'dream'])}",
+            "artistId": artist_id,
+            "artistName": f"Artist {artist_id}",
+            "albumId": album_id,
+            "albumTitle": f"Album {album_id}",
+            "duration": f"{rng.randint(2, 6)}:{rng.randint(0, 59):02d}",
+            "fileUrl": f"/api/files/songs/{song_id:08d}.mp3",
+            "lyricUrl": None,
+            "playCount": rng.randint(0, 1000),
+        })
+    return json.dumps(songs)
+
+
+def build_plain(data):
+    return [PlainSong.from_dict(item) for item in data]
+
+
+def build_slots(data):
+    return [Song._build(item) for item in data]
+
+
+def build_identity(data):
+    return [Song.from_dict(item) for item in data]
+
+
+def build_table(data):
+    return SongTable(data)
+
+
+def measure(build, payload: str):
+    """返回(构建耗时秒, 存储占用字节)；计时和内存分两次测量，tracemalloc会拖慢构建"""
+    data = json.loads(payload)
+    gc.collect()
+    start = time.perf_counter()
+    store = build(data)
+    elapsed = time.perf_counter() - start
+    del data, store
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    data = json.loads(payload)
+    store = build(data)
+    del data
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del store
+    return elapsed, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10000, 100000, 1000000], help="歌曲数量")
+    args = parser.parse_args()
+
+    builders = [("dataclass", build_plain), ("slots+intern", build_slots),
+                ("identity map", build_identity), ("SongTable", build_table)]
+    print(f"{'count':>9} {'store':<14} {'build ms':>10} {'MB':>9} {'bytes/row':>10}")
+    for count in args.counts:
+        payload = make_payload(count)
+        for name, build in builders:
+            elapsed, retained = measure(build, payload)
+            print(f"{count:>9} {name:<14} {elapsed * 1000:>10.0f} {retained / 1024 / 1024:>9.1f} "
+                  f"{retained / count:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+本地搜索基准测试 - 测量搜索索引的建立时间和查询延迟
+
+随机生成英文和中文标题的歌曲，建立SearchIndex后测量整体保存、追加一首歌的
+增量变更和载入索引文件的时间，再对前缀、多词、中文、拼音（需要pypinyin）和
+拼写错误的查询分别测量第一页（200条）和跳过第一页后第二页的延迟。
+
+用法:
+    python benchmarks/bench_search_index.py [--count 500000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RiYueMusic_Client.utils import search_index
+from RiYueMusic_Client.utils.search_index import SearchIndex
+
+WORDS = [
+    "love", "night", "star", "dream", "heart", "rain", "summer", "light", "road", "home",
+    "blue", "fire", "river", "moon", "song", "time", "world", "sky", "city", "ocean"
+]
+CHARS = "周杰伦晴天稻香夜曲七里香告白气球青花瓷东风破月亮代表我的心后来十年光阴故事"
+
+
+def make_songs(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    songs = []
+    for song_id in range(1, count + 1):
+        if rng.random() < 0.5:
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        else:
+            title = "".join(rng.choice(CHARS) for _ in range(rng.randint(2, 6)))
+        songs.append({"id": song_id, "title": title})
+    return songs
+
+
+def measure(index: SearchIndex, query: str, repeat: int, exclude=()):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = index.search("songs", query, limit=200, exclude=exclude)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500000, help="歌曲数量")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询的重复次数")
+    args = parser.parse_args()
+
+    songs = make_songs(args.count)
+    index = SearchIndex()
+
+    start = time.perf_counter()
+    index.build("songs", songs)
+    print(f"songs={args.count} build={time.perf_counter() - start:.2f}s "
+          f"pinyin={'on' if search_index.lazy_pinyin else 'off'}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "catalog.search")
+        for kind in ("artists", "albums"):
+            index.build(kind, [])
+        start = time.perf_counter()
+        index.save(path, generation=1)
+        saved = time.perf_counter() - start
+
+        song = {"id": args.count + 1, "title": "new song"}
+        index.update("songs", [song])
+        start = time.perf_counter()
+        index.save_changes(path, 1, 2, {"songs": ([song], [])})
+        delta = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = SearchIndex().load(path, generation=2)
+        print(f"save={saved:.2f}s delta={delta * 1000:.2f}ms load={time.perf_counter() - start:.2f}s "
+              f"size={os.path.getsize(path) / 1024 / 1024:.1f}MB loaded={loaded}")
+
+    queries = ["l", "lo", "love", "love ni", "summer rain", "oceam", "drem night", "周", "晴天", "青花"]
+    if search_index.lazy_pinyin:
+        queries += ["qingtian", "qt", "zhoujie"]
+
+    print(f"{'query':<14} {'median(ms)':>11} {'max(ms)':>8} {'results':>8} {'page2(ms)':>10}")
+    for query in queries:
+        median, worst, results = measure(index, query, args.repeat)
+        second, _, _ = measure(index, query, args.repeat, [record["id"] for record in results])
+        print(f"{query:<14} {median:>11.2f} {worst:>8.2f} {len(results):>8} {second:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()